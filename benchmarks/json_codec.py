@@ -0,0 +1,71 @@
+"""
+Decode time of scheduled_events pages: requests' `response.json()` against the codecs
+of `calendly.utils.codec` decoding the raw body bytes.
+
+Every page holds `count` realistic scheduled events (memberships, location, counters),
+as returned by GET /scheduled_events?count=100.
+
+Usage:
+    python benchmarks/json_codec.py [pages] [count]
+"""
+import json
+import sys
+import time
+
+import requests
+
+from calendly.utils import codec
+
+
+def make_event(index):
+    return {
+        'uri': f'https://api.calendly.com/scheduled_events/{index:032x}',
+        'name': '30 Minute Meeting',
+        'status': 'active' if index % 7 else 'canceled',
+        'start_time': '2026-03-14T16:00:00.000000Z',
+        'end_time': '2026-03-14T16:30:00.000000Z',
+        'event_type': 'https://api.calendly.com/event_types/GBGBDCAADAEDCRZ2',
+        'location': {'type': 'zoom', 'join_url': f'https://zoom.us/j/{index}', 'status': 'pushed', 'data': {}},
+        'invitees_counter': {'total': 1, 'active': 1, 'limit': 1},
+        'created_at': '2026-03-01T12:00:00.000000Z',
+        'updated_at': '2026-03-01T12:00:00.000000Z',
+        'event_memberships': [{'user': 'https://api.calendly.com/users/GBGBDCAADAEDCRZ2',
+                               'user_email': 'host@example.com', 'user_name': 'Host'}],
+        'event_guests': [],
+    }
+
+
+def make_response(count):
+    page = {'collection': [make_event(index) for index in range(count)],
+            'pagination': {'count': count, 'next_page': 'https://api.calendly.com/scheduled_events?page_token=x',
+                           'previous_page': None, 'next_page_token': 'x', 'previous_page_token': None}}
+    response = requests.Response()
+    response._content = json.dumps(page).encode('utf-8')
+    response.status_code = 200
+    response.headers['content-type'] = 'application/json'
+    return response
+
+
+def measure(decode, response, pages):
+    start = time.perf_counter()
+    for _ in range(pages):
+        decode(response)
+    return time.perf_counter() - start
+
+
+def main(pages=2000, count=100):
+    response = make_response(count)
+    print(f"{pages} pages of {count} events ({len(response.content) / 1024:.0f} KiB each)")
+    print(f"  requests response.json()  {measure(lambda r: r.json(), response, pages):.3f}s")
+    codecs = [codec.StdlibJSONCodec()]
+    if codec.ujson is not None:
+        codecs.append(codec.UjsonCodec())
+    if codec.orjson is not None:
+        codecs.append(codec.OrjsonCodec())
+    for json_codec in codecs:
+        print(f"  {json_codec.name + '.loads(bytes)':<25} {measure(lambda r: json_codec.loads(r.content), response, pages):.3f}s")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(*(int(arg) for arg in args[:2]))
@@ -0,0 +1,50 @@
+"""
+Memory held by scheduled events decoded as json dicts versus ScheduledEvent models.
+
+Usage:
+    python benchmarks/models_memory.py [events]
+"""
+import json
+import sys
+import tracemalloc
+
+from calendly.models import ScheduledEvent
+
+
+def make_page(size, offset):
+    return json.dumps({'collection': [{
+        'uri': f'https://api.calendly.com/scheduled_events/{offset + i:016d}',
+        'name': '30 Minute Meeting',
+        'status': 'active',
+        'start_time': '2021-08-24T14:15:22.123456Z',
+        'end_time': '2021-08-24T14:45:22.123456Z',
+        'event_type': 'https://api.calendly.com/event_types/AAAAAAAAAAAAAAAA',
+        'location': {'type': 'zoom', 'location': 'https://zoom.us/j/123'},
+        'invitees_counter': {'total': 1, 'active': 1, 'limit': 1},
+        'created_at': '2021-08-01T10:00:00.000000Z',
+        'updated_at': '2021-08-01T10:00:00.000000Z',
+        'event_memberships': [{'user': 'https://api.calendly.com/users/BBBBBBBBBBBBBBBB'}],
+        'event_guests': [],
+    } for i in range(size)], 'pagination': {'next_page': None}})
+
+
+def measure(count, convert):
+    pages = [make_page(100, offset) for offset in range(0, count, 100)]
+    tracemalloc.start()
+    held = []
+    for page in pages:
+        held.extend(convert(item) for item in json.loads(page)['collection'])
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def main(count=50000):
+    as_dicts = measure(count, lambda item: item)
+    as_models = measure(count, ScheduledEvent.from_dict)
+    print(f"dicts : {as_dicts / 2 ** 20:.1f} MiB for {count} events")
+    print(f"models: {as_models / 2 ** 20:.1f} MiB for {count} events ({as_models / as_dicts:.0%} of dicts)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
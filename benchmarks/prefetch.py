@@ -0,0 +1,42 @@
+"""
+End-to-end crawl time with and without next-page prefetching.
+
+Every page takes `latency` seconds to fetch and `work` seconds to process, so a
+sequential crawl costs pages * (latency + work) while a prefetching crawl
+overlaps the two and approaches pages * max(latency, work).
+
+Usage:
+    python benchmarks/prefetch.py [pages] [latency] [work]
+"""
+import sys
+import time
+
+from calendly.utils.pagination import iter_pages
+
+
+def make_fetch_page(latency):
+    def fetch_page(url):
+        time.sleep(latency)
+        index = int(url.rsplit('/', 1)[1])
+        return {'collection': [{'uri': f'event/{index}'}] * 100, 'pagination': {'next_page': f'page/{index + 1}'}}
+    return fetch_page
+
+
+def crawl(pages, latency, work, prefetch):
+    fetch_page = make_fetch_page(latency)
+    start = time.perf_counter()
+    for count, page in enumerate(iter_pages(fetch_page, fetch_page('page/0'), prefetch), start=1):
+        time.sleep(work)
+        if count == pages:
+            break
+    return time.perf_counter() - start
+
+
+def main(pages=50, latency=0.02, work=0.02):
+    for prefetch in (0, 1, 2):
+        print(f"prefetch={prefetch}  {pages} pages in {crawl(pages, latency, work, prefetch):.3f}s")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 50, *(float(arg) for arg in args[1:3]))
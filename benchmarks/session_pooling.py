@@ -0,0 +1,71 @@
+"""
+Per-request latency of one-shot `requests.get` calls versus a pooled CalendlyReq session.
+
+Runs against a local keep-alive HTTP stub, so the numbers only show the TCP
+connection setup saved by pooling; TLS handshakes against api.calendly.com
+make the real difference larger.
+
+Usage:
+    python benchmarks/session_pooling.py [requests_per_run]
+"""
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from calendly.utils.api import CalendlyReq
+
+BODY = json.dumps({"resource": {"uri": "https://api.calendly.com/users/BENCH"}}).encode('utf-8')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def measure(send, url, count):
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        send(url)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<22} mean={statistics.mean(timings):.3f}ms  p50={statistics.median(timings):.3f}ms  p95={p95:.3f}ms")
+
+
+def main(count=500):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/users/me"
+    headers = {'authorization': 'Bearer bench'}
+
+    try:
+        report("requests.get (no pool)", measure(lambda u: requests.get(u, headers=headers), url, count))
+        with CalendlyReq(token='bench') as req:
+            report("CalendlyReq (pooled)", measure(req.get, url, count))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
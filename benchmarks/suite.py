@@ -0,0 +1,157 @@
+"""
+Throughput and latency of the main client flows against the local CalendlySimulator.
+
+Scenarios:
+    pagination  get_all_scheduled_events with prefetch 0, 1 and 2, and time-sharded
+    bulk        get_event_details_many with 1, 4 and 16 workers
+    webhooks    sync_webhooks (first deploy, then an unchanged redeploy) and signed
+                deliveries through a WebhookReceiver with de-duplication
+
+Every request pays `--latency` seconds on the simulator, so the numbers show how well
+each feature hides round-trips. Results can be written as json (`--json`) and compared
+between commits to catch regressions.
+
+Usage:
+    python benchmarks/suite.py [--events 2000] [--latency 0.01] [--only pagination,bulk,webhooks] [--json results.json]
+"""
+import argparse
+import json
+import threading
+import time
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from calendly import CalendlyAPI
+from calendly.simulator import CalendlySimulator
+from calendly.utils.instrumentation import Instrumentation
+from calendly.utils.webhook_sync import WebhookSpec
+from calendly.webhooks import WebhookDeduplicator, WebhookReceiver
+
+SIGNING_KEY = 'benchmark-signing-key'
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+
+def run(name, function, items, client):
+    """
+    Time `function`, which processes `items` things through `client`, and summarize the latencies of
+    its busiest endpoint.
+    """
+    instrumentation = client.request.instrumentation
+    instrumentation.metrics.reset()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    requests_sent = sum(instrumentation.metrics.requests.values())
+    histograms = list(instrumentation.metrics.latencies.values())
+    busiest = max(histograms, key=lambda histogram: histogram.count) if histograms else None
+    latencies = {f'p{percent}': busiest.percentile(percent) for percent in (50, 95, 99)} if busiest else {}
+    result = {'scenario': name, 'seconds': elapsed, 'items': items, 'items_per_second': items / elapsed,
+              'requests': requests_sent}
+    result.update({key: value * 1000 for key, value in latencies.items() if value is not None})
+    print(f"{name:<34} {elapsed:8.3f}s  {items / elapsed:9.1f}/s  {requests_sent:5d} requests"
+          + ''.join(f"  {key}={value * 1000:.1f}ms" for key, value in latencies.items() if value is not None))
+    return result
+
+
+def make_client(simulator):
+    return CalendlyAPI('benchmark-token', base_url=simulator.base_url, instrumentation=Instrumentation())
+
+
+def pagination(simulator, events):
+    client = make_client(simulator)
+    results = []
+    for prefetch in (0, 1, 2):
+        results.append(run(f'pagination prefetch={prefetch}',
+                           lambda: client.get_all_scheduled_events(simulator.user_uri, prefetch=prefetch), events, client))
+    first, last = simulator.data.events[0]['start_time'], simulator.data.events[-1]['end_time']
+    results.append(run('pagination shards=8',
+                       lambda: client.get_all_scheduled_events(simulator.user_uri, min_start_time=first, max_start_time=last,
+                                                               shards=8, max_workers=8), events, client))
+    client.close()
+    return results
+
+
+def bulk(simulator, events):
+    client = make_client(simulator)
+    uuids = [event['uri'].rsplit('/', 1)[-1] for event in simulator.data.events[:events]]
+    results = []
+    for workers in (1, 4, 16):
+        results.append(run(f'get_event_details_many workers={workers}',
+                           lambda: list(client.get_event_details_many(uuids, max_workers=workers)), len(uuids), client))
+    client.close()
+    return results
+
+
+def webhooks(simulator, subscriptions, deliveries):
+    client = make_client(simulator)
+    desired = [WebhookSpec(f'https://hooks.example.com/{index}', ['created', 'canceled'], simulator.organization_uri,
+                           signing_key=SIGNING_KEY) for index in range(subscriptions)]
+    results = [
+        run('sync_webhooks first deploy', lambda: client.sync_webhooks(desired), subscriptions, client),
+        run('sync_webhooks unchanged redeploy', lambda: client.sync_webhooks(desired), subscriptions, client),
+    ]
+    client.sync_webhooks([], groups=[(simulator.organization_uri, 'organization', None)])
+
+    handled = threading.Semaphore(0)
+    receiver = WebhookReceiver(SIGNING_KEY, deduplicator=WebhookDeduplicator(), reorder_window=0.5)
+    receiver.on('*')(lambda event: handled.release())
+    server = make_server('127.0.0.1', 0, receiver, server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client.create_webhook(f'http://127.0.0.1:{server.server_port}/', 'organization', simulator.organization_uri, SIGNING_KEY)
+
+    invitees = [invitee for event in simulator.data.events[:deliveries] for invitee in simulator.data.invitees[event['uri']]][:deliveries]
+    start = time.perf_counter()
+    for invitee in invitees:
+        simulator.deliver('invitee.created', invitee)
+    for _ in invitees:
+        handled.acquire()
+    elapsed = time.perf_counter() - start
+    print(f"{'webhook deliveries':<34} {elapsed:8.3f}s  {len(invitees) / elapsed:9.1f}/s")
+    results.append({'scenario': 'webhook deliveries', 'seconds': elapsed, 'items': len(invitees),
+                    'items_per_second': len(invitees) / elapsed})
+
+    server.shutdown()
+    server.server_close()
+    receiver.stop()
+    client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=2000)
+    parser.add_argument('--bulk', type=int, default=300, help='events fetched one by one in the bulk scenario')
+    parser.add_argument('--subscriptions', type=int, default=100)
+    parser.add_argument('--deliveries', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--only', default='pagination,bulk,webhooks')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    results = []
+    scenarios = args.only.split(',')
+    with CalendlySimulator(events=args.events, latency=args.latency) as simulator:
+        if 'pagination' in scenarios:
+            results += pagination(simulator, args.events)
+        if 'bulk' in scenarios:
+            results += bulk(simulator, min(args.bulk, args.events))
+    if 'webhooks' in scenarios:
+        with CalendlySimulator(events=args.deliveries, latency=args.latency) as simulator:
+            results += webhooks(simulator, args.subscriptions, args.deliveries)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({'latency': args.latency, 'events': args.events, 'results': results}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 from .utils.oauth2 import CalendlyOauth2
 from .calendly import CalendlyAPI
-from .exceptions import CalendlyException, CalendlyOauth2Exception
+from .async_calendly import AsyncCalendlyAPI
+from .exceptions import CalendlyException, CalendlyOauth2Exception, CalendlyWebhookException
 
-__all__ = [CalendlyAPI, CalendlyOauth2, CalendlyException, CalendlyOauth2Exception]
\ No newline at end of file
+__all__ = [CalendlyAPI, AsyncCalendlyAPI, CalendlyOauth2, CalendlyException, CalendlyOauth2Exception, CalendlyWebhookException]
\ No newline at end of file
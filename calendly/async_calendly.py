@@ -0,0 +1,433 @@
+import asyncio
+import time
+from datetime import timedelta
+from typing import AsyncIterator, Iterable, List, MutableMapping
+
+from calendly.calendly import (CalendlyAPI, DEFAULT_MIN_SHARD_DURATION, DEFAULT_SCHEDULING_URL_INDEX_TTL,
+                               DEFAULT_SCHEDULING_URL_MISS_INTERVAL, DEFAULT_SHARD_WORKERS, SchedulingUrlIndex)
+from calendly.models import EventType, Invitee, ScheduledEvent, WebhookSubscription, to_model, to_models
+from calendly.utils.async_api import AsyncCalendlyReq
+from calendly.utils.constants import WEBHOOK, EVENTS, ME, EVENT_TYPE
+from calendly.utils.batch import BatchResult, DEFAULT_BATCH_WORKERS, arun_batch
+from calendly.utils.pagination import aiter_pages
+from calendly.utils.sharding import parse_time, split_dense_window, split_window
+from calendly.utils.webhook_sync import WebhookSpec, WebhookSyncReport, diff_webhooks, group_key
+from calendly.exceptions import CalendlyException
+
+
+class AsyncCalendlyAPI(object):
+    """
+    asyncio counterpart of CalendlyAPI. Every method is a coroutine with the same arguments and
+    return values as its CalendlyAPI namesake, except that the iterators are async iterators and
+    concurrency comes from tasks of the running loop instead of threads.
+    """
+
+    event_types_def = CalendlyAPI.event_types_def
+
+    def __init__(self, token: str=None, scheduling_url_index_ttl: float=DEFAULT_SCHEDULING_URL_INDEX_TTL,
+                 scheduling_url_miss_interval: float=DEFAULT_SCHEDULING_URL_MISS_INTERVAL, **kwargs):
+        """
+        Constructor. Uses Bearer Token for Authentication.
+
+        Parameters
+        ----------
+        token : str
+            Personal Access Token. Omit it when passing a `token_manager` and `tenant` instead.
+        scheduling_url_index_ttl : float, optional
+            Seconds before the event type -> scheduling url index of a user is rebuilt
+        scheduling_url_miss_interval : float, optional
+            Minimum seconds between two rebuilds of a user's index caused by unknown event types
+        **kwargs
+            Extra options for AsyncCalendlyReq, e.g. a shared `client` or `max_connections`
+        """
+        self.request = AsyncCalendlyReq(token, **kwargs)
+        self.scheduling_url_index_ttl = scheduling_url_index_ttl
+        self.scheduling_url_miss_interval = scheduling_url_miss_interval
+        self._scheduling_url_indexes = {}
+        self._scheduling_url_locks = {}
+
+    async def close(self):
+        """
+        Release the pooled HTTP connections held by this client.
+        """
+        await self.request.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def create_webhook(self, url: str, scope: str, organization: str, signing_key: str=None, user: str=None, event_types: List[str]=("canceled", "created")) -> MutableMapping:
+        """
+        Create a Webhook Subscription. See CalendlyAPI.create_webhook.
+        """
+        events = [self.event_types_def[event_type]
+                  for event_type in event_types]
+        data = {'url': url,
+                'events': events,
+                'organization': organization,
+                'scope': scope,
+                'signing_key': signing_key}
+
+        if scope == 'user':
+            if user is None:
+                raise CalendlyException
+            data['user'] = user
+
+        response = await self.request.post(WEBHOOK, data)
+        await self.request.invalidate_cache(WEBHOOK)
+        return self.request.decode(response)
+
+    async def list_webhooks(self, organization: str, scope: str, user: str=None, count: int=20, sort: str=None, page_token: str=None, model: bool=False) -> List[MutableMapping]:
+        """
+        Get a List of Webhook subscriptions. See CalendlyAPI.list_webhooks.
+        """
+        data = {'organization': organization,
+                'scope': scope,
+                'count': count}
+
+        if sort is not None:
+            data['sort'] = sort
+
+        if page_token:
+            data['page_token'] = page_token
+
+        if scope == 'user':
+            if user is None:
+                raise CalendlyException
+            data['user'] = user
+
+        response = await self.request.get(WEBHOOK, data)
+        if model:
+            return to_models(WebhookSubscription, self.request.decode(response))
+        return self.request.decode(response)
+
+    async def delete_webhook(self, id: str) -> MutableMapping:
+        """
+        Delete a Webhook subscription. See CalendlyAPI.delete_webhook.
+        """
+        dict_response = {'success': True}
+        response = await self.request.delete(f'{WEBHOOK}/{id}')
+        await self.request.invalidate_cache(WEBHOOK)
+        dict_response['success'] = response.status_code == 200
+        try:
+            json_response = self.request.decode(response)
+        except ValueError:
+            json_response = {}
+        dict_response.update(json_response)
+        return dict_response
+
+    async def get_webhook(self, uuid: str, model: bool=False) -> MutableMapping:
+        """
+        Get a Webhook Subscription. See CalendlyAPI.get_webhook.
+        """
+        response = await self.request.get(f'{WEBHOOK}/{uuid}')
+        if model:
+            return to_model(WebhookSubscription, self.request.decode(response))
+        return self.request.decode(response)
+
+    async def about(self) -> MutableMapping:
+        """
+        Returns basic information about the user account.
+        """
+        response = await self.request.get(ME)
+        return self.request.decode(response)
+
+    async def list_event_types(self, count: int=20, organization: str=None, page_token: str=None, sort: str=None, user_uri: str=None, model: bool=False) -> MutableMapping:
+        """
+        Returns all Event Types associated with a specified user. See CalendlyAPI.list_event_types.
+        """
+        data = {"count": count}
+        if organization:
+            data['organization'] = organization
+        if page_token:
+            data['page_token'] = page_token
+        if sort:
+            data['sort'] = sort
+        if user_uri:
+            data['user'] = user_uri
+        response = await self.request.get(EVENT_TYPE, data)
+        if model:
+            return to_models(EventType, self.request.decode(response))
+        return self.request.decode(response)
+
+    async def get_event_type(self, uuid: str, model: bool=False) -> MutableMapping:
+        """
+        Returns event type associated with the specified UUID.
+        """
+        data = {"uuid": uuid}
+        response = await self.request.get(f'{EVENT_TYPE}/' + uuid, data)
+        if model:
+            return to_model(EventType, self.request.decode(response))
+        return self.request.decode(response)
+
+    async def list_events(self, count: int=20, organization: str=None, sort: str=None, user_uri: str=None, status: str=None, min_start_time: str=None, max_start_time: str=None, invitee_email: str=None, model: bool=False) -> MutableMapping:
+        """
+        Returns a List of Events. See CalendlyAPI.list_events.
+        """
+        data = {'count': count}
+        if organization:
+            data['organization'] = organization
+        if sort:
+            data['sort'] = sort
+        if user_uri:
+            data['user'] = user_uri
+        if status:
+            data['status'] = status
+        if min_start_time:
+            data['min_start_time'] = min_start_time
+        if max_start_time:
+            data['max_start_time'] = max_start_time
+        if invitee_email:
+            data['invitee_email'] = invitee_email
+        response = await self.request.get(EVENTS, data)
+        if model:
+            return to_models(ScheduledEvent, self.request.decode(response))
+        return self.request.decode(response)
+
+    async def get_event_invitee(self, event_uuid: str, invitee_uuid: str, model: bool=False) -> MutableMapping:
+        """
+        Returns information about an invitee associated with a URI.
+        """
+        url = f'{EVENTS}/' + event_uuid + '/invitees/' + invitee_uuid
+        response = await self.request.get(url)
+        if model:
+            return to_model(Invitee, self.request.decode(response))
+        return self.request.decode(response)
+
+    async def get_event_details(self, uuid: str, model: bool=False) -> MutableMapping:
+        """
+        Get information about an Event associated with a URI.
+        """
+        url = f'{EVENTS}/' + uuid
+        response = await self.request.get(url)
+        if model:
+            return to_model(ScheduledEvent, self.request.decode(response))
+        return self.request.decode(response)
+
+    async def list_event_invitees(self, uuid: str, count: int=None, status: str=None, email: str=None, sort: str=None, page_token: str=None, model: bool=False) -> List[MutableMapping]:
+        """
+        Returns a list of Invitees for an Event. See CalendlyAPI.list_event_invitees.
+        """
+        url = f'{EVENTS}/' + uuid + '/invitees'
+        data = {}
+        if count:
+            data['count'] = count
+        if status:
+            data['status'] = status
+        if email:
+            data['email'] = email
+        if sort:
+            data['sort'] = sort
+        if page_token:
+            data['page_token'] = page_token
+        response = await self.request.get(url, data or None)
+        if model:
+            return to_models(Invitee, self.request.decode(response))
+        return self.request.decode(response)
+
+    async def iter_event_invitees(self, uuid: str, count: int=100, status: str=None, email: str=None, prefetch: int=0, model: bool=False) -> AsyncIterator[MutableMapping]:
+        """
+        Yield every Invitee of an Event, following all result pages. See CalendlyAPI.iter_event_invitees.
+        """
+        first = await self.list_event_invitees(uuid, count=count, status=status, email=email)
+        async for page in self.iter_pages(first, prefetch):
+            for invitee in page['collection']:
+                yield Invitee.from_dict(invitee) if model else invitee
+
+    def get_event_details_many(self, uuids: Iterable[str], max_workers: int=DEFAULT_BATCH_WORKERS, ordered: bool=True) -> AsyncIterator[BatchResult]:
+        """
+        Get information about many Events concurrently. See CalendlyAPI.get_event_details_many.
+        """
+        return arun_batch(self.get_event_details, uuids, max_workers, ordered)
+
+    def list_event_invitees_many(self, uuids: Iterable[str], max_workers: int=DEFAULT_BATCH_WORKERS, ordered: bool=True) -> AsyncIterator[BatchResult]:
+        """
+        Get the Invitees of many Events concurrently. See CalendlyAPI.list_event_invitees_many.
+        """
+        return arun_batch(self.list_event_invitees, uuids, max_workers, ordered)
+
+    def iter_pages(self, first_page: MutableMapping, prefetch: int=0) -> AsyncIterator[MutableMapping]:
+        """
+        Yield result pages one at a time, following `pagination.next_page` lazily.
+        With `prefetch`, up to that many pages are fetched ahead in a background task.
+        """
+        async def fetch_page(url):
+            return self.request.decode(await self.request.get(url))
+
+        return aiter_pages(fetch_page, first_page, prefetch)
+
+    async def iter_webhooks(self, organization: str, scope: str, user: str=None, prefetch: int=0, model: bool=False) -> AsyncIterator[MutableMapping]:
+        """
+        Yield every Webhook subscription page by page. See CalendlyAPI.iter_webhooks.
+        """
+        first = await self.list_webhooks(organization, scope, user=user, count=100)
+        async for page in self.iter_pages(first, prefetch):
+            for subscription in page['collection']:
+                yield WebhookSubscription.from_dict(subscription) if model else subscription
+
+    async def sync_webhooks(self, desired: Iterable[WebhookSpec], groups: Iterable[tuple]=(), max_workers: int=DEFAULT_BATCH_WORKERS,
+                            dry_run: bool=False) -> WebhookSyncReport:
+        """
+        Make the Webhook subscriptions match `desired`. See CalendlyAPI.sync_webhooks.
+        At most `max_workers` create/delete requests are in flight at once.
+        """
+        desired = list(desired)
+        groups = set(groups) | {group_key(spec) for spec in desired}
+        existing = []
+        for organization, scope, user in sorted(groups, key=str):
+            existing.extend([subscription async for subscription in self.iter_webhooks(organization, scope, user)])
+        to_create, to_delete, unchanged = diff_webhooks(desired, existing, self.event_types_def)
+        if dry_run:
+            return WebhookSyncReport(to_create, to_delete, unchanged, [])
+
+        short_names = {name: short for short, name in self.event_types_def.items()}
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def apply(change):
+            async with semaphore:
+                try:
+                    if isinstance(change, WebhookSpec):
+                        event_types = [short_names.get(event, event) for event in change.events]
+                        result = await self.create_webhook(change.url, change.scope, change.organization,
+                                                           change.signing_key, change.user, event_types)
+                    else:
+                        result = await self.delete_webhook(change.rsplit('/', 1)[-1])
+                    return BatchResult(change, result, None)
+                except Exception as error:
+                    return BatchResult(change, None, error)
+
+        created, deleted, errors = [], [], []
+        for changes, applied in ((to_delete, deleted), (to_create, created)):
+            for result in await asyncio.gather(*map(apply, changes)):
+                if result.error is not None:
+                    errors.append(result)
+                else:
+                    applied.append(result.item)
+        return WebhookSyncReport(created, deleted, unchanged, errors)
+
+    async def iter_event_types(self, user_uri: str, prefetch: int=0, model: bool=False) -> AsyncIterator[MutableMapping]:
+        """
+        Yield event types page by page. See CalendlyAPI.iter_event_types.
+        """
+        first = await self.list_event_types(user_uri=user_uri, count=100)
+        async for page in self.iter_pages(first, prefetch):
+            for event_type in page['collection']:
+                yield EventType.from_dict(event_type) if model else event_type
+
+    async def iter_scheduled_events(self, user_uri: str, min_start_time: str=None, max_start_time: str=None, invitee_email: str=None, prefetch: int=0, model: bool=False) -> AsyncIterator[MutableMapping]:
+        """
+        Yield scheduled events page by page. See CalendlyAPI.iter_scheduled_events.
+        """
+        first = await self.list_events(user_uri=user_uri, count=100, min_start_time=min_start_time, max_start_time=max_start_time, invitee_email=invitee_email)
+        async for page in self.iter_pages(first, prefetch):
+            for event in page['collection']:
+                yield ScheduledEvent.from_dict(event) if model else event
+
+    async def get_all_event_types(self, user_uri: str, prefetch: int=0, model: bool=False) -> List[MutableMapping]:
+        """
+        Get all event types by crawling on all result pages.
+        """
+        return [event_type async for event_type in self.iter_event_types(user_uri, prefetch, model)]
+
+    async def get_all_scheduled_events(self, user_uri: str, min_start_time: str=None, max_start_time: str=None, invitee_email: str=None,
+                                       shards: int=None, max_workers: int=DEFAULT_SHARD_WORKERS, min_shard_duration: timedelta=DEFAULT_MIN_SHARD_DURATION,
+                                       prefetch: int=0, model: bool=False) -> List[MutableMapping]:
+        """
+        Get all scheduled events by crawling on all result pages. See CalendlyAPI.get_all_scheduled_events.
+        With `shards`, at most `max_workers` sub-windows are paginated at once.
+        """
+        if not shards:
+            return [event async for event in self.iter_scheduled_events(user_uri, min_start_time, max_start_time, invitee_email, prefetch, model)]
+
+        if not (min_start_time and max_start_time):
+            raise CalendlyException("Sharded fetch requires both min_start_time and max_start_time.")
+
+        semaphore = asyncio.Semaphore(max_workers)
+        events_by_uri = {}
+
+        async def fetch_window(window):
+            lower, upper = window
+            async with semaphore:
+                first = await self.list_events(user_uri=user_uri, count=100, sort='start_time:asc', min_start_time=lower,
+                                               max_start_time=upper, invitee_email=invitee_email)
+                windows = split_dense_window(first, lower, upper, max_workers, min_shard_duration)
+                if windows:
+                    events = first['collection']
+                else:
+                    windows = []
+                    events = [event async for page in self.iter_pages(first, prefetch) for event in page['collection']]
+            for event in events:
+                events_by_uri[event['uri']] = event
+            await asyncio.gather(*map(fetch_window, windows))
+
+        await asyncio.gather(*map(fetch_window, split_window(min_start_time, max_start_time, shards)))
+
+        events = sorted(events_by_uri.values(), key=lambda event: parse_time(event['start_time']))
+        if model:
+            return [ScheduledEvent.from_dict(event) for event in events]
+        return events
+
+    async def get_scheduling_url_index(self, user_uri: str, refresh: bool=False) -> MutableMapping:
+        """
+        Map every event type URI of a user to its public scheduling url. See CalendlyAPI.get_scheduling_url_index.
+        """
+        async with self._scheduling_url_lock(user_uri):
+            return (await self._scheduling_url_index(user_uri, refresh)).urls
+
+    def _scheduling_url_lock(self, user_uri: str) -> asyncio.Lock:
+        # Created from a coroutine, so that the lock belongs to the running loop on every Python version.
+        lock = self._scheduling_url_locks.get(user_uri)
+        if lock is None:
+            lock = self._scheduling_url_locks[user_uri] = asyncio.Lock()
+        return lock
+
+    async def _scheduling_url_index(self, user_uri: str, refresh: bool=False, miss_refreshed_at: float=None) -> SchedulingUrlIndex:
+        index = self._scheduling_url_indexes.get(user_uri)
+        if refresh or index is None or index.expired(self.scheduling_url_index_ttl, time.monotonic()):
+            urls = {event_type['uri']: event_type['scheduling_url'] async for event_type in self.iter_event_types(user_uri)}
+            index = SchedulingUrlIndex(urls, time.monotonic(), miss_refreshed_at)
+            self._scheduling_url_indexes[user_uri] = index
+        return index
+
+    def invalidate_scheduling_url_index(self, user_uri: str=None):
+        """
+        Forget the scheduling url index of a user, or of every user.
+        """
+        if user_uri is None:
+            self._scheduling_url_indexes.clear()
+        else:
+            self._scheduling_url_indexes.pop(user_uri, None)
+
+    async def _resolve_scheduling_url(self, event_type_uri: str, user_uri: str) -> str:
+        async with self._scheduling_url_lock(user_uri):
+            index = await self._scheduling_url_index(user_uri)
+            now = time.monotonic()
+            if event_type_uri not in index.urls and index.may_refresh_on_miss(event_type_uri, self.scheduling_url_miss_interval, now):
+                index = await self._scheduling_url_index(user_uri, refresh=True, miss_refreshed_at=now)
+            if event_type_uri not in index.urls:
+                index.unknown.add(event_type_uri)
+            return index.urls.get(event_type_uri)
+
+    async def convert_event_to_original_url(self, event_uri: str, user_uri: str) -> str:
+        """
+        Convert event url from calendly's inner API convention to the original public url of the event.
+        See CalendlyAPI.convert_event_to_original_url.
+        """
+        event_type_uri = (await self.get_event_details(event_uri))['resource']['event_type']
+        return await self._resolve_scheduling_url(event_type_uri, user_uri)
+
+    async def convert_events_to_original_urls(self, event_uris: List[str], user_uri: str, max_workers: int=DEFAULT_BATCH_WORKERS) -> List[str]:
+        """
+        Convert many event urls to their public urls, fetching the event details concurrently.
+        See CalendlyAPI.convert_events_to_original_urls.
+        """
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def get_event_details(event_uri):
+            async with semaphore:
+                return await self.get_event_details(event_uri)
+
+        details = await asyncio.gather(*map(get_event_details, event_uris))
+        return [await self._resolve_scheduling_url(detail['resource']['event_type'], user_uri) for detail in details]
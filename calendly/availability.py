@@ -0,0 +1,313 @@
+import bisect
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Iterator, List, MutableMapping, Optional, Tuple, Union
+
+from calendly.calendly import CalendlyAPI
+from calendly.utils.batch import BatchResult, DEFAULT_BATCH_WORKERS, run_batch
+from calendly.utils.sharding import format_time, parse_time
+from calendly.webhooks import WebhookEvent
+
+__license__ = "MIT"
+
+DEFAULT_HORIZON = timedelta(days=60)
+
+Interval = namedtuple('Interval', ['start', 'end'])
+Interval.__doc__ = """
+Half-open [start, end) time range, as timezone-aware UTC datetimes.
+"""
+
+Time = Union[datetime, str, float]
+
+
+def to_timestamp(value: Time) -> float:
+    """
+    Unix timestamp of a datetime, a Calendly timestamp string or a number of seconds.
+    """
+    if isinstance(value, str):
+        return parse_time(value).timestamp()
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return float(value)
+
+
+def _to_datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def is_busy(event: MutableMapping) -> bool:
+    """
+    Whether a json scheduled event blocks its hosts' time: it is active and, when the payload says so,
+    still has active invitees.
+    """
+    if event.get('status', 'active') != 'active':
+        return False
+    counter = event.get('invitees_counter') or {}
+    return counter.get('active', 1) > 0
+
+
+def event_hosts(event: MutableMapping) -> List[str]:
+    return [membership['user'] for membership in event.get('event_memberships') or () if membership.get('user')]
+
+
+class BusyIndex(object):
+    """
+    Busy time of one user, as sorted arrays of disjoint merged intervals.
+
+    `starts` and `ends` hold the merged busy ranges, so free/busy and slot queries bisect them in
+    O(log n) plus the size of the answer. The events behind them are kept sorted by start as well;
+    adding or removing one event only re-merges the ranges it touches, so webhook updates never
+    rebuild the whole index. Safe to query and update from several threads.
+    """
+
+    def __init__(self, events: Iterable[MutableMapping]=(), coverage: Tuple[Time, Time]=None):
+        """
+        Args:
+            events (iterable, optional): json scheduled events. Only busy ones are indexed.
+            coverage (tuple, optional): (start, end) of the period the events were loaded for. Times outside it
+                are reported as free, since nothing is known about them.
+        """
+        self._lock = threading.RLock()
+        self.coverage = tuple(to_timestamp(value) for value in coverage) if coverage else None
+        self._events = {}
+        self._event_starts = []
+        self._event_keys = []
+        self.starts = []
+        self.ends = []
+
+        # The same event can be listed twice, e.g. on two pages or in overlapping loads: the last copy wins.
+        latest = {event['uri']: event for event in events}
+        for uri, event in latest.items():
+            if is_busy(event):
+                self._events[uri] = (to_timestamp(event['start_time']), to_timestamp(event['end_time']))
+        intervals = sorted((start, uri) for uri, (start, _) in self._events.items())
+        self._event_starts = [start for start, _ in intervals]
+        self._event_keys = intervals
+        self._merge_into(0, len(self.starts), [self._events[uri] for _, uri in intervals])
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __contains__(self, uri: str) -> bool:
+        return uri in self._events
+
+    def _merge_into(self, low: int, high: int, intervals: Iterable[Tuple[float, float]]):
+        """
+        Replace the merged ranges starts[low:high] with the merge of `intervals`, sorted by start.
+        """
+        starts, ends = [], []
+        for start, end in intervals:
+            if starts and start <= ends[-1]:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        self.starts[low:high] = starts
+        self.ends[low:high] = ends
+
+    def _events_between(self, start: float, end: float) -> List[Tuple[float, float]]:
+        low = bisect.bisect_left(self._event_starts, start)
+        high = bisect.bisect_right(self._event_starts, end)
+        return [self._events[uri] for _, uri in self._event_keys[low:high]]
+
+    def add(self, uri: str, start_time: Time, end_time: Time):
+        """
+        Mark [start_time, end_time) busy for the scheduled event `uri`, replacing its previous times.
+        """
+        start, end = to_timestamp(start_time), to_timestamp(end_time)
+        with self._lock:
+            if self._events.get(uri) == (start, end):
+                return
+            self.remove(uri)
+            self._events[uri] = (start, end)
+            position = bisect.bisect_left(self._event_keys, (start, uri))
+            self._event_keys.insert(position, (start, uri))
+            self._event_starts.insert(position, start)
+
+            # Merged ranges overlapping or touching [start, end] absorb the new interval.
+            low = bisect.bisect_left(self.ends, start)
+            high = bisect.bisect_right(self.starts, end)
+            if low < high:
+                start, end = min(start, self.starts[low]), max(end, self.ends[high - 1])
+            self.starts[low:high] = [start]
+            self.ends[low:high] = [end]
+
+    def remove(self, uri: str) -> bool:
+        """
+        Free the time of the scheduled event `uri`, unless other events overlap it. Returns False for unknown events.
+        """
+        with self._lock:
+            interval = self._events.pop(uri, None)
+            if interval is None:
+                return False
+            position = bisect.bisect_left(self._event_keys, (interval[0], uri))
+            del self._event_keys[position]
+            del self._event_starts[position]
+
+            # Re-merge the events of the one merged range which contained the removed event.
+            index = bisect.bisect_right(self.starts, interval[0]) - 1
+            block_start, block_end = self.starts[index], self.ends[index]
+            self._merge_into(index, index + 1, self._events_between(block_start, block_end))
+            return True
+
+    def update(self, event: MutableMapping) -> bool:
+        """
+        Apply the current state of a json scheduled event: index it while busy, drop it once canceled.
+        Returns whether the index changed.
+        """
+        with self._lock:
+            if is_busy(event):
+                before = self._events.get(event['uri'])
+                self.add(event['uri'], event['start_time'], event['end_time'])
+                return before != self._events[event['uri']]
+            return self.remove(event['uri'])
+
+    def _overlapping(self, start: float, end: float) -> Tuple[int, int]:
+        return bisect.bisect_right(self.ends, start), bisect.bisect_left(self.starts, end)
+
+    def is_free(self, start_time: Time, end_time: Time) -> bool:
+        start, end = to_timestamp(start_time), to_timestamp(end_time)
+        with self._lock:
+            low, high = self._overlapping(start, end)
+            return low >= high
+
+    def busy(self, start_time: Time, end_time: Time) -> List[Interval]:
+        """
+        Busy ranges within [start_time, end_time), clipped to the window.
+        """
+        start, end = to_timestamp(start_time), to_timestamp(end_time)
+        with self._lock:
+            low, high = self._overlapping(start, end)
+            return [Interval(_to_datetime(max(self.starts[index], start)), _to_datetime(min(self.ends[index], end)))
+                    for index in range(low, high)]
+
+    def free(self, start_time: Time, end_time: Time) -> List[Interval]:
+        """
+        Free ranges within [start_time, end_time): the complement of `busy`.
+        """
+        start, end = to_timestamp(start_time), to_timestamp(end_time)
+        return [Interval(_to_datetime(lower), _to_datetime(upper)) for lower, upper in self._gaps(start, end)]
+
+    def _gaps(self, start: float, end: float) -> Iterator[Tuple[float, float]]:
+        with self._lock:
+            low, high = self._overlapping(start, end)
+            busy = list(zip(self.starts[low:high], self.ends[low:high]))
+        cursor = start
+        for busy_start, busy_end in busy:
+            if busy_start > cursor:
+                yield cursor, busy_start
+            cursor = max(cursor, busy_end)
+        if cursor < end:
+            yield cursor, end
+
+    def slots(self, start_time: Time, end_time: Time, duration: timedelta, step: timedelta=None) -> Iterator[Interval]:
+        """
+        Yield the open slots of `duration` within [start_time, end_time), starting every `step`
+        (defaults to `duration`) from the start of the window and skipping those overlapping busy time.
+        """
+        start, end = to_timestamp(start_time), to_timestamp(end_time)
+        length = duration.total_seconds()
+        increment = (step or duration).total_seconds()
+        for gap_start, gap_end in self._gaps(start, end):
+            slot = start + -(-(gap_start - start) // increment) * increment
+            while slot + length <= gap_end:
+                yield Interval(_to_datetime(slot), _to_datetime(slot + length))
+                slot += increment
+
+    def next_slot(self, after: Time, duration: timedelta, until: Time=None) -> Optional[Interval]:
+        """
+        Earliest free range of `duration` starting at or after `after` and ending by `until`
+        (defaults to the end of the coverage, or unbounded), or None.
+        """
+        cursor = to_timestamp(after)
+        length = duration.total_seconds()
+        limit = to_timestamp(until) if until is not None else (self.coverage[1] if self.coverage else float('inf'))
+        with self._lock:
+            index = bisect.bisect_right(self.ends, cursor)
+            while index < len(self.starts) and self.starts[index] < cursor + length:
+                cursor = max(cursor, self.ends[index])
+                index += 1
+        if cursor + length > limit:
+            return None
+        return Interval(_to_datetime(cursor), _to_datetime(cursor + length))
+
+
+class AvailabilityEngine(object):
+    """
+    Free/busy and open slot queries for many Calendly users, answered from local BusyIndexes.
+
+    Each user's scheduled events for the next `horizon` are fetched once with
+    `get_all_scheduled_events` and kept up to date from `invitee.created` and `invitee.canceled`
+    webhook deliveries, whose payload carries the full scheduled event. Register `apply` with a
+    WebhookReceiver: `receiver.on('*')(engine.apply)`.
+    """
+
+    def __init__(self, api: CalendlyAPI, horizon: timedelta=DEFAULT_HORIZON, clock: Callable[[], datetime]=None):
+        """
+        Args:
+            api (CalendlyAPI): Client used to load scheduled events.
+            horizon (timedelta, optional): How far ahead of now events are loaded. Defaults to 60 days.
+            clock (callable, optional): Returns the current UTC datetime.
+        """
+        self.api = api
+        self.horizon = horizon
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+        self.indexes = {}
+        self._lock = threading.Lock()
+
+    def load(self, user_uri: str, min_start_time: Time=None, max_start_time: Time=None, prefetch: int=1) -> BusyIndex:
+        """
+        Fetch the scheduled events of `user_uri` and (re)build its index. Defaults to the window from now to now + horizon.
+        """
+        now = self.clock()
+        start = _to_datetime(to_timestamp(min_start_time)) if min_start_time is not None else now
+        end = _to_datetime(to_timestamp(max_start_time)) if max_start_time is not None else now + self.horizon
+
+        # Events which started before the window may still be running at its start.
+        events = self.api.get_all_scheduled_events(user_uri, min_start_time=format_time(start - timedelta(days=1)),
+                                                   max_start_time=format_time(end), prefetch=prefetch)
+        index = BusyIndex(events, coverage=(start, end))
+        with self._lock:
+            self.indexes[user_uri] = index
+        return index
+
+    def load_many(self, user_uris: Iterable[str], max_workers: int=DEFAULT_BATCH_WORKERS, **kwargs) -> Iterator[BatchResult]:
+        """
+        Load the indexes of many users concurrently, yielding a BatchResult per user.
+        """
+        return run_batch(lambda user_uri: self.load(user_uri, **kwargs), user_uris, max_workers=max_workers)
+
+    def index(self, user_uri: str) -> BusyIndex:
+        """
+        Index of `user_uri`, loaded on first use.
+        """
+        index = self.indexes.get(user_uri)
+        return index if index is not None else self.load(user_uri)
+
+    def apply(self, event: WebhookEvent) -> List[str]:
+        """
+        Update the indexes of the hosts of the scheduled event in a webhook delivery.
+        Hosts without a loaded index are skipped. Returns the URIs of the users whose index changed.
+        """
+        scheduled_event = event.payload.get('scheduled_event')
+        if not isinstance(scheduled_event, dict) or 'start_time' not in scheduled_event:
+            return []
+        changed = []
+        for user_uri in event_hosts(scheduled_event):
+            index = self.indexes.get(user_uri)
+            if index is not None and index.update(scheduled_event):
+                changed.append(user_uri)
+        return changed
+
+    def free_busy(self, user_uri: str, start_time: Time, end_time: Time) -> MutableMapping:
+        index = self.index(user_uri)
+        return {'busy': index.busy(start_time, end_time), 'free': index.free(start_time, end_time)}
+
+    def next_available(self, user_uri: str, duration: timedelta, after: Time=None, until: Time=None) -> Optional[Interval]:
+        return self.index(user_uri).next_slot(after if after is not None else self.clock(), duration, until)
+
+    def slots(self, user_uri: str, start_time: Time, end_time: Time, duration: timedelta, step: timedelta=None) -> List[Interval]:
+        return list(self.index(user_uri).slots(start_time, end_time, duration, step))
@@ -1,10 +1,50 @@
-import json
-from typing import List, MutableMapping
-
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from typing import Iterable, Iterator, List, MutableMapping
+
+from calendly.models import EventType, Invitee, ScheduledEvent, WebhookSubscription, to_model, to_models
 from calendly.utils.api import CalendlyReq
+from calendly.utils.batch import BatchResult, DEFAULT_BATCH_WORKERS, run_batch
 from calendly.utils.constants import WEBHOOK, EVENTS, ME, EVENT_TYPE
+from calendly.utils.pagination import iter_pages
+from calendly.utils.sharding import parse_time, split_dense_window, split_window
+from calendly.utils.webhook_sync import WebhookSpec, WebhookSyncReport, diff_webhooks, group_key
 from calendly.exceptions import CalendlyException
 
+DEFAULT_SHARD_WORKERS = 8
+DEFAULT_MIN_SHARD_DURATION = timedelta(hours=1)
+DEFAULT_SCHEDULING_URL_INDEX_TTL = 300
+DEFAULT_SCHEDULING_URL_MISS_INTERVAL = 30
+
+
+class SchedulingUrlIndex(object):
+    """
+    Event type URI -> scheduling url index of one user, remembering the URIs it could not resolve.
+    """
+
+    __slots__ = ('urls', 'built_at', 'unknown', 'miss_refreshed_at')
+
+    def __init__(self, urls: MutableMapping, built_at: float, miss_refreshed_at: float=None):
+        self.urls = urls
+        self.built_at = built_at
+        self.unknown = set()
+        self.miss_refreshed_at = miss_refreshed_at
+
+    def expired(self, ttl: float, now: float) -> bool:
+        return now - self.built_at > ttl
+
+    def may_refresh_on_miss(self, event_type_uri: str, interval: float, now: float) -> bool:
+        """
+        Whether a miss on `event_type_uri` should rebuild the index: not for URIs already known to be
+        missing (deleted or another user's event types), and at most once per `interval` seconds.
+        """
+        if event_type_uri in self.unknown:
+            return False
+        return self.miss_refreshed_at is None or now - self.miss_refreshed_at >= interval
+
 
 class CalendlyAPI(object):
 
@@ -13,16 +53,40 @@ class CalendlyAPI(object):
         "created": "invitee.created"
     }
 
-    def __init__(self, token: str):
+    def __init__(self, token: str=None, scheduling_url_index_ttl: float=DEFAULT_SCHEDULING_URL_INDEX_TTL,
+                 scheduling_url_miss_interval: float=DEFAULT_SCHEDULING_URL_MISS_INTERVAL, **kwargs):
         """
         Constructor. Uses Bearer Token for Authentication.
 
         Parameters
         ----------
         token : str 
-            Personal Access Token
+            Personal Access Token. Omit it when passing a `token_manager` and `tenant` instead.
+        scheduling_url_index_ttl : float, optional
+            Seconds before the event type -> scheduling url index of a user is rebuilt
+        scheduling_url_miss_interval : float, optional
+            Minimum seconds between two rebuilds of a user's index caused by unknown event types
+        **kwargs
+            Extra options for CalendlyReq, e.g. a shared `session`, `pool_connections`, `pool_maxsize` or a response `cache`
+        """
+        self.request = CalendlyReq(token, **kwargs)
+        self.scheduling_url_index_ttl = scheduling_url_index_ttl
+        self.scheduling_url_miss_interval = scheduling_url_miss_interval
+        self._scheduling_url_indexes = {}
+        self._scheduling_url_locks = defaultdict(threading.Lock)
+        self._scheduling_url_index_lock = threading.Lock()
+
+    def close(self):
         """
-        self.request = CalendlyReq(token)
+        Release the pooled HTTP connections held by this client.
+        """
+        self.request.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def create_webhook(self, url: str, scope: str, organization: str, signing_key: str=None, user: str=None, event_types: List[str]=("canceled", "created")) -> MutableMapping:
         """
@@ -54,9 +118,10 @@ class CalendlyAPI(object):
             data['user'] = user
 
         response = self.request.post(WEBHOOK, data)
-        return response.json()
+        self.request.invalidate_cache(WEBHOOK)
+        return self.request.decode(response)
 
-    def list_webhooks(self, organization: str, scope: str, user: str=None, count: int=20, sort: str=None) -> List[MutableMapping]:
+    def list_webhooks(self, organization: str, scope: str, user: str=None, count: int=20, sort: str=None, page_token: str=None, model: bool=False) -> List[MutableMapping]:
         """ 
         Get a List of Webhook subscriptions for an Organization or User with a UUID.
         Reference:
@@ -70,6 +135,8 @@ class CalendlyAPI(object):
                 Accepts comma-seperated list of {field}:{direction} values.
                 Supported fields are: created_at, Sort direction is specified as: asc, desc
             user (str, optional): If scope is set to "user", then user reference is required.
+            page_token (str, optional): Token of the page to return. Defaults to None.
+            model (bool, optional): Return WebhookSubscription models in the collection instead of json dicts. Defaults to False.
 
         Raises:
             CalendlyException: [description]
@@ -84,13 +151,18 @@ class CalendlyAPI(object):
         if (sort != None):
             data['sort'] = sort
 
+        if page_token:
+            data['page_token'] = page_token
+
         if (scope == 'user'):
             if (user == None):
                 raise CalendlyException
             data['user'] = user
 
         response = self.request.get(WEBHOOK, data)
-        return response.json()
+        if model:
+            return to_models(WebhookSubscription, self.request.decode(response))
+        return self.request.decode(response)
 
     def delete_webhook(self, id: str) -> MutableMapping:
         """
@@ -104,26 +176,30 @@ class CalendlyAPI(object):
         """
         dict_response = {'success': True}
         response = self.request.delete(f'{WEBHOOK}/{id}')
+        self.request.invalidate_cache(WEBHOOK)
         dict_response['success'] = response.status_code == 200
         try:
-            json_response = response.json()
-        except json.JSONDecodeError:
+            json_response = self.request.decode(response)
+        except ValueError:
             json_response = {}
         dict_response.update(json_response)
         return dict_response
 
-    def get_webhook(self, uuid: str) -> MutableMapping:
+    def get_webhook(self, uuid: str, model: bool=False) -> MutableMapping:
         """
         Get a Webhook Subscription for an Organization or User with specified UUID.
 
         Args:
             uuid (str): Webhook uuid
+            model (bool, optional): Return a WebhookSubscription model instead of a json dict. Defaults to False.
 
         Returns:
             dict: Json decoded response from Calenderly API for Get webhook action.
         """
         response = self.request.get(f'{WEBHOOK}/{uuid}')
-        return response.json()
+        if model:
+            return to_model(WebhookSubscription, self.request.decode(response))
+        return self.request.decode(response)
 
     def about(self) -> MutableMapping:
         """
@@ -133,9 +209,9 @@ class CalendlyAPI(object):
             dict: Json decoded response about the basic information about the user.
         """
         response = self.request.get(ME)
-        return response.json()
+        return self.request.decode(response)
 
-    def list_event_types(self, count: int=20, organization: str=None, page_token: str=None, sort: str=None, user_uri: str=None) -> MutableMapping:
+    def list_event_types(self, count: int=20, organization: str=None, page_token: str=None, sort: str=None, user_uri: str=None, model: bool=False) -> MutableMapping:
         """
         Returns all Event Types associated with a specified user.
 
@@ -145,6 +221,7 @@ class CalendlyAPI(object):
             page_token (str, optional): Toke to pass the next portion of the collection. Defaults to None.
             sort (str, optional): Order results by specified field and direction. Defaults to None.
             user_uri (str, optional): user's URI. Defaults to None.
+            model (bool, optional): Return EventType models in the collection instead of json dicts. Defaults to False.
 
         Returns:
             dict: json decoded response with list of event types
@@ -159,22 +236,27 @@ class CalendlyAPI(object):
         if user_uri:
             data['user'] = user_uri
         response = self.request.get(EVENT_TYPE, data)
-        return response.json()
+        if model:
+            return to_models(EventType, self.request.decode(response))
+        return self.request.decode(response)
 
-    def get_event_type(self, uuid: str) -> MutableMapping:
+    def get_event_type(self, uuid: str, model: bool=False) -> MutableMapping:
         """Returns event type associated with the specified UUID
 
         Args:
             uuid (str): Event UUID
+            model (bool, optional): Return an EventType model instead of a json dict. Defaults to False.
 
         Returns:
             dict: json decoded response with information about the event
         """
         data = {"uuid": uuid}
         response = self.request.get(f'{EVENT_TYPE}/' + uuid, data)
-        return response.json()
+        if model:
+            return to_model(EventType, self.request.decode(response))
+        return self.request.decode(response)
 
-    def list_events(self, count: int=20, organization: str=None, sort: str=None, user_uri: str=None, status: str=None, min_start_time: str=None, max_start_time: str=None, invitee_email: str=None) -> MutableMapping:
+    def list_events(self, count: int=20, organization: str=None, sort: str=None, user_uri: str=None, status: str=None, min_start_time: str=None, max_start_time: str=None, invitee_email: str=None, model: bool=False) -> MutableMapping:
         """
         Returns a List of Events
 
@@ -187,6 +269,7 @@ class CalendlyAPI(object):
             min_start_time (str, optional): Include events with start times after this UTC time (e.g. "2020-01-02T03:04:05.678Z"). Defaults to None.
             max_start_time (str, optional): Include events with start times prior to this UTC time (e.g. "2020-01-02T03:04:05.678Z"). Defaults to None.
             invitee_email (str, optional): Filter events by invitee email address. Defaults to None.
+            model (bool, optional): Return ScheduledEvent models in the collection instead of json dicts. Defaults to False.
 
         Returns:
             dict: json decoded response of list of events.
@@ -207,101 +290,385 @@ class CalendlyAPI(object):
         if invitee_email:
             data['invitee_email'] = invitee_email
         response = self.request.get(EVENTS, data)
-        return response.json()
+        if model:
+            return to_models(ScheduledEvent, self.request.decode(response))
+        return self.request.decode(response)
 
-    def get_event_invitee(self, event_uuid: str, invitee_uuid: str) -> MutableMapping:
+    def get_event_invitee(self, event_uuid: str, invitee_uuid: str, model: bool=False) -> MutableMapping:
         """
         Returns information about an invitee associated with a URI
 
         Args:
             event_uuid (str): Event's unique identifier
             invitee_uuid (str): Invitee's unique identifier
+            model (bool, optional): Return an Invitee model instead of a json dict. Defaults to False.
 
         Returns:
             dict: json decoded response about invitee information
         """
         url = f'{EVENTS}/' + event_uuid + '/invitees/' + invitee_uuid
         response = self.request.get(url)
-        return response.json()
+        if model:
+            return to_model(Invitee, self.request.decode(response))
+        return self.request.decode(response)
 
-    def get_event_details(self, uuid: str) -> MutableMapping:
+    def get_event_details(self, uuid: str, model: bool=False) -> MutableMapping:
         """
         Get information about an Event associated with a URI.
 
         Args:
             uuid (str): Event's unique identifier
+            model (bool, optional): Return a ScheduledEvent model instead of a json dict. Defaults to False.
 
         Returns:
             dict: json decoded response
         """
         url = f'{EVENTS}/' + uuid
         response = self.request.get(url)
-        return response.json()
+        if model:
+            return to_model(ScheduledEvent, self.request.decode(response))
+        return self.request.decode(response)
 
-    def list_event_invitees(self, uuid: str) -> List[MutableMapping]:
+    def list_event_invitees(self, uuid: str, count: int=None, status: str=None, email: str=None, sort: str=None, page_token: str=None, model: bool=False) -> List[MutableMapping]:
         """
         Returns a list of Invitees for an Event.
 
         Args:
             uuid (str): Event's unique identifier.
+            count (int, optional): Number of rows to return. Defaults to None.
+            status (str, optional): 'active' or 'canceled'. Defaults to None.
+            email (str, optional): Filter invitees by email address. Defaults to None.
+            sort (str, optional): Order results by created_at, e.g. "created_at:asc". Defaults to None.
+            page_token (str, optional): Token to pass the next portion of the collection. Defaults to None.
+            model (bool, optional): Return Invitee models in the collection instead of json dicts. Defaults to False.
 
         Returns:
             dict: json decoded response
         """
         url = f'{EVENTS}/' + uuid + '/invitees'
-        response = self.request.get(url)
-        return response.json()
+        data = {}
+        if count:
+            data['count'] = count
+        if status:
+            data['status'] = status
+        if email:
+            data['email'] = email
+        if sort:
+            data['sort'] = sort
+        if page_token:
+            data['page_token'] = page_token
+        response = self.request.get(url, data or None)
+        if model:
+            return to_models(Invitee, self.request.decode(response))
+        return self.request.decode(response)
+
+    def iter_event_invitees(self, uuid: str, count: int=100, status: str=None, email: str=None, prefetch: int=0, model: bool=False) -> Iterator[MutableMapping]:
+        """
+        Yield every Invitee of an Event, following all result pages.
+
+        Args:
+            uuid (str): Event's unique identifier.
+            count (int, optional): Number of invitees per page. Defaults to 100.
+            status (str, optional): 'active' or 'canceled'. Defaults to None.
+            email (str, optional): Filter invitees by email address. Defaults to None.
+            prefetch (int, optional): Number of pages fetched in the background ahead of the consumer. Defaults to 0.
+            model (bool, optional): Yield Invitee models instead of json dicts. Defaults to False.
+
+        Yields:
+            dict: json invitee object
+        """
+        first = self.list_event_invitees(uuid, count=count, status=status, email=email)
+        for page in self.iter_pages(first, prefetch):
+            if model:
+                yield from map(Invitee.from_dict, page['collection'])
+            else:
+                yield from page['collection']
+
+    def get_event_details_many(self, uuids: Iterable[str], max_workers: int=DEFAULT_BATCH_WORKERS, ordered: bool=True) -> Iterator[BatchResult]:
+        """
+        Get information about many Events concurrently.
+
+        Args:
+            uuids (iterable): Events' unique identifiers.
+            max_workers (int, optional): Maximum number of concurrent requests. Defaults to 8.
+            ordered (bool, optional): Yield results in input order rather than completion order. Defaults to True.
+
+        Yields:
+            BatchResult: (uuid, json decoded response, error). A failed request sets `error` instead of stopping the batch.
+        """
+        return run_batch(self.get_event_details, uuids, max_workers, ordered)
+
+    def list_event_invitees_many(self, uuids: Iterable[str], max_workers: int=DEFAULT_BATCH_WORKERS, ordered: bool=True) -> Iterator[BatchResult]:
+        """
+        Get the Invitees of many Events concurrently.
+
+        Args:
+            uuids (iterable): Events' unique identifiers.
+            max_workers (int, optional): Maximum number of concurrent requests. Defaults to 8.
+            ordered (bool, optional): Yield results in input order rather than completion order. Defaults to True.
+
+        Yields:
+            BatchResult: (uuid, json decoded response, error). A failed request sets `error` instead of stopping the batch.
+        """
+        return run_batch(self.list_event_invitees, uuids, max_workers, ordered)
+
+    def iter_pages(self, first_page: MutableMapping, prefetch: int=0) -> Iterator[MutableMapping]:
+        """
+        Yield result pages one at a time, following `pagination.next_page` lazily.
+        A page is only requested once the previous one has been consumed, unless `prefetch` is set.
+
+        Args:
+            first_page (dict): json decoded response of the first page of a list endpoint.
+            prefetch (int, optional): Number of pages fetched in the background ahead of the consumer. Defaults to 0.
+
+        Yields:
+            dict: json decoded result page
+        """
+        return iter_pages(lambda url: self.request.decode(self.request.get(url)), first_page, prefetch)
+
+    def iter_webhooks(self, organization: str, scope: str, user: str=None, prefetch: int=0, model: bool=False) -> Iterator[MutableMapping]:
+        """
+        Yield every Webhook subscription of an Organization or User, page by page.
+
+        Args:
+            organization (str): Organization URI.
+            scope (str): Either "organization" or "user"
+            user (str, optional): If scope is set to "user", then user reference is required.
+            prefetch (int, optional): Number of pages fetched in the background ahead of the consumer. Defaults to 0.
+            model (bool, optional): Yield WebhookSubscription models instead of json dicts. Defaults to False.
+
+        Yields:
+            dict: json webhook subscription object
+        """
+        first = self.list_webhooks(organization, scope, user=user, count=100)
+        for page in self.iter_pages(first, prefetch):
+            if model:
+                yield from map(WebhookSubscription.from_dict, page['collection'])
+            else:
+                yield from page['collection']
+
+    def sync_webhooks(self, desired: Iterable[WebhookSpec], groups: Iterable[tuple]=(), max_workers: int=DEFAULT_BATCH_WORKERS,
+                      dry_run: bool=False) -> WebhookSyncReport:
+        """
+        Make the Webhook subscriptions match `desired`, creating and deleting only what differs.
+
+        Every (organization, scope, user) group named in `desired` or `groups` is listed in full and
+        its subscriptions are matched with the desired ones on url, events and scope. Missing
+        subscriptions are created and the others deleted, concurrently and paced by the rate limiter.
+        Groups which are not named are left alone. When nothing changed, only the listings are sent.
+
+        Args:
+            desired (iterable): WebhookSpec of every subscription that should exist.
+            groups (iterable, optional): Extra (organization, scope, user) groups to manage, e.g. to delete all their subscriptions.
+            max_workers (int, optional): Maximum number of concurrent create/delete requests. Defaults to 8.
+            dry_run (bool, optional): Only compute the changes. Defaults to False.
+
+        Returns:
+            WebhookSyncReport: created specs, deleted URIs, number of unchanged subscriptions and failures
+        """
+        desired = list(desired)
+        groups = set(groups) | {group_key(spec) for spec in desired}
+        existing = [subscription for organization, scope, user in sorted(groups, key=str)
+                    for subscription in self.iter_webhooks(organization, scope, user)]
+        to_create, to_delete, unchanged = diff_webhooks(desired, existing, self.event_types_def)
+        if dry_run:
+            return WebhookSyncReport(to_create, to_delete, unchanged, [])
+
+        short_names = {name: short for short, name in self.event_types_def.items()}
+
+        def apply(change):
+            if isinstance(change, WebhookSpec):
+                event_types = [short_names.get(event, event) for event in change.events]
+                return self.create_webhook(change.url, change.scope, change.organization, change.signing_key,
+                                           change.user, event_types)
+            return self.delete_webhook(change.rsplit('/', 1)[-1])
+
+        # Calendly refuses a second subscription for the same url, so stale ones are deleted first.
+        created, deleted, errors = [], [], []
+        for changes, applied in ((to_delete, deleted), (to_create, created)):
+            for result in run_batch(apply, changes, max_workers):
+                if result.error is not None:
+                    errors.append(result)
+                else:
+                    applied.append(result.item)
+        return WebhookSyncReport(created, deleted, unchanged, errors)
+
+    def iter_event_types(self, user_uri: str, prefetch: int=0, model: bool=False) -> Iterator[MutableMapping]:
+        """
+        Yield event types page by page, without holding more than one page in memory.
+
+        Args:
+            user_uri (str, optional): User URI.
+            prefetch (int, optional): Number of pages fetched in the background ahead of the consumer. Defaults to 0.
+            model (bool, optional): Yield EventType models instead of json dicts. Defaults to False.
+
+        Yields:
+            dict: json event type object
+        """
+        first = self.list_event_types(user_uri=user_uri, count=100)
+        for page in self.iter_pages(first, prefetch):
+            if model:
+                yield from map(EventType.from_dict, page['collection'])
+            else:
+                yield from page['collection']
+
+    def iter_scheduled_events(self, user_uri: str, min_start_time: str=None, max_start_time: str=None, invitee_email: str=None, prefetch: int=0, model: bool=False) -> Iterator[MutableMapping]:
+        """
+        Yield scheduled events page by page, without holding more than one page in memory.
+
+        Args:
+            user_uri (str, optional): User URI.
+            min_start_time (str, optional): Include events with start times after this UTC time (e.g. "2020-01-02T03:04:05.678Z"). Defaults to None.
+            max_start_time (str, optional): Include events with start times prior to this UTC time (e.g. "2020-01-02T03:04:05.678Z"). Defaults to None.
+            invitee_email (str, optional): Filter events by invitee email address. Defaults to None.
+            prefetch (int, optional): Number of pages fetched in the background ahead of the consumer. Defaults to 0.
+            model (bool, optional): Yield ScheduledEvent models instead of json dicts. Defaults to False.
 
-    def get_all_event_types(self, user_uri: str) -> List[MutableMapping]:
+        Yields:
+            dict: json scheduled event object
+        """
+        first = self.list_events(user_uri=user_uri, count=100, min_start_time=min_start_time, max_start_time=max_start_time, invitee_email=invitee_email)
+        for page in self.iter_pages(first, prefetch):
+            if model:
+                yield from map(ScheduledEvent.from_dict, page['collection'])
+            else:
+                yield from page['collection']
+
+    def get_all_event_types(self, user_uri: str, prefetch: int=0, model: bool=False) -> List[MutableMapping]:
         """
         Get all event types by recursively crawling on all result pages.
 
         Args:
             user_uri (str, optional): User URI.
+            prefetch (int, optional): Number of pages fetched in the background ahead of the consumer. Defaults to 0.
+            model (bool, optional): Return EventType models instead of json dicts. Defaults to False.
 
         Returns:
             list: json event type objects
         """
-        first = self.list_event_types(user_uri=user_uri, count=100)
-        next_page = first['pagination']['next_page']
-        
-        data = first['collection']
+        return list(self.iter_event_types(user_uri, prefetch, model))
 
-        while next_page:
-            page = self.request.get(next_page).json()
-            data += page['collection']
-            next_page = page['pagination']['next_page']
-        
-        return data
-
-    def get_all_scheduled_events(self, user_uri: str, min_start_time: str=None, max_start_time: str=None, invitee_email: str=None) -> List[MutableMapping]:
+    def get_all_scheduled_events(self, user_uri: str, min_start_time: str=None, max_start_time: str=None, invitee_email: str=None,
+                                 shards: int=None, max_workers: int=DEFAULT_SHARD_WORKERS, min_shard_duration: timedelta=DEFAULT_MIN_SHARD_DURATION,
+                                 prefetch: int=0, model: bool=False) -> List[MutableMapping]:
         """
         Get all scheduled events by recursively crawling on all result pages.
 
+        When `shards` is given, [min_start_time, max_start_time) is split into that many sub-windows
+        which are paginated concurrently. A sub-window holding more than one page of events keeps its
+        first page and splits the rest of the window again, into as many sub-windows as pages are
+        estimated to remain from the first page's density, down to `min_shard_duration`.
+        Results are merged in start_time order and de-duplicated on `uri`.
+
         Args:
             user_uri (str, optional): User URI.
             min_start_time (str, optional): Include events with start times after this UTC time (e.g. "2020-01-02T03:04:05.678Z"). Defaults to None.
             max_start_time (str, optional): Include events with start times prior to this UTC time (e.g. "2020-01-02T03:04:05.678Z"). Defaults to None.
             invitee_email (str, optional): Filter events by invitee email address. Defaults to None.
+            shards (int, optional): Number of sub-windows to fetch concurrently. Requires min_start_time and max_start_time. Defaults to None.
+            max_workers (int, optional): Maximum number of sub-windows fetched at once. Defaults to 8.
+            min_shard_duration (timedelta, optional): Dense sub-windows are not split below this duration. Defaults to one hour.
+            prefetch (int, optional): Number of pages fetched in the background ahead of the consumer. Defaults to 0.
+            model (bool, optional): Return ScheduledEvent models instead of json dicts. Defaults to False.
+
+        Raises:
+            CalendlyException: If shards is given without both min_start_time and max_start_time.
 
         Returns:
             list: json scheduled event objects
         """
-        first = self.list_events(user_uri=user_uri, count=100, min_start_time=min_start_time, max_start_time=max_start_time, invitee_email=invitee_email)
-        next_page = first['pagination']['next_page']
-        
-        data = first['collection']
+        if not shards:
+            return list(self.iter_scheduled_events(user_uri, min_start_time, max_start_time, invitee_email, prefetch, model))
+
+        if not (min_start_time and max_start_time):
+            raise CalendlyException("Sharded fetch requires both min_start_time and max_start_time.")
+
+        def fetch_window(window):
+            lower, upper = window
+            first = self.list_events(user_uri=user_uri, count=100, sort='start_time:asc', min_start_time=lower,
+                                     max_start_time=upper, invitee_email=invitee_email)
+            windows = split_dense_window(first, lower, upper, max_workers, min_shard_duration)
+            if windows:
+                return windows, first['collection']
+            events = []
+            for page in self.iter_pages(first, prefetch):
+                events += page['collection']
+            return [], events
+
+        events_by_uri = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {executor.submit(fetch_window, window) for window in split_window(min_start_time, max_start_time, shards)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    windows, events = future.result()
+                    pending |= {executor.submit(fetch_window, window) for window in windows}
+                    for event in events:
+                        events_by_uri[event['uri']] = event
+
+        events = sorted(events_by_uri.values(), key=lambda event: parse_time(event['start_time']))
+        if model:
+            return [ScheduledEvent.from_dict(event) for event in events]
+        return events
+
+    def get_scheduling_url_index(self, user_uri: str, refresh: bool=False) -> MutableMapping:
+        """
+        Map every event type URI of a user to its public scheduling url.
+        The index is built from a full event type crawl and reused until `scheduling_url_index_ttl` expires.
+
+        Args:
+            user_uri (str): User URI.
+            refresh (bool, optional): Rebuild the index even if it has not expired. Defaults to False.
+
+        Returns:
+            dict: event type URI -> scheduling url
+        """
+        with self._scheduling_url_lock(user_uri):
+            return self._scheduling_url_index(user_uri, refresh).urls
+
+    def _scheduling_url_lock(self, user_uri: str) -> threading.Lock:
+        with self._scheduling_url_index_lock:
+            return self._scheduling_url_locks[user_uri]
+
+    def _scheduling_url_index(self, user_uri: str, refresh: bool=False, miss_refreshed_at: float=None) -> SchedulingUrlIndex:
+        # Called with the user's lock held, so that concurrent converters of one user crawl once
+        # without blocking the other users.
+        index = self._scheduling_url_indexes.get(user_uri)
+        if refresh or index is None or index.expired(self.scheduling_url_index_ttl, time.monotonic()):
+            urls = {event_type['uri']: event_type['scheduling_url'] for event_type in self.iter_event_types(user_uri)}
+            index = SchedulingUrlIndex(urls, time.monotonic(), miss_refreshed_at)
+            self._scheduling_url_indexes[user_uri] = index
+        return index
+
+    def invalidate_scheduling_url_index(self, user_uri: str=None):
+        """
+        Forget the scheduling url index of a user, or of every user.
 
-        while (next_page):
-            page = self.request.get(next_page).json()
-            data += page['collection']
-            next_page = page['pagination']['next_page']
-        
-        return data
+        Args:
+            user_uri (str, optional): User URI. Defaults to None.
+        """
+        with self._scheduling_url_index_lock:
+            if user_uri is None:
+                self._scheduling_url_indexes.clear()
+            else:
+                self._scheduling_url_indexes.pop(user_uri, None)
+
+    def _resolve_scheduling_url(self, event_type_uri: str, user_uri: str) -> str:
+        with self._scheduling_url_lock(user_uri):
+            index = self._scheduling_url_index(user_uri)
+            now = time.monotonic()
+            if event_type_uri not in index.urls and index.may_refresh_on_miss(event_type_uri, self.scheduling_url_miss_interval, now):
+                index = self._scheduling_url_index(user_uri, refresh=True, miss_refreshed_at=now)
+            if event_type_uri not in index.urls:
+                index.unknown.add(event_type_uri)
+            return index.urls.get(event_type_uri)
 
     def convert_event_to_original_url(self, event_uri: str, user_uri: str) -> str:
         """
         Convert event url from calendly's inner API convention to the original public url of the event.
+        Event types are looked up in the user's scheduling url index. An unknown event type rebuilds the
+        index at most once per `scheduling_url_miss_interval`, and is then remembered as unknown until the
+        index expires, so it resolves to None without further crawls.
 
         Args:
             event_uri (str): Event URI.
@@ -311,15 +678,20 @@ class CalendlyAPI(object):
             string: the public convention of the event's url
         """
         event_type_uri = self.get_event_details(event_uri)['resource']['event_type']
-        page = self.list_event_types(user_uri=user_uri)
-
-        while True:
-            filtered_result = next(filter(lambda event: event['uri'] == event_type_uri, page['collection']), None)
-            if filtered_result:
-                return filtered_result['scheduling_url']
-
-            next_page = page['pagination']['next_page']
-            if not next_page:
-                break
-            page = self.request.get(next_page).json()
-        
\ No newline at end of file
+        return self._resolve_scheduling_url(event_type_uri, user_uri)
+
+    def convert_events_to_original_urls(self, event_uris: List[str], user_uri: str, max_workers: int=DEFAULT_BATCH_WORKERS) -> List[str]:
+        """
+        Convert many event urls to their public urls, fetching the event details concurrently.
+
+        Args:
+            event_uris (list): Event URIs.
+            user_uri (str): User URI.
+            max_workers (int, optional): Maximum number of concurrent requests. Defaults to 8.
+
+        Returns:
+            list: public urls, in the order of event_uris
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            details = list(executor.map(self.get_event_details, event_uris))
+        return [self._resolve_scheduling_url(detail['resource']['event_type'], user_uri) for detail in details]
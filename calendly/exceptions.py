@@ -7,4 +7,6 @@ class CalendlyException(Exception):
         super(CalendlyException, self).__init__(f"{self.message} - {self.details}")
 
 class CalendlyOauth2Exception(CalendlyException):
-    """Errors corresponding to a misuse of CalendlyOauth2 API"""
\ No newline at end of file
+    """Errors corresponding to a misuse of CalendlyOauth2 API"""
+class CalendlyWebhookException(CalendlyException):
+    """Errors corresponding to an invalid or unverifiable webhook delivery"""
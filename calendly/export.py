@@ -0,0 +1,227 @@
+import csv
+from itertools import islice
+from typing import IO, Iterable, Iterator, List, MutableMapping, Union
+
+from calendly.exceptions import CalendlyException
+from calendly.models import Model
+from calendly.utils.sharding import parse_time
+
+__license__ = "MIT"
+
+DEFAULT_BATCH_SIZE = 1000
+LIST_SEPARATOR = ';'
+
+STRING = 'string'
+INTEGER = 'integer'
+TIMESTAMP = 'timestamp'
+STRING_LIST = 'string_list'
+
+EVENT_COLUMNS = (
+    ('uri', STRING),
+    ('name', STRING),
+    ('status', STRING),
+    ('start_time', TIMESTAMP),
+    ('end_time', TIMESTAMP),
+    ('event_type', STRING),
+    ('location_type', STRING),
+    ('location', STRING),
+    ('invitees_total', INTEGER),
+    ('invitees_active', INTEGER),
+    ('invitees_limit', INTEGER),
+    ('host_users', STRING_LIST),
+    ('host_emails', STRING_LIST),
+    ('host_names', STRING_LIST),
+    ('canceled_by', STRING),
+    ('cancel_reason', STRING),
+    ('created_at', TIMESTAMP),
+    ('updated_at', TIMESTAMP),
+)
+EVENT_COLUMN_NAMES = tuple(name for name, _ in EVENT_COLUMNS)
+
+ARROW_MISSING_TEXT = "pyarrow is required for Arrow and Parquet export: pip install PyCalendly[arrow]"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise CalendlyException(ARROW_MISSING_TEXT)
+    return pyarrow
+
+
+def flatten_event(event: Union[MutableMapping, Model]) -> MutableMapping:
+    """
+    Flatten a scheduled event into one row of EVENT_COLUMNS. Timestamps are kept as ISO strings
+    and memberships as lists.
+
+    Args:
+        event (dict or ScheduledEvent): json scheduled event or ScheduledEvent model.
+
+    Returns:
+        dict: row keyed by column name
+    """
+    if isinstance(event, Model):
+        event = event.to_dict()
+    location = event.get('location') or {}
+    counter = event.get('invitees_counter') or {}
+    memberships = event.get('event_memberships') or []
+    cancellation = event.get('cancellation') or {}
+    return {
+        'uri': event.get('uri'),
+        'name': event.get('name'),
+        'status': event.get('status'),
+        'start_time': event.get('start_time'),
+        'end_time': event.get('end_time'),
+        'event_type': event.get('event_type'),
+        'location_type': location.get('type'),
+        'location': location.get('location') or location.get('join_url'),
+        'invitees_total': counter.get('total'),
+        'invitees_active': counter.get('active'),
+        'invitees_limit': counter.get('limit'),
+        'host_users': [membership.get('user') for membership in memberships],
+        'host_emails': [membership.get('user_email') for membership in memberships],
+        'host_names': [membership.get('user_name') for membership in memberships],
+        'canceled_by': cancellation.get('canceled_by'),
+        'cancel_reason': cancellation.get('reason'),
+        'created_at': event.get('created_at'),
+        'updated_at': event.get('updated_at'),
+    }
+
+
+def iter_batches(events: Iterable, batch_size: int=DEFAULT_BATCH_SIZE) -> Iterator[List[MutableMapping]]:
+    """
+    Group a stream of scheduled events into lists of at most `batch_size` flattened rows.
+    Only one batch is held in memory at a time.
+    """
+    events = iter(events)
+    while True:
+        batch = [flatten_event(event) for event in islice(events, batch_size)]
+        if not batch:
+            return
+        yield batch
+
+
+def _to_csv_row(row: MutableMapping) -> MutableMapping:
+    return {name: LIST_SEPARATOR.join(value or '' for value in row[name]) if kind == STRING_LIST else row[name]
+            for name, kind in EVENT_COLUMNS}
+
+
+def write_csv(events: Iterable, file: Union[str, IO], batch_size: int=DEFAULT_BATCH_SIZE) -> int:
+    """
+    Write scheduled events to CSV in chunks of `batch_size` rows. List columns are joined with ";".
+
+    Args:
+        events (iterable): json scheduled events or ScheduledEvent models, e.g. from iter_scheduled_events.
+        file (str or file): Path or text file object to write to.
+        batch_size (int, optional): Rows buffered between writes. Defaults to 1000.
+
+    Returns:
+        int: number of rows written
+    """
+    if isinstance(file, str):
+        with open(file, 'w', newline='', encoding='utf-8') as handle:
+            return write_csv(events, handle, batch_size)
+
+    writer = csv.DictWriter(file, fieldnames=EVENT_COLUMN_NAMES)
+    writer.writeheader()
+    rows = 0
+    for batch in iter_batches(events, batch_size):
+        writer.writerows(map(_to_csv_row, batch))
+        rows += len(batch)
+    return rows
+
+
+def arrow_schema():
+    """
+    Return the pyarrow schema of EVENT_COLUMNS. Timestamps are UTC microseconds.
+    """
+    pa = _import_pyarrow()
+    types = {
+        STRING: pa.string(),
+        INTEGER: pa.int64(),
+        TIMESTAMP: pa.timestamp('us', tz='UTC'),
+        STRING_LIST: pa.list_(pa.string()),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in EVENT_COLUMNS])
+
+
+def iter_record_batches(events: Iterable, batch_size: int=DEFAULT_BATCH_SIZE) -> Iterator:
+    """
+    Convert a stream of scheduled events into pyarrow RecordBatches of at most `batch_size` rows.
+    """
+    pa = _import_pyarrow()
+    schema = arrow_schema()
+    for batch in iter_batches(events, batch_size):
+        columns = {}
+        for name, kind in EVENT_COLUMNS:
+            values = [row[name] for row in batch]
+            if kind == TIMESTAMP:
+                values = [parse_time(value) if value else None for value in values]
+            columns[name] = values
+        yield pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+def write_arrow(events: Iterable, path: str, batch_size: int=DEFAULT_BATCH_SIZE) -> int:
+    """
+    Write scheduled events to an Arrow IPC file, one record batch per `batch_size` rows.
+
+    Returns:
+        int: number of rows written
+    """
+    pa = _import_pyarrow()
+    rows = 0
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, arrow_schema()) as writer:
+        for batch in iter_record_batches(events, batch_size):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def write_parquet(events: Iterable, path: str, batch_size: int=DEFAULT_BATCH_SIZE, compression: str='snappy') -> int:
+    """
+    Write scheduled events to a Parquet file, one row group per `batch_size` rows.
+
+    Returns:
+        int: number of rows written
+    """
+    _import_pyarrow()
+    import pyarrow.parquet as pq
+
+    rows = 0
+    with pq.ParquetWriter(path, arrow_schema(), compression=compression) as writer:
+        for batch in iter_record_batches(events, batch_size):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+WRITERS = {
+    'csv': write_csv,
+    'arrow': write_arrow,
+    'parquet': write_parquet,
+}
+
+
+def export_scheduled_events(api, path: str, user_uri: str, format: str='csv', batch_size: int=DEFAULT_BATCH_SIZE,
+                            prefetch: int=1, **filters) -> int:
+    """
+    Stream a user's scheduled events straight from the paginated API into a columnar file.
+    At most `1 + prefetch` pages (two with the default) and one batch are held in memory, whatever
+    the number of events. Pass `prefetch=0` to hold a single page at the cost of waiting for each one.
+
+    Args:
+        api (CalendlyAPI): Client used to list events.
+        path (str): Output file.
+        user_uri (str): User URI.
+        format (str, optional): "csv", "arrow" or "parquet". Defaults to "csv".
+        batch_size (int, optional): Rows per CSV chunk, record batch or row group. Defaults to 1000.
+        prefetch (int, optional): Pages fetched in the background while a batch is written, each held in memory. Defaults to 1.
+        **filters: min_start_time, max_start_time or invitee_email, see iter_scheduled_events.
+
+    Returns:
+        int: number of rows written
+    """
+    if format not in WRITERS:
+        raise CalendlyException(f"Unsupported export format: {format}. Use one of {', '.join(WRITERS)}.")
+    events = api.iter_scheduled_events(user_uri, prefetch=prefetch, **filters)
+    return WRITERS[format](events, path, batch_size)
@@ -0,0 +1,151 @@
+import sys
+from typing import Any, MutableMapping, Optional
+
+from calendly.utils.sharding import parse_time
+
+__license__ = "MIT"
+
+
+class LazyDateTime(object):
+    """
+    Descriptor exposing an ISO timestamp field as a datetime, parsed on first access only.
+    The raw string is kept in a private slot and replaced by the parsed value.
+    """
+
+    def __init__(self, slot: str):
+        self.slot = slot
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = getattr(instance, self.slot)
+        if isinstance(value, str):
+            value = parse_time(value)
+            setattr(instance, self.slot, value)
+        return value
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Model(object):
+    """
+    Lightweight, __slots__-based view of a Calendly resource.
+
+    FIELDS and URI_FIELDS are copied, and the INTERNED_FIELDS among them, whose values repeat
+    across many records (event type, user and organization URIs), are interned so that they are
+    stored once. Per-record values such as `uri` or `email` are not, since interning them would only
+    grow the intern table. TIME_FIELDS are parsed lazily. Fields not listed are dropped.
+
+    Models compare equal when all their fields do, and hash on their type and `uri`, so they can be
+    de-duplicated in sets and used as dict keys like their URIs.
+    """
+
+    __slots__ = ()
+
+    FIELDS = ()
+    URI_FIELDS = ()
+    TIME_FIELDS = ()
+    INTERNED_FIELDS = ()
+
+    def __init__(self, data: MutableMapping):
+        for name in self.FIELDS + self.URI_FIELDS:
+            value = data.get(name)
+            setattr(self, name, _intern(value) if name in self.INTERNED_FIELDS else value)
+        for name in self.TIME_FIELDS:
+            setattr(self, '_' + name, data.get(name))
+
+    @classmethod
+    def from_dict(cls, data: MutableMapping) -> "Model":
+        return cls(data)
+
+    def to_dict(self) -> MutableMapping:
+        """
+        Return the model as a json-compatible dict, with timestamps formatted back to ISO strings.
+        """
+        data = {name: getattr(self, name) for name in self.FIELDS + self.URI_FIELDS}
+        for name in self.TIME_FIELDS:
+            value = getattr(self, '_' + name)
+            data[name] = value if value is None or isinstance(value, str) else value.isoformat().replace('+00:00', 'Z')
+        return data
+
+    def __eq__(self, other: Any) -> bool:
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.uri))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.uri!r})"
+
+
+def _slots(fields, uri_fields, time_fields):
+    return tuple(fields) + tuple(uri_fields) + tuple('_' + name for name in time_fields)
+
+
+class ScheduledEvent(Model):
+    FIELDS = ('name', 'status', 'location', 'invitees_counter', 'event_memberships', 'event_guests', 'cancellation')
+    URI_FIELDS = ('uri', 'event_type')
+    TIME_FIELDS = ('start_time', 'end_time', 'created_at', 'updated_at')
+    INTERNED_FIELDS = ('event_type',)
+    __slots__ = _slots(FIELDS, URI_FIELDS, TIME_FIELDS)
+
+    start_time = LazyDateTime('_start_time')
+    end_time = LazyDateTime('_end_time')
+    created_at = LazyDateTime('_created_at')
+    updated_at = LazyDateTime('_updated_at')
+
+    def __init__(self, data: MutableMapping):
+        super(ScheduledEvent, self).__init__(data)
+        if self.event_memberships:
+            self.event_memberships = [dict(membership, user=_intern(membership.get('user')))
+                                      for membership in self.event_memberships]
+
+
+class Invitee(Model):
+    FIELDS = ('email', 'name', 'first_name', 'last_name', 'status', 'timezone', 'text_reminder_number', 'rescheduled',
+              'questions_and_answers', 'tracking', 'cancellation', 'payment', 'no_show', 'reconfirmation')
+    URI_FIELDS = ('uri', 'event', 'cancel_url', 'reschedule_url', 'old_invitee', 'new_invitee', 'routing_form_submission')
+    TIME_FIELDS = ('created_at', 'updated_at')
+    __slots__ = _slots(FIELDS, URI_FIELDS, TIME_FIELDS)
+
+    created_at = LazyDateTime('_created_at')
+    updated_at = LazyDateTime('_updated_at')
+
+
+class EventType(Model):
+    FIELDS = ('name', 'active', 'slug', 'duration', 'kind', 'pooling_type', 'type', 'color', 'internal_note',
+              'description_plain', 'description_html', 'profile', 'secret', 'custom_questions')
+    URI_FIELDS = ('uri', 'scheduling_url')
+    TIME_FIELDS = ('created_at', 'updated_at')
+    __slots__ = _slots(FIELDS, URI_FIELDS, TIME_FIELDS)
+
+    created_at = LazyDateTime('_created_at')
+    updated_at = LazyDateTime('_updated_at')
+
+
+class WebhookSubscription(Model):
+    FIELDS = ('state', 'events', 'scope')
+    URI_FIELDS = ('uri', 'callback_url', 'organization', 'user', 'creator')
+    TIME_FIELDS = ('created_at', 'updated_at', 'retry_started_at')
+    INTERNED_FIELDS = ('organization', 'user', 'creator')
+    __slots__ = _slots(FIELDS, URI_FIELDS, TIME_FIELDS)
+
+    created_at = LazyDateTime('_created_at')
+    updated_at = LazyDateTime('_updated_at')
+    retry_started_at = LazyDateTime('_retry_started_at')
+
+
+def to_model(model_class, response: MutableMapping) -> Model:
+    """
+    Wrap the `resource` of a json decoded single-resource response in a model.
+    """
+    return model_class.from_dict(response['resource'])
+
+
+def to_models(model_class, page: MutableMapping) -> MutableMapping:
+    """
+    Return a copy of a json decoded list response whose `collection` holds models.
+    """
+    return dict(page, collection=[model_class.from_dict(item) for item in page['collection']])
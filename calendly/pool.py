@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, MutableMapping
+
+from calendly.calendly import CalendlyAPI
+from calendly.utils.api import DEFAULT_POOL_CONNECTIONS, create_session
+from calendly.utils.ratelimit import DEFAULT_WINDOW, RateLimiter
+from calendly.utils.scheduler import BACKFILL, DEFAULT_MAX_TENANT_CONCURRENCY, INTERACTIVE, FairScheduler
+from calendly.utils.tokens import TokenManager
+
+__license__ = "MIT"
+
+DEFAULT_MAX_CLIENTS = 1000
+DEFAULT_POOL_WORKERS = 16
+DEFAULT_SHARED_POOL_MAXSIZE = 100
+
+
+class CalendlyClientPool(object):
+    """
+    CalendlyAPI clients of many OAuth-connected accounts ("tenants"), served from one process.
+
+    Every client sends its requests through one shared keep-alive session, authenticates with its
+    tenant's token from the TokenManager and is paced by its own RateLimiter, since Calendly
+    enforces quotas per account. Clients are built on first use and the least recently used
+    ones are dropped beyond `max_clients` or after `idle_timeout` seconds without use.
+
+    Work submitted with `submit()` runs on a bounded set of worker threads through a
+    FairScheduler: interactive tasks go before backfill tasks, tenants are served round-robin
+    and each tenant is limited to `max_tenant_concurrency` running tasks.
+    """
+
+    def __init__(self, token_manager: TokenManager, max_clients: int=DEFAULT_MAX_CLIENTS, idle_timeout: float=None,
+                 max_workers: int=DEFAULT_POOL_WORKERS, max_tenant_concurrency: int=DEFAULT_MAX_TENANT_CONCURRENCY,
+                 rate_limit: int=None, rate_window: float=DEFAULT_WINDOW, session=None,
+                 pool_connections: int=DEFAULT_POOL_CONNECTIONS, pool_maxsize: int=DEFAULT_SHARED_POOL_MAXSIZE,
+                 clock: Callable[[], float]=time.monotonic, **client_options):
+        """
+        Args:
+            token_manager (TokenManager): Source of every tenant's access token.
+            max_clients (int, optional): Number of tenant clients kept. Defaults to 1000.
+            idle_timeout (float, optional): Seconds after which an unused client is dropped. Defaults to never.
+            max_workers (int, optional): Worker threads running submitted tasks. Defaults to 16.
+            max_tenant_concurrency (int, optional): Running tasks allowed per tenant. Defaults to 2.
+            rate_limit (int, optional): Requests per `rate_window` of each tenant. Learned from the X-RateLimit headers when omitted.
+            rate_window (float, optional): Length of the quota window in seconds. Defaults to 60.
+            session (requests.Session, optional): Session shared by every client. Defaults to a pooled session owned by the pool.
+            pool_connections (int, optional): Per-host connection pools of the owned session.
+            pool_maxsize (int, optional): Keep-alive connections per host of the owned session. Defaults to 100.
+            clock (callable, optional): Monotonic clock used for idle timeouts.
+            **client_options: Extra CalendlyAPI options, e.g. a `cache` or `retry_policy` shared by every client.
+        """
+        self.token_manager = token_manager
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self.max_workers = max_workers
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.clock = clock
+        self.client_options = client_options
+        self._owns_session = session is None
+        self.session = session or create_session(pool_connections, pool_maxsize)
+        self.scheduler = FairScheduler(max_tenant_concurrency)
+        self.evictions = 0
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers = []
+
+    def _create_client(self, tenant: str) -> CalendlyAPI:
+        return CalendlyAPI(token_manager=self.token_manager, tenant=tenant, session=self.session,
+                           rate_limiter=RateLimiter(self.rate_limit, self.rate_window), **self.client_options)
+
+    def get(self, tenant: str) -> CalendlyAPI:
+        """
+        Client of `tenant`, built on first use. Clients are thread-safe and can be used directly
+        for requests which don't need fair scheduling.
+        """
+        now = self.clock()
+        with self._lock:
+            entry = self._clients.pop(tenant, None)
+            client = entry[0] if entry else self._create_client(tenant)
+            self._clients[tenant] = (client, now)
+            self._evict(now)
+        return client
+
+    def _evict(self, now: float):
+        while len(self._clients) > self.max_clients:
+            self._clients.popitem(last=False)
+            self.evictions += 1
+        if self.idle_timeout is not None:
+            while self._clients:
+                tenant, (_, last_used) = next(iter(self._clients.items()))
+                if now - last_used < self.idle_timeout:
+                    break
+                del self._clients[tenant]
+                self.evictions += 1
+
+    def evict_idle(self):
+        """
+        Drop the clients unused for `idle_timeout` seconds. Called on every `get()` as well.
+        """
+        with self._lock:
+            self._evict(self.clock())
+
+    def remove(self, tenant: str):
+        """
+        Drop the client of `tenant`, e.g. after the account was disconnected.
+        """
+        with self._lock:
+            self._clients.pop(tenant, None)
+
+    def __contains__(self, tenant: str) -> bool:
+        return tenant in self._clients
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def _start_workers(self):
+        with self._lock:
+            while len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, name=f'calendly-pool-{len(self._workers)}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _work(self):
+        while True:
+            item = self.scheduler.get()
+            if item is None:
+                return
+            tenant, (future, function, args, kwargs) = item
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(function(self.get(tenant), *args, **kwargs))
+                    except BaseException as error:
+                        future.set_exception(error)
+            finally:
+                self.scheduler.done(tenant)
+
+    def submit(self, tenant: str, function: Callable, *args, priority: int=INTERACTIVE, **kwargs) -> Future:
+        """
+        Schedule `function(client, *args, **kwargs)` with the client of `tenant`.
+
+        Args:
+            tenant (str): Tenant the work is done for.
+            function (callable): Called with the tenant's CalendlyAPI, e.g. `CalendlyAPI.get_event_details`.
+            priority (int, optional): INTERACTIVE (default) or BACKFILL.
+
+        Returns:
+            Future: resolved with the return value of `function`
+        """
+        if not self._workers:
+            self._start_workers()
+        future = Future()
+        self.scheduler.put(tenant, (future, function, args, kwargs), priority)
+        return future
+
+    def submit_backfill(self, tenant: str, function: Callable, *args, **kwargs) -> Future:
+        """
+        Schedule low-priority work, which only runs when no interactive task is waiting.
+        """
+        return self.submit(tenant, function, *args, priority=BACKFILL, **kwargs)
+
+    def stats(self) -> MutableMapping:
+        return {'clients': len(self._clients), 'evictions': self.evictions, 'queued': len(self.scheduler),
+                'workers': len(self._workers)}
+
+    def close(self):
+        """
+        Finish the queued tasks, stop the workers and release the shared connections.
+        """
+        self.scheduler.close()
+        for worker in self._workers:
+            worker.join()
+        with self._lock:
+            self._clients.clear()
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
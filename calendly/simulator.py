@@ -0,0 +1,429 @@
+import base64
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, MutableMapping, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+
+from calendly.utils.sharding import format_time, parse_time
+from calendly.webhooks import SIGNATURE_HEADER, compute_signature
+
+__license__ = "MIT"
+
+MAX_PAGE_SIZE = 100
+DEFAULT_PAGE_SIZE = 20
+DEFAULT_START = datetime(2026, 1, 5, 9, tzinfo=timezone.utc)
+RETRYABLE_ERROR_STATUSES = (500, 502, 503)
+
+
+class SimulatorError(Exception):
+
+    def __init__(self, status: int, title: str, message: str):
+        super(SimulatorError, self).__init__(message)
+        self.status = status
+        self.title = title
+        self.message = message
+
+
+def _uuid(prefix: str, index: int) -> str:
+    return f'{prefix}{index:015X}'
+
+
+def _encode_page_token(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({'offset': offset}).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_page_token(token: str) -> int:
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))['offset'])
+    except (ValueError, KeyError, TypeError):
+        raise SimulatorError(400, 'Invalid Argument', 'The supplied page_token is invalid.')
+
+
+class CalendlyData(object):
+    """
+    Generated account served by CalendlySimulator: one user and organization, `event_types`
+    event types, `events` scheduled events every `spacing` from DEFAULT_START, each with
+    `invitees_per_event` invitees, and an initially empty set of webhook subscriptions.
+    """
+
+    def __init__(self, base_url: str, events: int=1000, event_types: int=5, invitees_per_event: int=1,
+                 spacing: timedelta=timedelta(minutes=30), canceled_every: int=7):
+        self.base_url = base_url
+        self.organization = f'{base_url}/organizations/{_uuid("O", 1)}'
+        self.user = {
+            'uri': f'{base_url}/users/{_uuid("U", 1)}', 'name': 'Simulated User', 'slug': 'simulated-user',
+            'email': 'user@example.com', 'scheduling_url': 'https://calendly.com/simulated-user',
+            'timezone': 'UTC', 'current_organization': self.organization,
+            'created_at': '2025-01-01T00:00:00.000000Z', 'updated_at': '2025-01-01T00:00:00.000000Z',
+        }
+        self.event_types = [self._event_type(index) for index in range(event_types)]
+        self.events = []
+        self.invitees = {}
+        for index in range(events):
+            event = self._event(index, DEFAULT_START + spacing * index, canceled_every and index % canceled_every == canceled_every - 1)
+            self.events.append(event)
+            self.invitees[event['uri']] = [self._invitee(event, number) for number in range(invitees_per_event)]
+        self.events_by_uri = {event['uri']: event for event in self.events}
+        self.event_types_by_uri = {event_type['uri']: event_type for event_type in self.event_types}
+        self.webhooks = {}
+        self._next_webhook = 1
+        self.lock = threading.Lock()
+
+    def _event_type(self, index: int) -> MutableMapping:
+        return {
+            'uri': f'{self.base_url}/event_types/{_uuid("T", index)}', 'name': f'Meeting {index}', 'active': True,
+            'slug': f'meeting-{index}', 'duration': 30, 'kind': 'solo', 'type': 'StandardEventType',
+            'scheduling_url': f'https://calendly.com/simulated-user/meeting-{index}', 'profile': {'owner': self.user['uri']},
+            'created_at': '2025-01-01T00:00:00.000000Z', 'updated_at': '2025-01-01T00:00:00.000000Z',
+        }
+
+    def _event(self, index: int, start: datetime, canceled: bool) -> MutableMapping:
+        event_type = self.event_types[index % len(self.event_types)] if self.event_types else None
+        return {
+            'uri': f'{self.base_url}/scheduled_events/{_uuid("E", index)}',
+            'name': event_type['name'] if event_type else 'Meeting', 'status': 'canceled' if canceled else 'active',
+            'start_time': format_time(start), 'end_time': format_time(start + timedelta(minutes=30)),
+            'event_type': event_type['uri'] if event_type else None,
+            'location': {'type': 'zoom', 'join_url': f'https://zoom.us/j/{1000000 + index}', 'status': 'pushed'},
+            'invitees_counter': {'total': 1, 'active': 0 if canceled else 1, 'limit': 1},
+            'created_at': format_time(start - timedelta(days=7)), 'updated_at': format_time(start - timedelta(days=7)),
+            'event_memberships': [{'user': self.user['uri'], 'user_email': self.user['email'], 'user_name': self.user['name']}],
+            'event_guests': [],
+            'cancellation': {'canceled_by': 'Invitee', 'reason': 'Conflict', 'canceler_type': 'invitee'} if canceled else None,
+            '_start': start,
+        }
+
+    def _invitee(self, event: MutableMapping, number: int) -> MutableMapping:
+        event_id = event['uri'].rsplit('/', 1)[-1]
+        email = f'invitee{number}.{event_id.lower()}@example.com'
+        return {
+            'uri': f'{event["uri"]}/invitees/{_uuid("I", int(event_id[1:], 16) * 100 + number)}',
+            'email': email, 'name': f'Invitee {number}', 'status': event['status'], 'timezone': 'UTC',
+            'event': event['uri'], 'questions_and_answers': [], 'rescheduled': False,
+            'cancel_url': f'https://calendly.com/cancellations/{event_id}', 'reschedule_url': f'https://calendly.com/reschedulings/{event_id}',
+            'created_at': event['created_at'], 'updated_at': event['updated_at'],
+        }
+
+    def create_webhook(self, data: MutableMapping) -> MutableMapping:
+        for name in ('url', 'events', 'organization', 'scope'):
+            if not data.get(name):
+                raise SimulatorError(400, 'Invalid Argument', f'{name} is required.')
+        with self.lock:
+            for webhook in self.webhooks.values():
+                if webhook['callback_url'] == data['url'] and webhook['scope'] == data['scope']:
+                    raise SimulatorError(409, 'Already Exists', 'Hook with this url already exists')
+            uri = f'{self.base_url}/webhook_subscriptions/{_uuid("W", self._next_webhook)}'
+            self._next_webhook += 1
+            now = format_time(datetime.now(timezone.utc))
+            webhook = {
+                'uri': uri, 'callback_url': data['url'], 'events': list(data['events']), 'state': 'active',
+                'scope': data['scope'], 'organization': data['organization'], 'user': data.get('user'),
+                'creator': self.user['uri'], 'created_at': now, 'updated_at': now, 'retry_started_at': None,
+                '_signing_key': data.get('signing_key'),
+            }
+            self.webhooks[uri] = webhook
+        return webhook
+
+
+def _public(resource: MutableMapping) -> MutableMapping:
+    return {key: value for key, value in resource.items() if not key.startswith('_')}
+
+
+class CalendlySimulator(object):
+    """
+    In-process fake of the Calendly API v2 for load tests and benchmarks, served by a ThreadingHTTPServer.
+
+    Covers users/me, event_types, scheduled_events, their invitees and webhook_subscriptions, with
+    opaque cursor pagination, `latency` seconds of delay per request (plus up to `jitter`), a share of
+    injected 5xx errors (`error_rate`) and a token bucket answering 429 beyond `rate_limit` requests
+    per `rate_window` seconds, with X-RateLimit-* and Retry-After headers. Query parameters are read
+    from the query string and from a json body, as CalendlyReq sends them.
+
+        with CalendlySimulator(events=500, latency=0.02) as simulator:
+            calendly = CalendlyAPI("token", base_url=simulator.base_url)
+            events = calendly.get_all_scheduled_events(simulator.user_uri)
+    """
+
+    def __init__(self, events: int=1000, event_types: int=5, invitees_per_event: int=1, latency: float=0.0,
+                 jitter: float=0.0, error_rate: float=0.0, rate_limit: int=None, rate_window: float=60.0,
+                 seed: int=0, host: str='127.0.0.1', port: int=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._rate_lock = threading.Lock()
+        self._window_started = time.monotonic()
+        self._window_count = 0
+        self.stats = {'requests': 0, 'errors': 0, 'rate_limited': 0}
+
+        self.server = ThreadingHTTPServer((host, port), type('SimulatorHandler', (_Handler,), {'simulator': self}))
+        self.server.daemon_threads = True
+        self.base_url = f'http://{host}:{self.server.server_address[1]}'
+        self.data = CalendlyData(self.base_url, events, event_types, invitees_per_event)
+        self.delivery_session = requests.Session()
+        self._thread = None
+
+    @property
+    def user_uri(self) -> str:
+        return self.data.user['uri']
+
+    @property
+    def organization_uri(self) -> str:
+        return self.data.organization
+
+    def start(self) -> "CalendlySimulator":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self.server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server.server_close()
+        self.delivery_session.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count(self, key: str):
+        with self._rate_lock:
+            self.stats[key] += 1
+
+    def _delay(self) -> float:
+        with self._random_lock:
+            return self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+
+    def _inject_error(self) -> Optional[int]:
+        if not self.error_rate:
+            return None
+        with self._random_lock:
+            if self.random.random() < self.error_rate:
+                return self.random.choice(RETRYABLE_ERROR_STATUSES)
+        return None
+
+    def _take_token(self) -> MutableMapping:
+        """
+        Count a request against the rate limit window. Returns the rate limit headers, with
+        Retry-After once the window is exhausted.
+        """
+        if self.rate_limit is None:
+            return {}
+        with self._rate_lock:
+            now = time.monotonic()
+            if now - self._window_started >= self.rate_window:
+                self._window_started, self._window_count = now, 0
+            reset = max(self.rate_window - (now - self._window_started), 0)
+            headers = {'X-RateLimit-Limit': str(self.rate_limit), 'X-RateLimit-Reset': f'{reset:.3f}'}
+            if self._window_count >= self.rate_limit:
+                headers['X-RateLimit-Remaining'] = '0'
+                headers['Retry-After'] = f'{reset:.3f}'
+                return headers
+            self._window_count += 1
+            headers['X-RateLimit-Remaining'] = str(self.rate_limit - self._window_count)
+            return headers
+
+    def deliver(self, event: str, invitee: MutableMapping, timestamp: int=None) -> List[requests.Response]:
+        """
+        Post a signed `event` delivery ("invitee.created" or "invitee.canceled") about `invitee` to every
+        active webhook subscription listening to it, as Calendly would.
+        """
+        scheduled_event = self.data.events_by_uri.get(invitee.get('event'), {})
+        body = json.dumps({'event': event, 'created_at': format_time(datetime.now(timezone.utc)),
+                           'created_by': self.user_uri,
+                           'payload': dict(invitee, scheduled_event=_public(scheduled_event))}).encode('utf-8')
+        timestamp = str(timestamp or int(time.time()))
+        responses = []
+        with self.data.lock:
+            webhooks = [webhook for webhook in self.data.webhooks.values() if event in webhook['events'] and webhook['state'] == 'active']
+        for webhook in webhooks:
+            headers = {'Content-Type': 'application/json'}
+            if webhook['_signing_key']:
+                headers[SIGNATURE_HEADER] = f't={timestamp},v1={compute_signature(body, timestamp, webhook["_signing_key"])}'
+            responses.append(self.delivery_session.post(webhook['callback_url'], data=body, headers=headers))
+        return responses
+
+    # Routes
+
+    def _paginate(self, path: str, items: List[MutableMapping], params: MutableMapping) -> MutableMapping:
+        try:
+            count = int(params.get('count') or DEFAULT_PAGE_SIZE)
+        except ValueError:
+            raise SimulatorError(400, 'Invalid Argument', 'count must be an integer.')
+        if not 1 <= count <= MAX_PAGE_SIZE:
+            raise SimulatorError(400, 'Invalid Argument', f'count must be between 1 and {MAX_PAGE_SIZE}.')
+        offset = _decode_page_token(params['page_token']) if params.get('page_token') else 0
+        page = items[offset:offset + count]
+
+        def link(page_offset):
+            query = {key: value for key, value in params.items() if key != 'page_token' and value is not None}
+            query['count'] = count
+            query['page_token'] = _encode_page_token(page_offset)
+            return f'{self.base_url}{path}?{urlencode(query)}'
+
+        has_next = offset + count < len(items)
+        has_previous = offset > 0
+        return {
+            'collection': [_public(item) for item in page],
+            'pagination': {
+                'count': len(page),
+                'next_page': link(offset + count) if has_next else None,
+                'previous_page': link(max(offset - count, 0)) if has_previous else None,
+                'next_page_token': _encode_page_token(offset + count) if has_next else None,
+                'previous_page_token': _encode_page_token(max(offset - count, 0)) if has_previous else None,
+            },
+        }
+
+    def _find(self, items: MutableMapping, path: str) -> MutableMapping:
+        resource = items.get(self.base_url + path)
+        if resource is None:
+            raise SimulatorError(404, 'Resource Not Found', 'The server could not find the requested resource.')
+        return resource
+
+    def list_scheduled_events(self, path, params):
+        if not params.get('user') and not params.get('organization'):
+            raise SimulatorError(400, 'Invalid Argument', 'One of user or organization is required.')
+        events = self.data.events
+        for name, keep in (('min_start_time', lambda event, bound: event['_start'] >= bound),
+                           ('max_start_time', lambda event, bound: event['_start'] < bound)):
+            if params.get(name):
+                try:
+                    bound = parse_time(params[name])
+                except ValueError:
+                    raise SimulatorError(400, 'Invalid Argument', f'{name} must be an ISO 8601 UTC time.')
+                events = [event for event in events if keep(event, bound)]
+        if params.get('status'):
+            events = [event for event in events if event['status'] == params['status']]
+        if params.get('invitee_email'):
+            events = [event for event in events
+                      if any(invitee['email'] == params['invitee_email'] for invitee in self.data.invitees[event['uri']])]
+        if params.get('sort', 'start_time:asc') == 'start_time:desc':
+            events = events[::-1]
+        return 200, self._paginate(path, events, params)
+
+    def list_event_invitees(self, path, params):
+        event = self._find(self.data.events_by_uri, path.rsplit('/', 1)[0])
+        invitees = self.data.invitees[event['uri']]
+        if params.get('status'):
+            invitees = [invitee for invitee in invitees if invitee['status'] == params['status']]
+        if params.get('email'):
+            invitees = [invitee for invitee in invitees if invitee['email'] == params['email']]
+        return 200, self._paginate(path, invitees, params)
+
+    def get_event_invitee(self, path, params):
+        event = self._find(self.data.events_by_uri, path.split('/invitees/')[0])
+        invitees = {invitee['uri']: invitee for invitee in self.data.invitees[event['uri']]}
+        return 200, {'resource': self._find(invitees, path)}
+
+    def list_webhooks(self, path, params):
+        if not params.get('organization') or not params.get('scope'):
+            raise SimulatorError(400, 'Invalid Argument', 'organization and scope are required.')
+        with self.data.lock:
+            webhooks = [webhook for webhook in self.data.webhooks.values()
+                        if webhook['organization'] == params['organization'] and webhook['scope'] == params['scope']
+                        and (params['scope'] != 'user' or webhook['user'] == params.get('user'))]
+        return 200, self._paginate(path, webhooks, params)
+
+    def delete_webhook(self, path, params):
+        with self.data.lock:
+            if self.data.webhooks.pop(self.base_url + path, None) is None:
+                raise SimulatorError(404, 'Resource Not Found', 'The server could not find the requested resource.')
+        return 204, None
+
+    ROUTES = (
+        ('GET', r'/users/me', lambda self, path, params: (200, {'resource': self.data.user})),
+        ('GET', r'/event_types', lambda self, path, params: (200, self._paginate(path, self.data.event_types, params))),
+        ('GET', r'/event_types/[^/]+', lambda self, path, params: (200, {'resource': self._find(self.data.event_types_by_uri, path)})),
+        ('GET', r'/scheduled_events', list_scheduled_events),
+        ('GET', r'/scheduled_events/[^/]+', lambda self, path, params: (200, {'resource': _public(self._find(self.data.events_by_uri, path))})),
+        ('GET', r'/scheduled_events/[^/]+/invitees', list_event_invitees),
+        ('GET', r'/scheduled_events/[^/]+/invitees/[^/]+', get_event_invitee),
+        ('GET', r'/webhook_subscriptions', list_webhooks),
+        ('POST', r'/webhook_subscriptions', lambda self, path, params: (201, {'resource': _public(self.data.create_webhook(params))})),
+        ('GET', r'/webhook_subscriptions/[^/]+', lambda self, path, params: (200, {'resource': _public(self._find(self.data.webhooks, path))})),
+        ('DELETE', r'/webhook_subscriptions/[^/]+', delete_webhook),
+    )
+    ROUTES = tuple((method, re.compile(pattern + '$'), handler) for method, pattern, handler in ROUTES)
+
+    def route(self, method: str, path: str, params: MutableMapping):
+        for route_method, pattern, handler in self.ROUTES:
+            if route_method == method and pattern.match(path):
+                return handler(self, path, params)
+        raise SimulatorError(404, 'Resource Not Found', 'The server could not find the requested resource.')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    simulator = None
+
+    def _respond(self, status: int, body: Optional[MutableMapping], headers: MutableMapping=None):
+        content = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if content:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _handle(self):
+        simulator = self.simulator
+        length = int(self.headers.get('Content-Length') or 0)
+        raw_body = self.rfile.read(length) if length else b''
+        simulator._count('requests')
+
+        delay = simulator._delay()
+        if delay:
+            time.sleep(delay)
+
+        headers = simulator._take_token()
+        if 'Retry-After' in headers:
+            simulator._count('rate_limited')
+            return self._respond(429, {'title': 'Too Many Requests', 'message': 'Rate limit exceeded.'}, headers)
+
+        error_status = simulator._inject_error()
+        if error_status:
+            simulator._count('errors')
+            return self._respond(error_status, {'title': 'Internal Server Error', 'message': 'Injected error.'}, headers)
+
+        if self.headers.get('Authorization', '').split(' ')[0] != 'Bearer':
+            return self._respond(401, {'title': 'Unauthenticated', 'message': 'The access token is invalid.'}, headers)
+
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        if raw_body:
+            try:
+                body = json.loads(raw_body)
+            except ValueError:
+                body = None
+            if not isinstance(body, dict):
+                return self._respond(400, {'title': 'Invalid Argument', 'message': 'Malformed json body.'}, headers)
+            params.update({key: value for key, value in body.items() if value is not None})
+        try:
+            status, body = simulator.route(self.command, url.path, params)
+        except SimulatorError as e:
+            status, body = e.status, {'title': e.title, 'message': e.message}
+        self._respond(status, body, headers)
+
+    do_GET = do_POST = do_DELETE = do_PUT = _handle
+
+    def log_message(self, *args):
+        pass
@@ -0,0 +1,227 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, MutableMapping, Optional
+
+from calendly.calendly import CalendlyAPI
+from calendly.utils.sharding import format_time, parse_time
+
+__license__ = "MIT"
+
+DEFAULT_LOOKBACK = timedelta(days=30)
+
+INSERT = 'insert'
+UPDATE = 'update'
+CANCEL = 'cancel'
+
+Change = namedtuple('Change', ['kind', 'event'])
+Change.__doc__ = """
+One entry of the change stream: `kind` is "insert", "update" or "cancel" and `event` the json scheduled event.
+"""
+
+
+class MemoryCheckpointStore(object):
+    """
+    Keeps checkpoints in memory, for tests and short-lived processes.
+    """
+
+    def __init__(self):
+        self._checkpoints = {}
+
+    def load(self, key: str) -> Optional[MutableMapping]:
+        checkpoint = self._checkpoints.get(key)
+        return json.loads(checkpoint) if checkpoint else None
+
+    def save(self, key: str, checkpoint: MutableMapping):
+        self._checkpoints[key] = json.dumps(checkpoint)
+
+    def delete(self, key: str):
+        self._checkpoints.pop(key, None)
+
+
+class JSONFileCheckpointStore(object):
+    """
+    Keeps checkpoints in a JSON file, rewritten atomically on every save.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> MutableMapping:
+        try:
+            with open(self.path, 'r') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def load(self, key: str) -> Optional[MutableMapping]:
+        with self._lock:
+            return self._read().get(key)
+
+    def _write(self, checkpoints: MutableMapping):
+        temporary_path = f'{self.path}.tmp'
+        with open(temporary_path, 'w') as file:
+            json.dump(checkpoints, file)
+        os.replace(temporary_path, self.path)
+
+    def save(self, key: str, checkpoint: MutableMapping):
+        with self._lock:
+            checkpoints = self._read()
+            checkpoints[key] = checkpoint
+            self._write(checkpoints)
+
+    def delete(self, key: str):
+        with self._lock:
+            checkpoints = self._read()
+            if checkpoints.pop(key, None) is not None:
+                self._write(checkpoints)
+
+
+class SQLiteCheckpointStore(object):
+    """
+    Keeps checkpoints in a sqlite database, which several processes can share.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS checkpoints (key TEXT PRIMARY KEY, checkpoint TEXT)")
+
+    def load(self, key: str) -> Optional[MutableMapping]:
+        with self._lock:
+            row = self._connection.execute("SELECT checkpoint FROM checkpoints WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, key: str, checkpoint: MutableMapping):
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?)", (key, json.dumps(checkpoint)))
+
+    def delete(self, key: str):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM checkpoints WHERE key = ?", (key,))
+
+    def close(self):
+        self._connection.close()
+
+
+class ScheduledEventSync(object):
+    """
+    Incremental sync of a user's scheduled events.
+
+    Calendly can only filter events by start time, so every run re-reads the events starting
+    after a moving high-water mark (the previous run minus `lookback`) instead of the whole
+    history. Events are compared with the `updated_at`/`status` recorded by earlier runs and
+    only new or changed ones are emitted. The last page token is saved after every page, so an
+    interrupted run resumes where it stopped.
+
+    The recorded state of every event is kept under `<key>/events` and only rewritten once a run
+    completes. Until then, each page's changed events are saved under their own `<key>/pages/<n>`
+    key, so a save never costs more than one page.
+    """
+
+    def __init__(self, api: CalendlyAPI, store, user_uri: str, min_start_time: str=None,
+                 lookback: timedelta=DEFAULT_LOOKBACK, key: str=None, clock: Callable[[], datetime]=None):
+        """
+        Args:
+            api (CalendlyAPI): Client used to list events.
+            store: Checkpoint store, e.g. MemoryCheckpointStore, JSONFileCheckpointStore or SQLiteCheckpointStore.
+                Checkpoints are saved under `key`, `<key>/events` and `<key>/pages/<n>`.
+            user_uri (str): User URI.
+            min_start_time (str, optional): Start of the window on the first run. Defaults to the whole history.
+            lookback (timedelta, optional): How far before the previous run later runs start reading. Defaults to 30 days.
+            key (str, optional): Checkpoint key. Defaults to the user URI.
+            clock (callable, optional): Returns the current UTC datetime.
+        """
+        self.api = api
+        self.store = store
+        self.user_uri = user_uri
+        self.initial_min_start_time = min_start_time
+        self.lookback = lookback
+        self.key = key or user_uri
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+
+    def load_checkpoint(self) -> MutableMapping:
+        checkpoint = self.store.load(self.key)
+        if checkpoint is None:
+            checkpoint = {'min_start_time': self.initial_min_start_time, 'next_page': None,
+                          'run_min_start_time': None, 'pages': 0}
+        return checkpoint
+
+    @property
+    def events_key(self) -> str:
+        return f'{self.key}/events'
+
+    def _page_key(self, page: int) -> str:
+        return f'{self.key}/pages/{page}'
+
+    def load_events(self, checkpoint: MutableMapping) -> MutableMapping:
+        """
+        Event URI -> [updated_at, status, start_time] recorded by the completed runs and the saved pages of an interrupted one.
+        """
+        events = self.store.load(self.events_key) or {}
+        for page in range(checkpoint['pages']):
+            events.update(self.store.load(self._page_key(page)) or {})
+        return events
+
+    def _classify(self, event: MutableMapping, known: MutableMapping) -> Optional[str]:
+        previous = known.get(event['uri'])
+        if previous is None:
+            return INSERT
+        updated_at, status, _ = previous
+        if event.get('updated_at') == updated_at and event.get('status') == status:
+            return None
+        if event.get('status') == 'canceled' and status != 'canceled':
+            return CANCEL
+        return UPDATE
+
+    def run(self) -> Iterator[Change]:
+        """
+        Fetch events changed since the last run and yield them as a change stream.
+        The checkpoint is saved after every page and once the run completes.
+
+        Yields:
+            Change: (kind, event) with kind "insert", "update" or "cancel"
+        """
+        checkpoint = self.load_checkpoint()
+        known = self.load_events(checkpoint)
+
+        if checkpoint['next_page']:
+            run_min_start_time = checkpoint['run_min_start_time']
+            first = self.api.request.decode(self.api.request.get(checkpoint['next_page']))
+        else:
+            run_min_start_time = checkpoint['min_start_time']
+            first = self.api.list_events(user_uri=self.user_uri, count=100, sort='start_time:asc', min_start_time=run_min_start_time)
+        started_at = self.clock()
+
+        for page in self.api.iter_pages(first):
+            changed = {}
+            for event in page['collection']:
+                kind = self._classify(event, known)
+                if kind is None:
+                    continue
+                known[event['uri']] = changed[event['uri']] = [event.get('updated_at'), event.get('status'), event.get('start_time')]
+                yield Change(kind, event)
+
+            if changed:
+                self.store.save(self._page_key(checkpoint['pages']), changed)
+                checkpoint['pages'] += 1
+            checkpoint['next_page'] = page['pagination']['next_page']
+            checkpoint['run_min_start_time'] = run_min_start_time
+            self.store.save(self.key, checkpoint)
+
+        next_min_start_time = started_at - self.lookback
+        if run_min_start_time:
+            next_min_start_time = max(next_min_start_time, parse_time(run_min_start_time))
+        checkpoint['min_start_time'] = format_time(next_min_start_time)
+        checkpoint['run_min_start_time'] = None
+        self.store.save(self.events_key, {uri: state for uri, state in known.items()
+                                          if not state[2] or parse_time(state[2]) >= next_min_start_time})
+        pages, checkpoint['pages'] = checkpoint['pages'], 0
+        self.store.save(self.key, checkpoint)
+        for page in range(pages):
+            self.store.delete(self._page_key(page))
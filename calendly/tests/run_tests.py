@@ -1,13 +1,52 @@
+import asyncio
 import copy
+import csv
+import io
 import json
+import os
+import tempfile
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock, patch
 
+import httpx
+import requests
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+from calendly.async_calendly import AsyncCalendlyAPI
+from calendly.availability import AvailabilityEngine, BusyIndex
 from calendly.calendly import CalendlyAPI
-from calendly.exceptions import CalendlyOauth2Exception, CalendlyException
+from calendly.exceptions import CalendlyOauth2Exception, CalendlyException, CalendlyWebhookException
+from calendly.export import (EVENT_COLUMN_NAMES, arrow_schema, export_scheduled_events, flatten_event, iter_batches,
+                             write_arrow, write_csv, write_parquet)
+from calendly.models import EventType, ScheduledEvent
+from calendly.pool import CalendlyClientPool
+from calendly.simulator import CalendlySimulator
+from calendly.sync import JSONFileCheckpointStore, MemoryCheckpointStore, SQLiteCheckpointStore, ScheduledEventSync
 from calendly.utils import constants
 from calendly.utils.api import CalendlyReq
+from calendly.utils.cache import BaseCache, LRUCache, SQLiteCache, make_cache_key
+from calendly.utils.codec import StdlibJSONCodec, get_default_codec, orjson, ujson
+from calendly.utils.instrumentation import Histogram, Instrumentation, endpoint_template
 from calendly.utils.oauth2 import CalendlyOauth2
+from calendly.utils.pagination import aiter_pages, iter_pages
+from calendly.utils.ratelimit import RateLimiter
+from calendly.utils.retry import RetryPolicy
+from calendly.utils.seenset import MemorySeenSet, SQLiteSeenSet
+from calendly.utils.scheduler import BACKFILL, INTERACTIVE, FairScheduler
+from calendly.utils.sharding import parse_time, split_window
+from calendly.utils.singleflight import SingleFlight
+from calendly.utils.tokens import JSONFileTokenStore, SQLiteTokenStore, TokenManager
+from calendly.utils.webhook_sync import WebhookSpec, diff_webhooks
+from calendly.webhooks import (ReorderBuffer, WebhookDeduplicator, WebhookEvent, WebhookReceiver, compute_signature,
+                               parse_event, verify_signature)
 
 # Init test objects
 mock_token = 'mock_token'
@@ -55,6 +94,26 @@ class TestCalendlyReq(unittest.TestCase):
         with self.assertRaises(CalendlyException):
             CalendlyReq(token='token', headers={'authorization': 'Bearer token'})
 
+    def test_constructor_mounts_pooled_adapter(self):
+        req = CalendlyReq(token='test_token', pool_connections=3, pool_maxsize=7)
+        adapter = req.session.get_adapter(constants.BASE)
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 7)
+
+    def test_shared_session_is_not_closed(self):
+        session = MagicMock()
+        with CalendlyAPI('token_a', session=session) as client_a:
+            client_b = CalendlyAPI('token_b', session=session)
+            self.assertIs(client_a.request.session, client_b.request.session)
+        session.close.assert_not_called()
+
+    def test_owned_session_is_closed(self):
+        req = CalendlyReq(token='test_token')
+        req.session = MagicMock()
+        with req:
+            pass
+        req.session.close.assert_called_once()
+
     def test__get_oauth2_error_from_response(self):
         req = CalendlyReq(token='test_token')
 
@@ -122,16 +181,16 @@ class TestCalendlyReq(unittest.TestCase):
         self.assertEqual(error_type, 'error')
         self.assertEqual(error_desc, 'Unknown Error.')
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_process_request_success(self, mock_get):
         req = CalendlyReq(token='test_token')
         mock_get.return_value = MockResponse('{"key": "value"}', 200)
 
         response = req.process_request('get', 'https://api.calendly.com/test')
         self.assertEqual(response.status_code, 200)
-        mock_get.assert_called_once_with('https://api.calendly.com/test', json=None, headers={'authorization': 'Bearer test_token'})
+        mock_get.assert_called_once_with('https://api.calendly.com/test', data=None, headers={'authorization': 'Bearer test_token'})
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_process_request_raises_on_error_status(self, mock_get):
         req = CalendlyReq(token='test_token')
         mock_get.return_value = MockResponse('{"title": "Not Found", "message": "Resource not found"}', 404)
@@ -139,37 +198,363 @@ class TestCalendlyReq(unittest.TestCase):
         with self.assertRaises(CalendlyException):
             req.process_request('get', 'https://api.calendly.com/test')
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get(self, mock_get):
         req = CalendlyReq(token='test_token')
         mock_get.return_value = MockResponse('{}', 200)
 
         req.get('https://api.calendly.com/test', {'param': 'value'})
-        mock_get.assert_called_once_with('https://api.calendly.com/test', json={'param': 'value'}, headers={'authorization': 'Bearer test_token'})
+        mock_get.assert_called_once_with('https://api.calendly.com/test', data=b'{"param":"value"}', headers={'authorization': 'Bearer test_token', 'content-type': 'application/json'})
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_post(self, mock_post):
         req = CalendlyReq(token='test_token')
         mock_post.return_value = MockResponse('{}', 200)
 
         req.post('https://api.calendly.com/test', {'param': 'value'})
-        mock_post.assert_called_once_with('https://api.calendly.com/test', json={'param': 'value'}, headers={'authorization': 'Bearer test_token'})
+        mock_post.assert_called_once_with('https://api.calendly.com/test', data=b'{"param":"value"}', headers={'authorization': 'Bearer test_token', 'content-type': 'application/json'})
 
-    @patch('requests.delete')
+    @patch('requests.Session.delete')
     def test_delete(self, mock_delete):
         req = CalendlyReq(token='test_token')
         mock_delete.return_value = MockResponse('{}', 200)
 
         req.delete('https://api.calendly.com/test')
-        mock_delete.assert_called_once_with('https://api.calendly.com/test', json=None, headers={'authorization': 'Bearer test_token'})
+        mock_delete.assert_called_once_with('https://api.calendly.com/test', data=None, headers={'authorization': 'Bearer test_token'})
 
-    @patch('requests.put')
+    @patch('requests.Session.put')
     def test_put(self, mock_put):
         req = CalendlyReq(token='test_token')
         mock_put.return_value = MockResponse('{}', 200)
 
         req.put('https://api.calendly.com/test', {'param': 'value'})
-        mock_put.assert_called_once_with('https://api.calendly.com/test', json={'param': 'value'}, headers={'authorization': 'Bearer test_token'})
+        mock_put.assert_called_once_with('https://api.calendly.com/test', data=b'{"param":"value"}', headers={'authorization': 'Bearer test_token', 'content-type': 'application/json'})
+
+    @patch('requests.Session.get')
+    def test_process_request_waits_and_retries_on_429(self, mock_get):
+        limiter = MagicMock()
+        req = CalendlyReq(token='test_token', rate_limiter=limiter)
+        mock_get.side_effect = [MockResponse('{}', 429, {'Retry-After': '2'}), MockResponse('{}', 200)]
+
+        response = req.get('https://api.calendly.com/test')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(limiter.acquire.call_count, 2)
+        limiter.block.assert_called_once_with({'Retry-After': '2'})
+
+    @patch('requests.Session.get')
+    def test_process_request_raises_when_rate_limit_retries_exhausted(self, mock_get):
+        req = CalendlyReq(token='test_token', rate_limiter=MagicMock(), max_rate_limit_retries=1)
+        mock_get.return_value = MockResponse('{"title": "Too Many Requests", "message": "Slow down"}', 429)
+
+        with self.assertRaises(CalendlyException):
+            req.get('https://api.calendly.com/test')
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.Session.get')
+    def test_process_request_retries_idempotent_requests(self, mock_get):
+        req = CalendlyReq(token='test_token', retry_policy=RetryPolicy(max_attempts=3, backoff_base=0))
+        mock_get.side_effect = [requests.ConnectionError(), MockResponse('{}', 503), MockResponse('{}', 200)]
+
+        response = req.get('https://api.calendly.com/test')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch('requests.Session.get')
+    def test_process_request_gives_up_after_max_attempts(self, mock_get):
+        req = CalendlyReq(token='test_token', retry_policy=RetryPolicy(max_attempts=2, backoff_base=0))
+        mock_get.return_value = MockResponse('{}', 502)
+
+        with self.assertRaises(CalendlyException):
+            req.get('https://api.calendly.com/test')
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.Session.post')
+    def test_process_request_retries_post_only_when_opted_in(self, mock_post):
+        req = CalendlyReq(token='test_token', retry_policy=RetryPolicy(max_attempts=3, backoff_base=0))
+        mock_post.side_effect = [MockResponse('{}', 503), MockResponse('{}', 201)]
+
+        with self.assertRaises(CalendlyException):
+            req.post('https://api.calendly.com/test', {})
+        self.assertEqual(mock_post.call_count, 1)
+
+        mock_post.side_effect = [MockResponse('{}', 503), MockResponse('{}', 201)]
+        self.assertEqual(req.post('https://api.calendly.com/test', {}, retry=True).status_code, 201)
+
+    def test_default_codec_prefers_available_fast_library(self):
+        self.assertEqual(get_default_codec().name, 'orjson' if orjson else 'ujson' if ujson else 'json')
+
+    def test_default_codec_falls_back_from_orjson_to_ujson_to_stdlib(self):
+        with patch('calendly.utils.codec.orjson', MagicMock()), patch('calendly.utils.codec.ujson', MagicMock()):
+            self.assertEqual(get_default_codec().name, 'orjson')
+        with patch('calendly.utils.codec.orjson', None), patch('calendly.utils.codec.ujson', MagicMock()):
+            self.assertEqual(get_default_codec().name, 'ujson')
+        with patch('calendly.utils.codec.orjson', None), patch('calendly.utils.codec.ujson', None):
+            self.assertEqual(get_default_codec().name, 'json')
+
+    @patch('requests.Session.get')
+    def test_decode_uses_configured_codec(self, mock_get):
+        codec = MagicMock()
+        codec.loads.return_value = {'resource': {}}
+        req = CalendlyReq(token='test_token', json_codec=codec)
+        mock_get.return_value = MockResponse('{"resource": {}}', 200)
+
+        self.assertEqual(req.decode(req.get('https://api.calendly.com/test')), {'resource': {}})
+        codec.loads.assert_called_once_with(b'{"resource": {}}')
+
+    def test_codecs_round_trip(self):
+        data = {'name': 'Réunion', 'count': 2, 'items': [None, True, 1.5]}
+        for codec in (StdlibJSONCodec(), get_default_codec()):
+            encoded = codec.dumps(data)
+            self.assertIsInstance(encoded, bytes)
+            self.assertEqual(codec.loads(encoded), data)
+
+    def test_retry_policy_backoff_is_capped(self):
+        policy = RetryPolicy(backoff_base=1, backoff_cap=4)
+        for attempt in range(1, 10):
+            self.assertLessEqual(policy.backoff(attempt), 4)
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_endpoint_template_hides_identifiers(self):
+        self.assertEqual(endpoint_template(f'{constants.EVENTS}/AAAA-1234/invitees?count=100'), '/scheduled_events/{uuid}/invitees')
+        self.assertEqual(endpoint_template(f'{constants.EVENTS}/GBGBDCAADAEDCRZ2'), '/scheduled_events/{uuid}')
+        self.assertEqual(endpoint_template(constants.ME), '/users/me')
+
+    def test_histogram_percentiles(self):
+        histogram = Histogram(bounds=(0.1, 0.2, 0.5))
+        self.assertIsNone(histogram.percentile(50))
+        for value in [0.05] * 50 + [0.15] * 45 + [0.4] * 4 + [0.9]:
+            histogram.observe(value)
+        self.assertAlmostEqual(histogram.percentile(50), 0.1)
+        self.assertAlmostEqual(histogram.percentile(95), 0.2)
+        self.assertLessEqual(histogram.percentile(99), 0.5)
+        self.assertEqual(histogram.percentile(100), 0.9)
+
+    @patch('requests.Session.get')
+    def test_requests_are_recorded(self, mock_get):
+        tracer, before, after = MagicMock(), MagicMock(), MagicMock()
+        instrumentation = Instrumentation(tracer=tracer, before_request=[before], after_request=[after])
+        req = CalendlyReq(token='test_token', instrumentation=instrumentation, rate_limiter=MagicMock(),
+                          retry_policy=RetryPolicy(backoff_base=0))
+        mock_get.side_effect = [MockResponse('{}', 429), MockResponse('{}', 503), MockResponse('{"resource": {}}', 200),
+                                MockResponse('{"title": "Not Found", "message": "Missing"}', 404)]
+
+        req.get(f'{constants.EVENTS}/AAAA')
+        with self.assertRaises(CalendlyException):
+            req.get(f'{constants.EVENTS}/BBBB')
+
+        self.assertEqual(before.call_count, 2)
+        record, response = after.call_args_list[0].args
+        self.assertEqual((record.name, record.status, record.retries, record.rate_limited, record.bytes_received),
+                         ('GET /scheduled_events/{uuid}', 200, 1, 1, len(b'{"resource": {}}')))
+        self.assertIsInstance(after.call_args_list[1].args[0].error, CalendlyException)
+        tracer.start_span.assert_called_with('GET /scheduled_events/{uuid}', attributes={
+            'http.method': 'GET', 'http.url': f'{constants.EVENTS}/BBBB', 'calendly.endpoint': '/scheduled_events/{uuid}'})
+        self.assertEqual(tracer.start_span.return_value.end.call_count, 2)
+
+        metrics = instrumentation.metrics
+        self.assertEqual(set(metrics.percentiles()[('GET', '/scheduled_events/{uuid}')]), {'p50', 'p95', 'p99'})
+        exported = metrics.to_prometheus()
+        self.assertIn('calendly_requests_total{method="GET",endpoint="/scheduled_events/{uuid}",status="200"} 1', exported)
+        self.assertIn('calendly_requests_total{method="GET",endpoint="/scheduled_events/{uuid}",status="404"} 1', exported)
+        self.assertIn('calendly_request_duration_seconds_bucket{method="GET",endpoint="/scheduled_events/{uuid}",le="+Inf"} 2', exported)
+        self.assertIn('calendly_retries_total{method="GET",endpoint="/scheduled_events/{uuid}"} 1', exported)
+        self.assertIn('calendly_rate_limited_total{method="GET",endpoint="/scheduled_events/{uuid}"} 1', exported)
+
+    @patch('requests.Session.get')
+    def test_cache_hits_are_recorded(self, mock_get):
+        after = MagicMock()
+        instrumentation = Instrumentation(after_request=[after])
+        req = CalendlyReq(token='test_token', cache=LRUCache(), instrumentation=instrumentation)
+        mock_get.return_value = MockResponse('{"resource": {"name": "me"}}', 200)
+
+        for _ in range(3):
+            req.get(constants.ME)
+
+        exported = instrumentation.metrics.to_prometheus()
+        self.assertIn('calendly_requests_total{method="GET",endpoint="/users/me",status="200"} 1', exported)
+        self.assertIn('calendly_cache_hits_total{method="GET",endpoint="/users/me"} 2', exported)
+        self.assertEqual(after.call_count, 1)
+
+    @patch('requests.Session.get')
+    def test_transport_errors_are_recorded(self, mock_get):
+        instrumentation = Instrumentation()
+        req = CalendlyReq(token='test_token', instrumentation=instrumentation, retry_policy=RetryPolicy(max_attempts=1))
+        mock_get.side_effect = requests.ConnectionError()
+
+        with self.assertRaises(requests.ConnectionError):
+            req.get(constants.ME)
+        self.assertEqual(dict(instrumentation.metrics.requests), {('GET', '/users/me', 'error'): 1})
+
+
+class TestCache(unittest.TestCase):
+
+    def test_incomplete_backend_cannot_be_instantiated(self):
+        class DictCache(BaseCache):
+            def _get(self, key):
+                return None
+
+        with self.assertRaises(TypeError):
+            DictCache()
+
+    @patch('requests.Session.get')
+    def test_get_responses_are_cached_per_endpoint(self, mock_get):
+        cache = LRUCache()
+        req = CalendlyReq(token='test_token', cache=cache)
+        mock_get.return_value = MockResponse('{"resource": {"name": "me"}}', 200)
+
+        first = req.get(constants.ME)
+        second = req.get(constants.ME)
+        req.get(constants.EVENTS)
+        req.get(constants.EVENTS)
+
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'revalidations': 0})
+
+    @patch('requests.Session.get')
+    def test_entries_expire_after_ttl(self, mock_get):
+        now = [0.0]
+        cache = LRUCache()
+        cache.clock = lambda: now[0]
+        req = CalendlyReq(token='test_token', cache=cache, cache_ttls={constants.EVENT_TYPE: 10})
+        mock_get.return_value = MockResponse('{}', 200)
+
+        req.get(f'{constants.EVENT_TYPE}/A')
+        now[0] = 11.0
+        req.get(f'{constants.EVENT_TYPE}/A')
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.Session.get')
+    def test_expired_entries_are_revalidated_with_validators(self, mock_get):
+        cache = LRUCache()
+        client = CalendlyAPI('test_token', cache=cache)
+        with open('./calendly/tests/get_event_details_response.json', 'r') as file:
+            content = file.read()
+        mock_get.side_effect = [
+            MockResponse(content, 200, {'ETag': '"v1"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'}),
+            MockResponse('', 304, {'ETag': '"v1"'}),
+        ]
+
+        first = client.get_event_details('mock_uuid')
+        second = client.get_event_details('mock_uuid')
+
+        self.assertEqual(first, second)
+        mock_get.assert_called_with(f'{constants.EVENTS}/mock_uuid', data=None, headers={
+            'authorization': 'Bearer test_token',
+            'If-None-Match': '"v1"',
+            'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT',
+        })
+        self.assertEqual(cache.revalidations, 1)
+
+    @patch('requests.Session.get')
+    def test_responses_without_validators_are_not_stored_for_revalidation(self, mock_get):
+        cache = LRUCache()
+        req = CalendlyReq(token='test_token', cache=cache)
+        mock_get.return_value = MockResponse('{}', 200)
+
+        req.get(f'{constants.EVENTS}/mock_uuid')
+
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction(self):
+        cache = LRUCache(maxsize=2)
+        for key in 'ABC':
+            cache.set(key, key, MockResponse('{}', 200), 60)
+        cache.get('A')
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('A'))
+        self.assertIsNotNone(cache.get('C'))
+
+    @patch('requests.Session.post')
+    @patch('requests.Session.get')
+    def test_webhook_mutations_invalidate_cache(self, mock_get, mock_post):
+        client = CalendlyAPI(mock_token, cache=LRUCache())
+        mock_get.return_value = MockResponse('{"resource": {}}', 200)
+        mock_post.return_value = MockResponse('{"resource": {}}', 201)
+
+        client.get_webhook('mock_uuid')
+        client.get_webhook('mock_uuid')
+        client.create_webhook(url='mock_url', scope='organization', organization='mock_organization')
+        client.get_webhook('mock_uuid')
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_sqlite_cache_roundtrip(self):
+        cache = SQLiteCache(':memory:')
+        cache.set('key', constants.ME, MockResponse('{"a": 1}', 200, {'ETag': 'x'}), 60)
+
+        response = cache.get('key').to_response()
+        self.assertEqual(response.json(), {'a': 1})
+        self.assertEqual(response.headers['etag'], 'x')
+
+        cache.invalidate(constants.USERS)
+        self.assertIsNone(cache.get('key'))
+        cache.close()
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.limiter = RateLimiter(window=60, safety_margin=1, clock=lambda: self.now)
+
+    def test_single_probe_until_first_response(self):
+        self.assertEqual([self.limiter.reserve() for _ in range(3)], [0.0, None, None])
+
+        self.now = 5.0
+        self.assertEqual(self.limiter.reserve(), 0.0)
+        self.limiter.release()
+        self.assertEqual(self.limiter.reserve(), 0.0)
+
+        self.limiter.update({'X-RateLimit-Limit': '61', 'X-RateLimit-Remaining': '1', 'X-RateLimit-Reset': '30'})
+        self.assertEqual(self.limiter.reserve(), 30.0)
+
+    def test_unlimited_when_responses_have_no_headers(self):
+        self.limiter.reserve()
+        self.limiter.update({})
+        self.assertEqual([self.limiter.reserve() for _ in range(100)], [0.0] * 100)
+
+    def test_concurrent_burst_waits_for_first_response(self):
+        limiter = RateLimiter(window=0.1, probe_interval=0.001)
+        sent = []
+
+        def send(index):
+            limiter.acquire()
+            sent.append(index)
+            if len(sent) == 1:
+                time.sleep(0.05)
+                self.assertEqual(len(sent), 1)
+                limiter.update({'X-RateLimit-Limit': '3', 'X-RateLimit-Remaining': '2'})
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(send, index) for index in range(4)]
+        for future in futures:
+            future.result()
+        self.assertEqual(len(sent), 4)
+
+    def test_paces_under_quota_from_headers(self):
+        self.limiter.update({'X-RateLimit-Limit': '61', 'X-RateLimit-Remaining': '3', 'X-RateLimit-Reset': '30'})
+
+        self.assertEqual(self.limiter.reserve(), 0.0)
+        self.assertEqual(self.limiter.reserve(), 0.0)
+        self.assertAlmostEqual(self.limiter.reserve(), 1.0)
+        self.assertAlmostEqual(self.limiter.reserve(), 2.0)
+
+        self.now = 10.0
+        self.assertAlmostEqual(self.limiter.reserve(), 0.0)
+
+    def test_retry_after_blocks_every_caller(self):
+        self.assertEqual(self.limiter.block({'retry-after': '5'}), 5.0)
+        self.assertEqual(self.limiter.reserve(), 5.0)
+        self.now = 5.0
+        self.assertEqual(self.limiter.reserve(), 0.0)
 
 
 # Set HTTP mock response class
@@ -319,13 +704,161 @@ class TestLogicalFunctions(unittest.TestCase):
         self.assertEqual(scheduled_events[0]['uri'], first_uri)
         self.assertEqual(scheduled_events[1]['uri'], second_uri)
 
+    def test_iter_scheduled_events_stops_early(self):
+        # Arrange
+        next_page_uri = 'https://api.calendly.com/uri_to_next_page'
+        first_page = {'collection': [{'uri': 'A'}, {'uri': 'B'}], 'pagination': {'next_page': next_page_uri}}
+
+        calendly_client.list_events = MagicMock(return_value=first_page)
+        calendly_request.get = MagicMock(return_value=MockResponse('{"collection": [], "pagination": {"next_page": null}}', 200))
+
+        # Act
+        events = calendly_client.iter_scheduled_events('mock_user_uri')
+        first_event = next(events)
+        events.close()
+
+        # Assert
+        self.assertEqual(first_event['uri'], 'A')
+        calendly_request.get.assert_not_called()
+
+    def test_iter_pages_fetches_lazily(self):
+        # Arrange
+        next_page_uri = 'https://api.calendly.com/uri_to_next_page'
+        first_page = {'collection': [{'uri': 'A'}], 'pagination': {'next_page': next_page_uri}}
+        second_page = '{"collection": [{"uri": "B"}], "pagination": {"next_page": null}}'
+        calendly_request.get = MagicMock(return_value=MockResponse(second_page, 200))
+
+        # Act
+        pages = calendly_client.iter_pages(first_page)
+
+        # Assert
+        self.assertIs(next(pages), first_page)
+        calendly_request.get.assert_not_called()
+        self.assertEqual(next(pages)['collection'][0]['uri'], 'B')
+        calendly_request.get.assert_called_once_with(next_page_uri)
+        self.assertEqual(list(pages), [])
+
+    def test_get_all_scheduled_events_sharded(self):
+        # Arrange: 48 hourly events served four per page, so every shard above an hour is dense
+        start_times = [f'2021-01-0{1 + hour // 24}T{hour % 24:02d}:00:00.000000Z' for hour in range(48)]
+        events = [{'uri': f'event/{hour}', 'start_time': start_time} for hour, start_time in enumerate(start_times)]
+        pages = {}
+
+        def serve(matching, offset):
+            next_page = None
+            if offset + 4 < len(matching):
+                next_page = f'page/{len(pages)}'
+                pages[next_page] = (matching, offset + 4)
+            return {'collection': matching[offset:offset + 4], 'pagination': {'next_page': next_page}}
+
+        def list_events(min_start_time, max_start_time, **kwargs):
+            lower, upper = parse_time(min_start_time), parse_time(max_start_time)
+            return serve([e for e in events if lower <= parse_time(e['start_time']) < upper], 0)
+
+        calendly_client.list_events = MagicMock(side_effect=list_events)
+        calendly_request.get = MagicMock(side_effect=lambda uri: MockResponse(json.dumps(serve(*pages[uri])), 200))
+
+        # Act
+        result = calendly_client.get_all_scheduled_events('mock_user_uri', '2021-01-01T00:00:00.000000Z',
+                                                          '2021-01-03T00:00:00.000000Z', shards=3, max_workers=4)
+
+        # Assert
+        self.assertEqual([event['uri'] for event in result], [event['uri'] for event in events])
+        # 3 dense shards keep their first page and split the rest into 4 windows of one page each
+        self.assertEqual(calendly_client.list_events.call_count, 15)
+        calendly_request.get.assert_not_called()
+
+    def test_get_all_scheduled_events_sharded_requires_window(self):
+        with self.assertRaises(CalendlyException):
+            calendly_client.get_all_scheduled_events('mock_user_uri', min_start_time='2021-01-01T00:00:00Z', shards=4)
+
+    def test_iter_event_invitees_follows_every_page(self):
+        # Arrange
+        pages = {f'page/{i}': {'collection': [{'uri': f'invitee/{i}'}], 'pagination': {'next_page': f'page/{i + 1}' if i < 4 else None}}
+                 for i in range(1, 5)}
+        first_page = {'collection': [{'uri': 'invitee/0'}], 'pagination': {'next_page': 'page/1'}}
+        calendly_request.get = MagicMock(side_effect=lambda uri, data=None: MockResponse(json.dumps(pages[uri]) if uri in pages else json.dumps(first_page), 200))
+
+        for prefetch in (0, 2):
+            # Act
+            invitees = list(calendly_client.iter_event_invitees('mock_uuid', status='active', prefetch=prefetch))
+
+            # Assert
+            self.assertEqual([invitee['uri'] for invitee in invitees], [f'invitee/{i}' for i in range(5)])
+        calendly_request.get.assert_any_call(f'{constants.EVENTS}/mock_uuid/invitees', {'count': 100, 'status': 'active'})
+
+    def test_get_all_with_prefetch(self):
+        # Arrange
+        pages = {f'page/{i}': {'collection': [{'uri': f'event/{i}'}], 'pagination': {'next_page': f'page/{i + 1}' if i < 9 else None}}
+                 for i in range(1, 10)}
+        first_page = {'collection': [{'uri': 'event/0'}], 'pagination': {'next_page': 'page/1'}}
+        calendly_client.list_events = MagicMock(return_value=first_page)
+        calendly_client.list_event_types = MagicMock(return_value=first_page)
+        calendly_request.get = MagicMock(side_effect=lambda uri: MockResponse(json.dumps(pages[uri]), 200))
+
+        # Act
+        events = calendly_client.get_all_scheduled_events('mock_user_uri', prefetch=3)
+        event_types = calendly_client.get_all_event_types('mock_user_uri', prefetch=1)
+
+        # Assert
+        expected = [f'event/{i}' for i in range(10)]
+        self.assertEqual([event['uri'] for event in events], expected)
+        self.assertEqual([event_type['uri'] for event_type in event_types], expected)
+
+    def test_iter_pages_prefetches_at_most_prefetch_pages_ahead(self):
+        # Arrange
+        pages = {f'page/{i}': {'collection': [], 'pagination': {'next_page': f'page/{i + 1}' if i < 9 else None}}
+                 for i in range(1, 10)}
+        first_page = {'collection': [], 'pagination': {'next_page': 'page/1'}}
+        fetched = []
+
+        def fetch_page(uri):
+            fetched.append(uri)
+            return pages[uri]
+
+        def fetched_after_settling():
+            time.sleep(0.1)
+            return len(fetched)
+
+        for prefetch in (1, 2):
+            fetched.clear()
+
+            # Act
+            iterator = iter_pages(fetch_page, first_page, prefetch=prefetch)
+            next(iterator)
+            on_first_page = fetched_after_settling()
+            next(iterator)
+            on_second_page = fetched_after_settling()
+            iterator.close()
+
+            # Assert
+            self.assertEqual(on_first_page, prefetch)
+            self.assertEqual(on_second_page, prefetch + 1)
+
+    def test_iter_pages_prefetch_raises_errors_in_consumer(self):
+        # Arrange
+        first_page = {'collection': [], 'pagination': {'next_page': 'page/1'}}
+        calendly_request.get = MagicMock(side_effect=CalendlyException('Internal Server Error'))
+
+        # Act
+        pages = calendly_client.iter_pages(first_page, prefetch=1)
+        next(pages)
+
+        # Assert
+        with self.assertRaises(CalendlyException):
+            next(pages)
+
     def test_convert_event_to_original_url_match_on_first_page(self):
         # Arrange
+        calendly_client.invalidate_scheduling_url_index()
         with open('./calendly/tests/get_event_details_response.json', 'r') as file:
             calendly_client.get_event_details = MagicMock(return_value=json.loads(file.read()))
 
         with open('./calendly/tests/list_event_types_response.json', 'r') as file:
-            calendly_client.list_event_types = MagicMock(return_value=json.loads(file.read()))
+            # Single page of event types
+            mock_page = json.loads(file.read())
+            mock_page['pagination']['next_page'] = None
+            calendly_client.list_event_types = MagicMock(return_value=mock_page)
 
         mock_event_uri = 'mock_event_uri'
         mock_user_uri = 'mock_user_uri'
@@ -338,6 +871,7 @@ class TestLogicalFunctions(unittest.TestCase):
 
     def test_convert_event_to_original_url_paging_required(self):
         # Arrange
+        calendly_client.invalidate_scheduling_url_index()
         mock_event_uri = 'mock_event_uri'
         mock_user_uri = 'mock_user_uri'
         next_page_uri = 'https://api.calendly.com/uri_to_next_page'
@@ -356,7 +890,7 @@ class TestLogicalFunctions(unittest.TestCase):
             # Result will be found only on second page   
             mock_second_page = copy.deepcopy(mock_first_page)
             mock_second_page['collection'][0]['uri'] = 'https://api.calendly.com/event_types/MOCK_URI'
-            mock_second_page['pagination']['next_page'] = 'null'
+            mock_second_page['pagination']['next_page'] = None
 
             calendly_client.list_event_types = MagicMock(return_value=mock_first_page)
 
@@ -375,6 +909,879 @@ class TestLogicalFunctions(unittest.TestCase):
         self.assertEqual(original_url, 'https://calendly.com/acmesales')
 
 
+class TestModels(unittest.TestCase):
+
+    def setUp(self):
+        with open('./calendly/tests/list_events_response.json', 'r') as file:
+            self.event_data = json.loads(file.read())['collection'][0]
+
+    def test_scheduled_event_parses_datetimes_lazily(self):
+        event = ScheduledEvent.from_dict(self.event_data)
+
+        self.assertFalse(hasattr(event, '__dict__'))
+        self.assertEqual(event._start_time, '2019-08-24T14:15:22Z')
+        self.assertEqual(event.start_time, datetime(2019, 8, 24, 14, 15, 22, tzinfo=timezone.utc))
+        self.assertIsInstance(event._start_time, datetime)
+        self.assertEqual(event.status, 'active')
+        self.assertEqual(event.to_dict()['start_time'], '2019-08-24T14:15:22Z')
+
+    def test_repeated_uris_are_interned(self):
+        first = ScheduledEvent.from_dict(json.loads(json.dumps(self.event_data)))
+        second = ScheduledEvent.from_dict(json.loads(json.dumps(self.event_data)))
+
+        self.assertIs(first.event_type, second.event_type)
+        self.assertIs(first.event_memberships[0]['user'], second.event_memberships[0]['user'])
+        self.assertIsNot(first.uri, second.uri)
+
+    def test_models_hash_on_uri(self):
+        first = ScheduledEvent.from_dict(self.event_data)
+        second = ScheduledEvent.from_dict(dict(self.event_data))
+
+        self.assertEqual(first, second)
+        self.assertEqual(len({first, second}), 1)
+        self.assertEqual(hash(first), hash(second))
+
+    def test_model_flag_on_list_and_get_methods(self):
+        client = CalendlyAPI(mock_token)
+        with open('./calendly/tests/list_event_types_response.json', 'r') as file:
+            client.request.get = MagicMock(return_value=MockResponse(file.read(), 200))
+        page = client.list_event_types(user_uri='mock_uuid', model=True)
+        self.assertIsInstance(page['collection'][0], EventType)
+        self.assertEqual(page['collection'][0].scheduling_url, 'https://calendly.com/acmesales')
+
+        with open('./calendly/tests/get_event_details_response.json', 'r') as file:
+            client.request.get = MagicMock(return_value=MockResponse(file.read(), 200))
+        event = client.get_event_details('mock_uuid', model=True)
+        self.assertEqual(event.uri, 'https://api.calendly.com/scheduled_events/MOCK_URI')
+
+
+class TestSharding(unittest.TestCase):
+
+    def test_split_window(self):
+        windows = split_window('2021-01-01T00:00:00.000Z', '2021-01-01T03:00:00.000Z', 3)
+        self.assertEqual(windows, [
+            ('2021-01-01T00:00:00.000000Z', '2021-01-01T01:00:00.000000Z'),
+            ('2021-01-01T01:00:00.000000Z', '2021-01-01T02:00:00.000000Z'),
+            ('2021-01-01T02:00:00.000000Z', '2021-01-01T03:00:00.000000Z'),
+        ])
+
+
+class FakeScheduledEventsAPI(object):
+    """Serves `events` two per page through list_events and request.get, like the Calendly API."""
+
+    def __init__(self, client):
+        self.events = []
+        self.fail_next_page = False
+        self.pages = {}
+        client.list_events = MagicMock(side_effect=self.list_events)
+        client.request.get = MagicMock(side_effect=self.get)
+
+    def serve(self, events, offset):
+        next_page = None
+        if offset + 2 < len(events):
+            next_page = f'https://api.calendly.com/scheduled_events?page_token={len(self.pages)}'
+            self.pages[next_page] = (events, offset + 2)
+        return {'collection': events[offset:offset + 2], 'pagination': {'next_page': next_page}}
+
+    def list_events(self, min_start_time=None, **kwargs):
+        return self.serve([e for e in self.events if not min_start_time or e['start_time'] >= min_start_time], 0)
+
+    def get(self, uri):
+        if self.fail_next_page:
+            self.fail_next_page = False
+            raise CalendlyException('Service Unavailable')
+        return MockResponse(json.dumps(self.serve(*self.pages[uri])), 200)
+
+
+class TestScheduledEventSync(unittest.TestCase):
+    now = datetime(2021, 6, 1, tzinfo=timezone.utc)
+
+    def setUp(self):
+        self.client = CalendlyAPI(mock_token)
+        self.api = FakeScheduledEventsAPI(self.client)
+        self.api.events = [self.event(name, day) for name, day in (('A', 1), ('B', 2), ('C', 3))]
+        self.store = MemoryCheckpointStore()
+        self.sync = ScheduledEventSync(self.client, self.store, 'mock_user_uri', lookback=timedelta(days=10),
+                                       clock=lambda: self.now)
+
+    @staticmethod
+    def event(name, day, status='active', updated_at='2021-05-01T00:00:00.000000Z'):
+        return {'uri': f'event/{name}', 'start_time': f'2021-06-{day:02d}T10:00:00.000000Z', 'status': status, 'updated_at': updated_at}
+
+    def test_emits_only_changes_after_the_first_run(self):
+        self.assertEqual([(c.kind, c.event['uri']) for c in self.sync.run()],
+                         [('insert', 'event/A'), ('insert', 'event/B'), ('insert', 'event/C')])
+
+        self.api.events[1] = self.event('B', 2, 'canceled', '2021-05-02T00:00:00.000000Z')
+        self.api.events[2] = self.event('C', 3, updated_at='2021-05-03T00:00:00.000000Z')
+        self.api.events.append(self.event('D', 4))
+
+        self.assertEqual([(c.kind, c.event['uri']) for c in self.sync.run()],
+                         [('cancel', 'event/B'), ('update', 'event/C'), ('insert', 'event/D')])
+        self.assertEqual(self.client.list_events.call_args.kwargs['min_start_time'], '2021-05-22T00:00:00.000000Z')
+        self.assertEqual(self.store.load('mock_user_uri/events')['event/C'][0], '2021-05-03T00:00:00.000000Z')
+
+    def test_page_saves_do_not_rewrite_the_event_map(self):
+        self.store.save = MagicMock(wraps=self.store.save)
+        list(self.sync.run())
+
+        saved_keys = [call.args[0] for call in self.store.save.call_args_list]
+        self.assertEqual(saved_keys.count('mock_user_uri/events'), 1)
+        self.assertEqual(saved_keys[-1], 'mock_user_uri')
+        self.assertTrue(all('events' not in call.args[1] for call in self.store.save.call_args_list if call.args[0] == 'mock_user_uri'))
+        self.assertEqual(sorted(self.store.load('mock_user_uri/events')), ['event/A', 'event/B', 'event/C'])
+        self.assertIsNone(self.store.load('mock_user_uri/pages/0'))
+
+    def test_interrupted_run_resumes_from_last_page(self):
+        self.api.fail_next_page = True
+        changes = self.sync.run()
+        self.assertEqual([c.event['uri'] for c in [next(changes), next(changes)]], ['event/A', 'event/B'])
+        with self.assertRaises(CalendlyException):
+            next(changes)
+
+        self.assertEqual([c.event['uri'] for c in self.sync.run()], ['event/C'])
+        self.client.list_events.assert_called_once()
+
+    def test_file_backed_stores(self):
+        with tempfile.TemporaryDirectory() as directory:
+            sqlite_store = SQLiteCheckpointStore(os.path.join(directory, 'checkpoints.db'))
+            for store in (JSONFileCheckpointStore(os.path.join(directory, 'checkpoints.json')), sqlite_store):
+                self.assertIsNone(store.load('key'))
+                store.save('key', {'next_page': 'page', 'events': {}})
+                self.assertEqual(store.load('key'), {'next_page': 'page', 'events': {}})
+                store.delete('key')
+                self.assertIsNone(store.load('key'))
+            sqlite_store.close()
+
+
+class TestExport(unittest.TestCase):
+
+    @staticmethod
+    def events(count):
+        for index in range(count):
+            yield {'uri': f'event/{index}', 'name': 'Intro', 'status': 'active',
+                   'start_time': '2021-06-01T10:00:00.000000Z', 'end_time': '2021-06-01T10:30:00.000000Z',
+                   'event_type': 'event_type/A', 'location': {'type': 'zoom', 'join_url': 'https://zoom.us/j/1'},
+                   'invitees_counter': {'total': 1, 'active': 1, 'limit': 1},
+                   'event_memberships': [{'user': 'user/A', 'user_email': 'a@example.com'},
+                                         {'user': 'user/B', 'user_email': 'b@example.com'}]}
+
+    def test_flatten_event(self):
+        row = flatten_event(ScheduledEvent(next(self.events(1))))
+        self.assertEqual(tuple(row), EVENT_COLUMN_NAMES)
+        self.assertEqual(row['location'], 'https://zoom.us/j/1')
+        self.assertEqual(row['host_emails'], ['a@example.com', 'b@example.com'])
+        self.assertIsNone(row['canceled_by'])
+
+    def test_batches_are_bounded(self):
+        self.assertEqual([len(batch) for batch in iter_batches(self.events(2500), 1000)], [1000, 1000, 500])
+
+    def test_write_csv(self):
+        output = io.StringIO()
+        self.assertEqual(write_csv(self.events(3), output, batch_size=2), 3)
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual([row['uri'] for row in rows], ['event/0', 'event/1', 'event/2'])
+        self.assertEqual(rows[0]['host_users'], 'user/A;user/B')
+        self.assertEqual(rows[0]['invitees_total'], '1')
+
+    def test_export_scheduled_events_streams_pages(self):
+        client = CalendlyAPI(mock_token)
+        client.iter_scheduled_events = MagicMock(return_value=self.events(5))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'events.csv')
+            self.assertEqual(export_scheduled_events(client, path, 'user/A', min_start_time='2021-01-01T00:00:00Z'), 5)
+        client.iter_scheduled_events.assert_called_once_with('user/A', prefetch=1, min_start_time='2021-01-01T00:00:00Z')
+
+        with self.assertRaises(CalendlyException):
+            export_scheduled_events(client, 'events.xlsx', 'user/A', format='xlsx')
+
+    def test_export_holds_at_most_prefetch_pages_ahead(self):
+        client = CalendlyAPI(mock_token)
+        api = FakeScheduledEventsAPI(client)
+        api.events = list(self.events(8))
+
+        def pages_ahead(events, path, batch_size):
+            ahead = []
+            for index, event in enumerate(events):
+                time.sleep(0.05)
+                pages_loaded = 1 + client.request.get.call_count
+                ahead.append(pages_loaded - (index // 2 + 1))
+            return max(ahead)
+
+        with patch.dict('calendly.export.WRITERS', {'csv': pages_ahead}):
+            self.assertEqual(export_scheduled_events(client, 'events.csv', 'user/A'), 1)
+            client.request.get.reset_mock()
+            self.assertEqual(export_scheduled_events(client, 'events.csv', 'user/A', prefetch=0), 0)
+
+    @unittest.skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_write_arrow_and_parquet(self):
+        import pyarrow.parquet as pq
+
+        with tempfile.TemporaryDirectory() as directory:
+            arrow_path, parquet_path = os.path.join(directory, 'events.arrow'), os.path.join(directory, 'events.parquet')
+            self.assertEqual(write_arrow(self.events(5), arrow_path, batch_size=2), 5)
+            self.assertEqual(write_parquet(self.events(5), parquet_path, batch_size=2), 5)
+
+            with pyarrow.ipc.open_file(arrow_path) as reader:
+                self.assertEqual(reader.num_record_batches, 3)
+                table = reader.read_all()
+            self.assertEqual(table.column('start_time')[0].as_py(), datetime(2021, 6, 1, 10, tzinfo=timezone.utc))
+            self.assertEqual(table.column('host_users')[0].as_py(), ['user/A', 'user/B'])
+
+            parquet_file = pq.ParquetFile(parquet_path)
+            self.assertEqual(parquet_file.metadata.num_row_groups, 3)
+            self.assertEqual(parquet_file.schema_arrow, arrow_schema())
+
+
+class WebhookDeliveries(object):
+    signing_key = 'mock_signing_key'
+    now = 1700000000
+
+    def delivery(self, event='invitee.created', uri='invitee/A', timestamp=None):
+        body = json.dumps({'event': event, 'created_at': '2021-06-01T10:00:00.000000Z', 'created_by': 'user/A',
+                           'payload': {'uri': uri, 'email': 'a@example.com'}}).encode('utf-8')
+        timestamp = str(timestamp or self.now)
+        return body, f't={timestamp},v1={compute_signature(body, timestamp, self.signing_key)}'
+
+    def idle_receiver(self, **kwargs):
+        """Receiver whose handler threads never start, so that accepted deliveries stay queued."""
+        receiver = WebhookReceiver(self.signing_key, clock=lambda: self.now, workers=1, **kwargs)
+        receiver.start = MagicMock()
+        return receiver
+
+    def post(self, receiver, body, signature, method='POST'):
+        environ = {'REQUEST_METHOD': method, 'CONTENT_LENGTH': str(len(body)), 'wsgi.input': io.BytesIO(body),
+                   'HTTP_CALENDLY_WEBHOOK_SIGNATURE': signature}
+        start_response = MagicMock()
+        response = json.loads(b''.join(receiver(environ, start_response)))
+        self.assertEqual(start_response.call_args.args[0].split()[0], str(response['status']))
+        return response['status']
+
+
+class TestWebhookReceiver(WebhookDeliveries, unittest.TestCase):
+
+    def test_verify_signature(self):
+        body, signature = self.delivery()
+        verify_signature(body, signature, self.signing_key, now=self.now + 60)
+
+        for header, now in ((signature.replace('v1=', 'v1=0'), self.now), (signature, self.now + 600),
+                            ('v1=abc', self.now), (None, self.now)):
+            with self.assertRaises(CalendlyWebhookException):
+                verify_signature(body, header, self.signing_key, now=now)
+        with self.assertRaises(CalendlyWebhookException):
+            verify_signature(body + b' ', signature, self.signing_key, now=self.now)
+
+    def test_parse_event(self):
+        event = parse_event(self.delivery('invitee.canceled')[0])
+        self.assertEqual((event.event, event.payload['uri']), ('invitee.canceled', 'invitee/A'))
+        with self.assertRaises(CalendlyWebhookException):
+            parse_event(b'not json')
+        with self.assertRaises(CalendlyWebhookException):
+            parse_event(self.delivery('routing_form_submission.created')[0])
+
+    def test_deliveries_are_dispatched_to_handlers(self):
+        receiver = WebhookReceiver(self.signing_key, clock=lambda: self.now, workers=2)
+        created, everything = [], []
+        receiver.on('created')(created.append)
+        receiver.on('*')(everything.append)
+
+        @receiver.on('invitee.canceled')
+        def fail(event):
+            raise ValueError(event)
+
+        self.assertEqual(self.post(receiver, *self.delivery('invitee.created')), 202)
+        self.assertEqual(self.post(receiver, *self.delivery('invitee.canceled')), 202)
+        receiver.stop()
+
+        self.assertEqual([event.payload['uri'] for event in created], ['invitee/A'])
+        self.assertEqual(sorted(event.event for event in everything), ['invitee.canceled', 'invitee.created'])
+        self.assertEqual(receiver.stats(), dict(received=2, rejected=0, duplicates=0, queued=2, overflowed=0, handled=3, failed=1, pending=0))
+        with self.assertRaises(CalendlyWebhookException):
+            receiver.on('invitee.rescheduled')
+
+    def test_rejected_and_overflowing_deliveries(self):
+        receiver = self.idle_receiver(queue_size=1)
+        body, signature = self.delivery()
+
+        self.assertEqual(self.post(receiver, body, signature, method='GET'), 405)
+        self.assertEqual(self.post(receiver, body, signature.replace('v1=', 'v1=0')), 400)
+        self.assertEqual(self.post(receiver, *self.delivery(timestamp=self.now - 600)), 400)
+        self.assertEqual(self.post(receiver, body, signature), 202)
+        self.assertEqual(self.post(receiver, body, signature), 503)
+        self.assertEqual(receiver.stats()['overflowed'], 1)
+
+    def test_asgi_app(self):
+        receiver = self.idle_receiver()
+        body, signature = self.delivery()
+        scope = {'type': 'http', 'method': 'POST', 'headers': [(b'calendly-webhook-signature', signature.encode())]}
+        messages = [{'body': body[:10], 'more_body': True}, {'body': body[10:]}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(receiver.asgi(scope, receive, send))
+        self.assertEqual(sent[0]['status'], 202)
+        self.assertEqual(receiver.queues[0].get_nowait().payload['uri'], 'invitee/A')
+
+    def test_asgi_app_handles_deliveries_off_the_event_loop(self):
+        receiver = self.idle_receiver()
+        body, signature = self.delivery()
+        scope = {'type': 'http', 'method': 'POST', 'headers': [(b'calendly-webhook-signature', signature.encode())]}
+        loop_threads = []
+
+        def handle(body, signature):
+            loop_threads.append(threading.current_thread())
+            return 202, "Accepted"
+
+        async def receive():
+            return {'body': body}
+
+        async def send(message):
+            pass
+
+        receiver.handle = handle
+        asyncio.run(receiver.asgi(scope, receive, send))
+        self.assertIsNot(loop_threads[0], threading.current_thread())
+
+    def test_at_least_one_worker_is_required(self):
+        with self.assertRaises(ValueError):
+            WebhookReceiver(self.signing_key, workers=0)
+
+
+class TestWebhookDeduplication(WebhookDeliveries, unittest.TestCase):
+
+    @staticmethod
+    def webhook_event(name, uri='invitee/A', created_at='2021-06-01T10:00:00.000000Z'):
+        return WebhookEvent(name, created_at, 'user/A', {'uri': uri})
+
+    def test_seen_sets(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'seen.db')
+            sqlite_seen, other_process = SQLiteSeenSet(path), SQLiteSeenSet(path)
+            for seen, shared in ((MemorySeenSet(maxsize=2), None), (sqlite_seen, other_process)):
+                self.assertTrue(seen.add('a', 60))
+                self.assertFalse((shared or seen).add('a', 60))
+                self.assertTrue(seen.add('expired', -1))
+                self.assertTrue(seen.add('expired', 60))
+                seen.delete('a')
+                self.assertTrue(seen.add('a', 60))
+
+            # The seen-set lives in its own table: the response cache of the same file can't see or drop it.
+            cache = SQLiteCache(path)
+            cache.invalidate()
+            self.assertIsNone(cache.lookup('a'))
+            self.assertFalse(sqlite_seen.add('a', 60))
+            cache.close()
+            sqlite_seen.close()
+            other_process.close()
+
+    def test_expired_keys_are_purged(self):
+        memory = MemorySeenSet(maxsize=10)
+        for index in range(5):
+            memory.add(f'old-{index}', -1)
+        memory.add('new', 60)
+        self.assertEqual(len(memory), 1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            seen = SQLiteSeenSet(os.path.join(directory, 'seen.db'), purge_interval=10)
+            for index in range(9):
+                seen.add(f'old-{index}', -1)
+            self.assertEqual(len(seen), 9)
+            seen.add('new', 60)
+            self.assertEqual(len(seen), 1)
+            seen.add('expired', -1)
+            seen.purge()
+            self.assertEqual(len(seen), 1)
+            seen.close()
+
+    def test_deduplicator_keys_on_invitee_event_and_creation_time(self):
+        deduplicator = WebhookDeduplicator()
+        self.assertTrue(deduplicator.add(self.webhook_event('invitee.created')))
+        self.assertFalse(deduplicator.add(self.webhook_event('invitee.created')))
+        self.assertTrue(deduplicator.add(self.webhook_event('invitee.canceled')))
+        self.assertTrue(deduplicator.add(self.webhook_event('invitee.created', created_at='2021-06-02T10:00:00.000000Z')))
+        deduplicator.discard(self.webhook_event('invitee.created'))
+        self.assertTrue(deduplicator.add(self.webhook_event('invitee.created')))
+
+    def test_reorder_buffer_releases_created_before_canceled(self):
+        now = [0]
+        buffer = ReorderBuffer(window=2, clock=lambda: now[0])
+
+        canceled = self.webhook_event('invitee.canceled')
+        self.assertEqual(buffer.push(canceled), [])
+        self.assertEqual(buffer.timeout(), 2)
+        created = self.webhook_event('invitee.created')
+        self.assertEqual(buffer.push(created), [created, canceled])
+        self.assertEqual(buffer.push(self.webhook_event('invitee.canceled')), [self.webhook_event('invitee.canceled')])
+
+        late = self.webhook_event('invitee.canceled', uri='invitee/B')
+        self.assertEqual(buffer.push(late), [])
+        now[0] = 1
+        self.assertEqual(buffer.expired(), [])
+        now[0] = 3
+        self.assertEqual(buffer.expired(), [late])
+        self.assertIsNone(buffer.timeout())
+
+    def test_receiver_drops_redeliveries_and_orders_events(self):
+        receiver = WebhookReceiver(self.signing_key, clock=lambda: self.now, workers=2,
+                                   deduplicator=WebhookDeduplicator(), reorder_window=5)
+        handled = []
+        receiver.on('*')(lambda event: handled.append((event.event, event.payload['uri'])))
+
+        deliveries = [self.delivery('invitee.canceled'), self.delivery('invitee.canceled'),
+                      self.delivery('invitee.created', uri='invitee/B'), self.delivery('invitee.created')]
+        self.assertEqual([self.post(receiver, *delivery) for delivery in deliveries], [202, 200, 202, 202])
+        receiver.stop()
+
+        self.assertEqual(len(handled), 3)
+        self.assertLess(handled.index(('invitee.created', 'invitee/A')), handled.index(('invitee.canceled', 'invitee/A')))
+        self.assertEqual(receiver.stats()['duplicates'], 1)
+
+    def test_overflowing_delivery_is_not_remembered(self):
+        receiver = self.idle_receiver(queue_size=1, deduplicator=WebhookDeduplicator())
+        self.assertEqual(self.post(receiver, *self.delivery(uri='invitee/A')), 202)
+        self.assertEqual(self.post(receiver, *self.delivery(uri='invitee/B')), 503)
+        receiver.queues[0].get_nowait()
+        self.assertEqual(self.post(receiver, *self.delivery(uri='invitee/B')), 202)
+
+
+class TestSyncWebhooks(unittest.TestCase):
+    organization = 'organization/A'
+
+    def subscription(self, index, url, events=('invitee.created',), state='active', scope='organization'):
+        return {'uri': f'{constants.WEBHOOK}/W{index}', 'callback_url': url, 'events': list(events), 'state': state,
+                'organization': self.organization, 'scope': scope, 'user': None}
+
+    def setUp(self):
+        self.client = CalendlyAPI(mock_token)
+        subscriptions = [self.subscription(1, 'https://a'), self.subscription(2, 'https://b'),
+                         self.subscription(3, 'https://a'), self.subscription(4, 'https://c', state='disabled'),
+                         self.subscription(5, 'https://d', ('invitee.created', 'invitee.canceled'))]
+        self.client.list_webhooks = MagicMock(side_effect=[
+            {'collection': subscriptions[:3], 'pagination': {'next_page': f'{constants.WEBHOOK}?page_token=2'}}])
+        self.client.request.get = MagicMock(return_value=MockResponse(json.dumps(
+            {'collection': subscriptions[3:], 'pagination': {'next_page': None}}), 200))
+        self.client.create_webhook = MagicMock(return_value={'resource': {}})
+        self.client.delete_webhook = MagicMock(return_value={'success': True})
+
+    def test_diff_webhooks(self):
+        desired = [WebhookSpec('https://a', ['created'], self.organization), WebhookSpec('https://c', ['created'], self.organization)]
+        existing = [self.subscription(1, 'https://a'), self.subscription(2, 'https://a'), self.subscription(3, 'https://c', state='disabled')]
+        to_create, to_delete, unchanged = diff_webhooks(desired, existing, CalendlyAPI.event_types_def)
+        self.assertEqual(to_create, [desired[1]])
+        self.assertEqual(to_delete, [f'{constants.WEBHOOK}/W2', f'{constants.WEBHOOK}/W3'])
+        self.assertEqual(unchanged, 1)
+
+    def test_sync_webhooks_applies_minimal_diff(self):
+        desired = [WebhookSpec('https://a', ['created'], self.organization),
+                   WebhookSpec('https://c', ['invitee.created'], self.organization, signing_key='key'),
+                   WebhookSpec('https://d', ['canceled', 'created'], self.organization)]
+
+        report = self.client.sync_webhooks(desired)
+
+        self.assertEqual(report.created, [desired[1]])
+        self.assertEqual(sorted(report.deleted), [f'{constants.WEBHOOK}/W2', f'{constants.WEBHOOK}/W3', f'{constants.WEBHOOK}/W4'])
+        self.assertEqual((report.unchanged, report.errors), (2, []))
+        self.client.list_webhooks.assert_called_once_with(self.organization, 'organization', user=None, count=100)
+        self.client.create_webhook.assert_called_once_with('https://c', 'organization', self.organization, 'key', None, ['created'])
+        self.assertEqual(sorted(call.args[0] for call in self.client.delete_webhook.call_args_list), ['W2', 'W3', 'W4'])
+
+    def test_sync_webhooks_dry_run_and_failures(self):
+        desired = [WebhookSpec('https://e', ['created'], self.organization)]
+        report = self.client.sync_webhooks(desired, dry_run=True)
+        self.assertEqual((len(report.created), len(report.deleted)), (1, 5))
+        self.client.delete_webhook.assert_not_called()
+
+        self.client.list_webhooks.side_effect = [{'collection': [], 'pagination': {'next_page': None}}]
+        self.client.create_webhook.side_effect = CalendlyException('Conflict')
+        report = self.client.sync_webhooks(desired)
+        self.assertEqual(report.created, [])
+        self.assertEqual([error.item for error in report.errors], desired)
+
+
+class TestSimulator(unittest.TestCase):
+
+    def setUp(self):
+        self.simulator = CalendlySimulator(events=250, invitees_per_event=2).start()
+        self.client = CalendlyAPI(mock_token, base_url=self.simulator.base_url)
+
+    def tearDown(self):
+        self.client.close()
+        self.simulator.stop()
+
+    def test_base_url_only_rewrites_api_urls(self):
+        self.assertEqual(self.client.request._resolve_url(constants.ME), f'{self.simulator.base_url}/users/me')
+        self.assertEqual(self.client.request._resolve_url('https://example.com/me'), 'https://example.com/me')
+
+    def test_cursor_pagination_and_filters(self):
+        events = self.client.get_all_scheduled_events(self.simulator.user_uri)
+        self.assertEqual([event['uri'] for event in events], [event['uri'] for event in self.simulator.data.events])
+        self.assertEqual(self.simulator.stats['requests'], 3)
+
+        window = self.client.get_all_scheduled_events(self.simulator.user_uri, min_start_time='2026-01-05T10:00:00Z',
+                                                      max_start_time='2026-01-05T12:00:00.000000Z')
+        self.assertEqual([event['start_time'][11:16] for event in window], ['10:00', '10:30', '11:00', '11:30'])
+
+        uuid = events[0]['uri'].rsplit('/', 1)[-1]
+        self.assertEqual(len(list(self.client.iter_event_invitees(uuid, count=1))), 2)
+        self.assertEqual(self.client.get_event_details(uuid)['resource'], events[0])
+        with self.assertRaises(CalendlyException):
+            self.client.get_event_details('MISSING')
+
+    def test_invalid_arguments_are_reported_by_route(self):
+        with self.assertRaises(CalendlyException) as context:
+            self.client.list_events(user_uri=self.simulator.user_uri, min_start_time='yesterday')
+        self.assertIn('Invalid Argument: min_start_time must be an ISO 8601 UTC time.', str(context.exception))
+
+        response = requests.get(f'{self.simulator.base_url}/scheduled_events', data=b'[1]',
+                                headers={'Authorization': f'Bearer {mock_token}'})
+        self.assertEqual((response.status_code, response.json()['message']), (400, 'Malformed json body.'))
+
+    def test_rate_limiting_and_injected_errors(self):
+        self.simulator.rate_limit, self.simulator.rate_window, self.simulator.error_rate = 3, 0.2, 0.3
+        client = CalendlyAPI(mock_token, base_url=self.simulator.base_url, rate_limiter=RateLimiter(limit=100, window=0.2),
+                             max_rate_limit_retries=20, retry_policy=RetryPolicy(max_attempts=20, backoff_base=0.001))
+        uuids = [event['uri'].rsplit('/', 1)[-1] for event in self.simulator.data.events[:10]]
+
+        results = list(client.get_event_details_many(uuids, max_workers=4))
+
+        self.assertTrue(all(result.error is None for result in results))
+        self.assertGreater(self.simulator.stats['rate_limited'], 0)
+        self.assertGreater(self.simulator.stats['errors'], 0)
+        client.close()
+
+    def test_webhook_subscriptions_and_deliveries(self):
+        receiver = WebhookReceiver('key', workers=1)
+        received = []
+        receiver.on('created')(received.append)
+        server = receiver.make_server('127.0.0.1', 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        callback_url = f'http://127.0.0.1:{server.server_port}/'
+        try:
+            report = self.client.sync_webhooks([WebhookSpec(callback_url, ['created'], self.simulator.organization_uri, signing_key='key')])
+            self.assertEqual(len(report.created), 1)
+            with self.assertRaises(CalendlyException):
+                self.client.create_webhook(callback_url, 'organization', self.simulator.organization_uri, 'key')
+
+            invitee = self.simulator.data.invitees[self.simulator.data.events[0]['uri']][0]
+            self.assertEqual([response.status_code for response in self.simulator.deliver('invitee.created', invitee)], [202])
+            self.assertEqual(self.simulator.deliver('invitee.canceled', invitee), [])
+            receiver.stop()
+            self.assertEqual(received[0].payload['uri'], invitee['uri'])
+            self.assertEqual(received[0].payload['scheduled_event']['uri'], invitee['event'])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestAsyncCalendlyAPI(unittest.IsolatedAsyncioTestCase):
+
+    def make_client(self, handler):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return AsyncCalendlyAPI(mock_token, client=client)
+
+    async def test_get_event_details(self):
+        with open('./calendly/tests/get_event_details_response.json', 'r') as file:
+            content = file.read()
+
+        def handler(request):
+            self.assertEqual(str(request.url), f'{constants.EVENTS}/mock_uuid')
+            self.assertEqual(request.headers['authorization'], f'Bearer {mock_token}')
+            return httpx.Response(200, content=content)
+
+        async with self.make_client(handler) as client:
+            response = await client.get_event_details('mock_uuid')
+
+        self.assertEqual(response['resource']['uri'], 'https://api.calendly.com/scheduled_events/MOCK_URI')
+
+    async def test_token_manager_refreshes_after_401(self):
+        oauth2 = MagicMock()
+        oauth2.refresh_access_token.return_value = {'access_token': 'fresh', 'refresh_token': 'refresh-1', 'expires_in': 7200}
+        manager = TokenManager(oauth2)
+        manager.set_token('acme', {'access_token': 'revoked', 'refresh_token': 'refresh-0', 'expires_in': 7200})
+
+        def handler(request):
+            if request.headers['authorization'] == 'Bearer revoked':
+                return httpx.Response(401, json={'title': 'Unauthenticated', 'message': 'revoked'})
+            return httpx.Response(200, json={'resource': {'uri': 'me'}})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with AsyncCalendlyAPI(token_manager=manager, tenant='acme', client=client) as api:
+            self.assertEqual(await api.about(), {'resource': {'uri': 'me'}})
+        oauth2.refresh_access_token.assert_called_once_with('refresh-0')
+
+    async def test_identical_concurrent_gets_are_coalesced(self):
+        requests_sent = []
+
+        async def handler(request):
+            requests_sent.append(str(request.url))
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={'resource': {'uri': str(request.url)}})
+
+        async with self.make_client(handler) as client:
+            results = await asyncio.gather(*[client.get_event_details('mock_uuid') for _ in range(5)],
+                                           client.get_event_details('other_uuid'))
+
+            self.assertEqual(len(requests_sent), 2)
+            self.assertEqual(results[0], results[4])
+            self.assertEqual(client.request.single_flight.stats(), {'leaders': 2, 'coalesced': 4, 'in_flight': 0})
+
+    async def test_get_all_scheduled_events(self):
+        next_page_uri = 'https://api.calendly.com/uri_to_next_page'
+        pages = {
+            constants.EVENTS: {'collection': [{'uri': 'A'}], 'pagination': {'next_page': next_page_uri}},
+            next_page_uri: {'collection': [{'uri': 'B'}], 'pagination': {'next_page': None}},
+        }
+
+        def handler(request):
+            return httpx.Response(200, json=pages[str(request.url)])
+
+        async with self.make_client(handler) as client:
+            events = await client.get_all_scheduled_events('mock_user_uri')
+
+        self.assertEqual([event['uri'] for event in events], ['A', 'B'])
+
+    async def test_iter_event_invitees_with_prefetch(self):
+        invitees_url = f'{constants.EVENTS}/mock_uuid/invitees'
+        pages = {
+            invitees_url: {'collection': [{'uri': 'A'}], 'pagination': {'next_page': 'https://api.calendly.com/page/2'}},
+            'https://api.calendly.com/page/2': {'collection': [{'uri': 'B'}], 'pagination': {'next_page': 'https://api.calendly.com/page/3'}},
+            'https://api.calendly.com/page/3': {'collection': [{'uri': 'C'}], 'pagination': {'next_page': None}},
+        }
+
+        def handler(request):
+            return httpx.Response(200, json=pages[str(request.url)])
+
+        async with self.make_client(handler) as client:
+            invitees = [invitee['uri'] async for invitee in client.iter_event_invitees('mock_uuid', prefetch=1)]
+
+        self.assertEqual(invitees, ['A', 'B', 'C'])
+
+    async def test_convert_event_to_original_url_uses_index(self):
+        event_types_requests = []
+
+        def handler(request):
+            if request.url.path == '/event_types':
+                event_types_requests.append(str(request.url))
+                return httpx.Response(200, json={'collection': [{'uri': 'type/A', 'scheduling_url': 'https://calendly.com/a'}],
+                                                 'pagination': {'next_page': None}})
+            event_type = 'type/A' if request.url.path.endswith('/1') else 'type/deleted'
+            return httpx.Response(200, json={'resource': {'event_type': event_type}})
+
+        async with self.make_client(handler) as client:
+            urls = [await client.convert_event_to_original_url(uri, 'mock_user_uri') for uri in ('1', '2', '1', '2', '2')]
+
+        self.assertEqual(urls, ['https://calendly.com/a', None, 'https://calendly.com/a', None, None])
+        self.assertEqual(len(event_types_requests), 2)
+
+    async def test_aiter_pages_prefetches_at_most_prefetch_pages_ahead(self):
+        pages = {f'page/{i}': {'collection': [], 'pagination': {'next_page': f'page/{i + 1}' if i < 9 else None}}
+                 for i in range(1, 10)}
+        first_page = {'collection': [], 'pagination': {'next_page': 'page/1'}}
+        fetched = []
+
+        async def fetch_page(uri):
+            fetched.append(uri)
+            return pages[uri]
+
+        for prefetch in (1, 2):
+            fetched.clear()
+            iterator = aiter_pages(fetch_page, first_page, prefetch=prefetch)
+            await iterator.__anext__()
+            await asyncio.sleep(0.05)
+            self.assertEqual(len(fetched), prefetch)
+            await iterator.__anext__()
+            await asyncio.sleep(0.05)
+            self.assertEqual(len(fetched), prefetch + 1)
+            await iterator.aclose()
+
+    def test_exposes_every_public_method_of_calendly_api(self):
+        public = lambda cls: {name for name in dir(cls) if not name.startswith('_')}
+        self.assertEqual(public(AsyncCalendlyAPI), public(CalendlyAPI))
+
+    async def test_get_all_scheduled_events_sharded(self):
+        start_times = [f'2021-01-0{1 + hour // 24}T{hour % 24:02d}:00:00.000000Z' for hour in range(48)]
+        events = [{'uri': f'event/{hour}', 'start_time': start_time} for hour, start_time in enumerate(start_times)]
+        listed = []
+
+        def handler(request):
+            params = json.loads(request.content)
+            listed.append(params['min_start_time'])
+            lower, upper = parse_time(params['min_start_time']), parse_time(params['max_start_time'])
+            matching = [e for e in events if lower <= parse_time(e['start_time']) < upper]
+            next_page = 'https://api.calendly.com/unused' if len(matching) > 4 else None
+            return httpx.Response(200, json={'collection': matching[:4], 'pagination': {'next_page': next_page}})
+
+        async with self.make_client(handler) as client:
+            result = await client.get_all_scheduled_events('mock_user_uri', '2021-01-01T00:00:00.000000Z',
+                                                           '2021-01-03T00:00:00.000000Z', shards=3, max_workers=4)
+
+        self.assertEqual([event['uri'] for event in result], [event['uri'] for event in events])
+        self.assertEqual(len(listed), 15)
+
+    async def test_many_helpers_report_failures(self):
+        def handler(request):
+            if 'broken' in request.url.path:
+                return httpx.Response(404, json={'title': 'Not Found', 'message': 'Resource not found'})
+            return httpx.Response(200, json={'resource': {'uri': request.url.path}, 'collection': []})
+
+        async with self.make_client(handler) as client:
+            details = [result async for result in client.get_event_details_many(['a', 'broken', 'b'], max_workers=2)]
+            invitees = [result async for result in client.list_event_invitees_many(['a', 'broken'], ordered=False)]
+
+        self.assertEqual([result.item for result in details], ['a', 'broken', 'b'])
+        self.assertIsInstance(details[1].error, CalendlyException)
+        self.assertEqual(details[2].result['resource']['uri'], '/scheduled_events/b')
+        self.assertEqual(sorted(result.error is None for result in invitees), [False, True])
+
+    async def test_convert_events_to_original_urls(self):
+        def handler(request):
+            if request.url.path == '/event_types':
+                return httpx.Response(200, json={'collection': [{'uri': 'type/A', 'scheduling_url': 'https://calendly.com/a'}],
+                                                 'pagination': {'next_page': None}})
+            return httpx.Response(200, json={'resource': {'event_type': 'type/A'}})
+
+        async with self.make_client(handler) as client:
+            urls = await client.convert_events_to_original_urls(['1', '2', '3'], 'mock_user_uri', max_workers=2)
+
+        self.assertEqual(urls, ['https://calendly.com/a'] * 3)
+
+    async def test_get_responses_are_cached(self):
+        requests_sent = []
+
+        def handler(request):
+            requests_sent.append(request.url.path)
+            return httpx.Response(200, json={'resource': {'uri': 'me'}})
+
+        with tempfile.TemporaryDirectory() as directory:
+            for cache in (LRUCache(), SQLiteCache(os.path.join(directory, 'cache.db'))):
+                requests_sent.clear()
+                client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+                async with AsyncCalendlyAPI(mock_token, client=client, cache=cache) as api:
+                    self.assertEqual(await api.about(), await api.about())
+                self.assertEqual(requests_sent, ['/users/me'])
+                self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'revalidations': 0})
+            cache.close()
+
+    async def test_sync_webhooks(self):
+        subscriptions = {f'{constants.WEBHOOK}/W1': {'uri': f'{constants.WEBHOOK}/W1', 'callback_url': 'https://old',
+                                                     'events': ['invitee.created'], 'state': 'active',
+                                                     'organization': 'organization/A', 'scope': 'organization'}}
+
+        def handler(request):
+            if request.method == 'GET':
+                return httpx.Response(200, json={'collection': list(subscriptions.values()), 'pagination': {'next_page': None}})
+            if request.method == 'DELETE':
+                del subscriptions[str(request.url)]
+                return httpx.Response(204)
+            body = json.loads(request.content)
+            subscriptions['new'] = {'uri': 'new', 'callback_url': body['url'], 'events': body['events'], 'state': 'active',
+                                    'organization': body['organization'], 'scope': body['scope']}
+            return httpx.Response(201, json={'resource': subscriptions['new']})
+
+        desired = [WebhookSpec('https://new', ['created', 'canceled'], 'organization/A')]
+        async with self.make_client(handler) as client:
+            report = await client.sync_webhooks(desired)
+            self.assertEqual((report.created, report.deleted, report.unchanged), (desired, [f'{constants.WEBHOOK}/W1'], 0))
+            report = await client.sync_webhooks(desired)
+            self.assertEqual((report.created, report.deleted, report.unchanged), ([], [], 1))
+
+    async def test_raises_calendly_exception(self):
+        def handler(request):
+            return httpx.Response(404, json={'title': 'Not Found', 'message': 'Resource not found'})
+
+        async with self.make_client(handler) as client:
+            with self.assertRaises(CalendlyException):
+                await client.about()
+
+    def test_convert_events_to_original_urls_uses_index(self):
+        # Arrange
+        calendly_client.invalidate_scheduling_url_index()
+        event_types = {'collection': [{'uri': 'type/A', 'scheduling_url': 'https://calendly.com/a'},
+                                      {'uri': 'type/B', 'scheduling_url': 'https://calendly.com/b'}],
+                       'pagination': {'next_page': None}}
+        details = {'event/1': 'type/A', 'event/2': 'type/B', 'event/3': 'type/A'}
+
+        calendly_client.list_event_types = MagicMock(return_value=event_types)
+        calendly_client.get_event_details = MagicMock(side_effect=lambda uri: {'resource': {'event_type': details[uri]}})
+
+        # Act
+        urls = calendly_client.convert_events_to_original_urls(['event/1', 'event/2', 'event/3'], 'mock_user_uri')
+
+        # Assert
+        self.assertEqual(urls, ['https://calendly.com/a', 'https://calendly.com/b', 'https://calendly.com/a'])
+        calendly_client.list_event_types.assert_called_once()
+
+    def test_convert_event_to_original_url_refreshes_index_on_miss(self):
+        # Arrange
+        calendly_client.invalidate_scheduling_url_index()
+        stale = {'collection': [{'uri': 'type/A', 'scheduling_url': 'https://calendly.com/a'}], 'pagination': {'next_page': None}}
+        fresh = {'collection': stale['collection'] + [{'uri': 'type/new', 'scheduling_url': 'https://calendly.com/new'}],
+                 'pagination': {'next_page': None}}
+
+        calendly_client.list_event_types = MagicMock(side_effect=[stale, fresh])
+        calendly_client.get_event_details = MagicMock(return_value={'resource': {'event_type': 'type/A'}})
+        calendly_client.convert_event_to_original_url('event/1', 'mock_user_uri')
+        calendly_client.get_event_details = MagicMock(return_value={'resource': {'event_type': 'type/new'}})
+
+        # Act
+        original_url = calendly_client.convert_event_to_original_url('event/2', 'mock_user_uri')
+
+        # Assert
+        self.assertEqual(original_url, 'https://calendly.com/new')
+        self.assertEqual(calendly_client.list_event_types.call_count, 2)
+
+    def test_unknown_event_types_refresh_index_once(self):
+        # Arrange
+        calendly_client.invalidate_scheduling_url_index()
+        page = {'collection': [{'uri': 'type/A', 'scheduling_url': 'https://calendly.com/a'}], 'pagination': {'next_page': None}}
+        calendly_client.list_event_types = MagicMock(return_value=page)
+        event_types = {'event/1': 'type/deleted', 'event/2': 'type/other', 'event/3': 'type/deleted', 'event/4': 'type/A'}
+        calendly_client.get_event_details = MagicMock(side_effect=lambda uri: {'resource': {'event_type': event_types[uri]}})
+
+        # Act
+        original_urls = [calendly_client.convert_event_to_original_url(uri, 'mock_user_uri') for uri in event_types]
+
+        # Assert
+        self.assertEqual(original_urls, [None, None, None, 'https://calendly.com/a'])
+        self.assertEqual(calendly_client.list_event_types.call_count, 2)
+
+    def test_get_event_details_many_reports_failures(self):
+        # Arrange
+        def get_event_details(uuid):
+            if uuid == 'broken':
+                raise CalendlyException('Not Found: Resource not found')
+            return {'resource': {'uri': uuid}}
+
+        calendly_client.get_event_details = MagicMock(side_effect=get_event_details)
+        uuids = ['a', 'broken'] + [str(i) for i in range(50)]
+
+        # Act
+        results = list(calendly_client.get_event_details_many(uuids, max_workers=4))
+
+        # Assert
+        self.assertEqual([result.item for result in results], uuids)
+        self.assertIsInstance(results[1].error, CalendlyException)
+        self.assertIsNone(results[1].result)
+        self.assertEqual(results[0].result, {'resource': {'uri': 'a'}})
+        self.assertTrue(all(result.error is None for result in results if result.item != 'broken'))
+
+    def test_list_event_invitees_many_in_completion_order(self):
+        # Arrange
+        calendly_client.list_event_invitees = MagicMock(side_effect=lambda uuid: {'collection': [uuid]})
+
+        # Act
+        results = list(calendly_client.list_event_invitees_many(range(20), max_workers=3, ordered=False))
+
+        # Assert
+        self.assertEqual(sorted(result.item for result in results), list(range(20)))
+        self.assertTrue(all(result.result == {'collection': [result.item]} for result in results))
+
+
 class TestCalendlyOauth2(unittest.TestCase):
     client_id = "ClientID123"
     client_secret = "Secret123"
@@ -607,5 +2014,346 @@ class TestCalendlyOauth2(unittest.TestCase):
         send_post_mock.assert_called_with(constants.OAUTH_INTROSPECT_URL, expected_data)
 
 
+class TestTokenManager(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        self.oauth2 = MagicMock()
+        self.refreshed = 0
+
+        def refresh(refresh_token):
+            self.refreshed += 1
+            return {'access_token': f'access-{self.refreshed}', 'refresh_token': f'refresh-{self.refreshed}',
+                    'expires_in': 7200}
+        self.oauth2.refresh_access_token.side_effect = refresh
+        self.manager = TokenManager(self.oauth2, refresh_margin=300, clock=lambda: self.now)
+        self.manager.set_token('acme', {'access_token': 'access-0', 'refresh_token': 'refresh-0', 'expires_in': 7200})
+
+    def test_token_is_cached_until_the_refresh_margin(self):
+        self.assertEqual(self.manager.store.load('acme')['expires_at'], 8200.0)
+        self.now = 7800.0
+        self.assertEqual(self.manager.get_token('acme'), 'access-0')
+        self.assertEqual(self.manager.cached_token('acme'), 'access-0')
+
+        self.now = 8000.0
+        self.assertIsNone(self.manager.cached_token('acme'))
+        self.assertEqual(self.manager.get_token('acme'), 'access-1')
+        self.oauth2.refresh_access_token.assert_called_once_with('refresh-0')
+        self.assertEqual(self.manager.store.load('acme')['refresh_token'], 'refresh-1')
+
+        with self.assertRaises(CalendlyOauth2Exception):
+            self.manager.get_token('unknown')
+
+    def test_expiry_from_introspection(self):
+        self.oauth2.introspect_access_token.return_value = {'active': True, 'exp': 5000}
+        record = self.manager.set_token('initech', {'access_token': 'token', 'refresh_token': 'refresh'})
+        self.assertEqual(record['expires_at'], 5000.0)
+        self.oauth2.introspect_access_token.assert_called_once_with('token')
+
+    def test_concurrent_refreshes_are_collapsed(self):
+        self.now = 9000.0
+        refresh = self.oauth2.refresh_access_token.side_effect
+        self.oauth2.refresh_access_token.side_effect = lambda token: time.sleep(0.05) or refresh(token)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            tokens = list(executor.map(lambda _: self.manager.get_token('acme'), range(16)))
+
+        self.assertEqual(set(tokens), {'access-1'})
+        self.assertEqual(self.manager.refreshes, 1)
+
+    def test_failed_proactive_refresh_keeps_the_valid_token(self):
+        self.oauth2.refresh_access_token.side_effect = CalendlyOauth2Exception('invalid_grant')
+        self.now = 8000.0
+        self.assertEqual(self.manager.get_token('acme'), 'access-0')
+        self.assertEqual(self.manager.refresh_failures, 1)
+
+        self.now = 8200.0
+        with self.assertRaises(CalendlyOauth2Exception):
+            self.manager.get_token('acme')
+
+    def test_invalidate_refreshes_a_rejected_token_once(self):
+        self.assertEqual(self.manager.invalidate('acme', 'access-0'), 'access-1')
+        self.assertEqual(self.manager.invalidate('acme', 'access-0'), 'access-1')
+        self.assertEqual(self.manager.refreshes, 1)
+
+    def test_shared_stores_adopt_tokens_refreshed_elsewhere(self):
+        with tempfile.TemporaryDirectory() as directory:
+            stores = [(JSONFileTokenStore(os.path.join(directory, 'tokens.json')),) * 2,
+                      (SQLiteTokenStore(os.path.join(directory, 'tokens.db')), SQLiteTokenStore(os.path.join(directory, 'tokens.db')))]
+            for first_store, second_store in stores:
+                first = TokenManager(self.oauth2, first_store, clock=lambda: self.now)
+                second = TokenManager(self.oauth2, second_store, clock=lambda: self.now)
+                first.set_token('acme', {'access_token': 'stale', 'refresh_token': 'refresh-0', 'expires_in': 7200})
+                self.assertEqual(second.get_token('acme'), 'stale')
+
+                self.now += 7000
+                refreshed = first.get_token('acme')
+                self.assertEqual(second.get_token('acme'), refreshed)
+                self.assertEqual((first.refreshes, second.refreshes), (1, 0))
+
+                second.revoke('acme')
+                self.oauth2.revoke_access_token.assert_called_with(refreshed)
+                self.assertIsNone(first_store.load('acme'))
+            stores[1][0].close()
+            stores[1][1].close()
+            self.assertEqual(os.stat(os.path.join(directory, 'tokens.json')).st_mode & 0o777, 0o600)
+
+    def test_refresh_is_single_flight_across_processes(self):
+        used_refresh_tokens = []
+
+        def rotating_refresh(refresh_token):
+            if refresh_token in used_refresh_tokens:
+                raise CalendlyOauth2Exception('invalid_grant')
+            used_refresh_tokens.append(refresh_token)
+            time.sleep(0.05)
+            return {'access_token': f'after-{refresh_token}', 'refresh_token': f'{refresh_token}+', 'expires_in': 7200}
+        self.oauth2.refresh_access_token.side_effect = rotating_refresh
+
+        with tempfile.TemporaryDirectory() as directory:
+            json_path, sqlite_path = os.path.join(directory, 'tokens.json'), os.path.join(directory, 'tokens.db')
+            for make_store in (lambda: JSONFileTokenStore(json_path), lambda: SQLiteTokenStore(sqlite_path, poll_interval=0.01)):
+                used_refresh_tokens.clear()
+                # One manager and store per worker process, as if each ran in its own interpreter.
+                managers = [TokenManager(self.oauth2, make_store(), clock=lambda: self.now) for _ in range(4)]
+                managers[0].set_token('acme', {'access_token': 'stale', 'refresh_token': 'refresh', 'expires_in': 7200})
+                self.now += 8000
+
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    tokens = list(executor.map(lambda manager: manager.get_token('acme'), managers))
+
+                self.assertEqual(tokens, ['after-refresh'] * 4)
+                self.assertEqual(used_refresh_tokens, ['refresh'])
+
+    def test_request_is_resent_once_after_401(self):
+        client = CalendlyAPI(token_manager=self.manager, tenant='acme')
+        client.request.session = MagicMock()
+        client.request.session.get.side_effect = [MockResponse('{"title": "Unauthenticated", "message": "expired"}', 401),
+                                                  MockResponse('{"resource": {"uri": "me"}}', 200)]
+
+        self.assertEqual(client.about(), {'resource': {'uri': 'me'}})
+
+        headers = [call.kwargs['headers']['authorization'] for call in client.request.session.get.call_args_list]
+        self.assertEqual(headers, ['Bearer access-0', 'Bearer access-1'])
+
+        client.request.session.get.side_effect = [MockResponse('{"title": "Unauthenticated", "message": "revoked"}', 401)] * 2
+        with self.assertRaises(CalendlyException):
+            client.about()
+        self.assertEqual(self.manager.refreshes, 2)
+
+        with self.assertRaises(CalendlyException):
+            CalendlyAPI(mock_token, token_manager=self.manager)
+
+
+class TestClientPool(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        oauth2 = MagicMock()
+        self.token_manager = TokenManager(oauth2)
+        for tenant in ('acme', 'initech', 'umbrella'):
+            self.token_manager.set_token(tenant, {'access_token': f'{tenant}-token', 'refresh_token': 'refresh', 'expires_in': 7200})
+
+    def test_clients_share_the_session_and_are_evicted_lru(self):
+        with CalendlyClientPool(self.token_manager, max_clients=2, idle_timeout=60, clock=lambda: self.now) as pool:
+            acme, initech = pool.get('acme'), pool.get('initech')
+            self.assertIs(pool.get('acme'), acme)
+            self.assertIs(acme.request.session, initech.request.session)
+            self.assertIsNot(acme.request.rate_limiter, initech.request.rate_limiter)
+            self.assertEqual(acme.request.tenant, 'acme')
+
+            pool.get('umbrella')
+            self.assertNotIn('initech', pool)
+            self.assertIn('acme', pool)
+
+            self.now = 30.0
+            pool.get('acme')
+            self.now = 70.0
+            pool.evict_idle()
+            self.assertEqual(list(pool._clients), ['acme'])
+            self.assertEqual(pool.stats()['evictions'], 2)
+
+    def test_scheduler_prefers_interactive_work_and_rotates_tenants(self):
+        scheduler = FairScheduler(max_tenant_concurrency=10)
+        for index in range(4):
+            scheduler.put('heavy', f'heavy-{index}', BACKFILL)
+        scheduler.put('light', 'light-0', BACKFILL)
+        scheduler.put('light', 'light-1', BACKFILL)
+        scheduler.put('other', 'interactive', INTERACTIVE)
+
+        order = [scheduler.get()[1] for _ in range(7)]
+
+        self.assertEqual(order, ['interactive', 'heavy-0', 'light-0', 'heavy-1', 'light-1', 'heavy-2', 'heavy-3'])
+
+    def test_scheduler_caps_running_tasks_per_tenant(self):
+        scheduler = FairScheduler(max_tenant_concurrency=1)
+        scheduler.put('heavy', 'heavy-0')
+        scheduler.put('heavy', 'heavy-1')
+        scheduler.put('light', 'light-0', BACKFILL)
+
+        self.assertEqual(scheduler.get(), ('heavy', 'heavy-0'))
+        self.assertEqual(scheduler.get(), ('light', 'light-0'))
+        scheduler.done('heavy')
+        self.assertEqual(scheduler.get(), ('heavy', 'heavy-1'))
+        scheduler.close()
+        self.assertIsNone(scheduler.get())
+
+    def test_submitted_work_uses_each_tenant_token(self):
+        with CalendlySimulator(events=10) as simulator:
+            with CalendlyClientPool(self.token_manager, max_workers=4, base_url=simulator.base_url) as pool:
+                futures = {tenant: pool.submit(tenant, CalendlyAPI.about) for tenant in ('acme', 'initech')}
+                backfill = pool.submit_backfill('acme', CalendlyAPI.get_all_scheduled_events, simulator.user_uri)
+                failing = pool.submit('umbrella', CalendlyAPI.get_event_details, 'MISSING')
+
+                self.assertEqual(futures['acme'].result()['resource']['uri'], simulator.user_uri)
+                self.assertEqual(len(backfill.result()), 10)
+                self.assertIsInstance(failing.exception(), CalendlyException)
+                self.assertEqual(len(pool), 3)
+
+    def test_cache_keys_are_scoped_to_the_tenant(self):
+        self.assertNotEqual(make_cache_key('get', constants.ME, None, 'acme'), make_cache_key('get', constants.ME, None, 'initech'))
+        self.assertEqual(make_cache_key('get', constants.ME), f'GET {constants.ME} ')
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def slow_response(self, *args, **kwargs):
+        time.sleep(0.05)
+        return MockResponse('{"resource": {"uri": "https://api.calendly.com/scheduled_events/mock_uuid"}}', 200)
+
+    def fetch_concurrently(self, client, uuids):
+        with ThreadPoolExecutor(max_workers=len(uuids)) as executor:
+            return list(executor.map(client.get_event_details, uuids))
+
+    def test_identical_concurrent_gets_share_one_request(self):
+        instrumentation = Instrumentation()
+        client = CalendlyAPI(mock_token, instrumentation=instrumentation)
+        client.request.session = MagicMock()
+        client.request.session.get.side_effect = self.slow_response
+
+        results = self.fetch_concurrently(client, ['AAAA-1111'] * 8)
+
+        self.assertEqual(client.request.session.get.call_count, 1)
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertIsNot(results[0], results[1])
+        self.assertEqual(client.request.single_flight.stats(), {'leaders': 1, 'coalesced': 7, 'in_flight': 0})
+        self.assertIn('calendly_coalesced_total{method="GET",endpoint="/scheduled_events/{uuid}"} 7',
+                      instrumentation.metrics.to_prometheus())
+
+        self.fetch_concurrently(client, ['AAAA-1111', 'BBBB-2222'])
+        self.assertEqual(client.request.session.get.call_count, 3)
+
+    def test_errors_are_shared_and_coalescing_can_be_disabled(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        def failing():
+            calls.append(1)
+            time.sleep(0.05)
+            raise CalendlyException('boom')
+
+        def call(_):
+            try:
+                single_flight.do('key', failing)
+            except CalendlyException as error:
+                return error
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            errors = list(executor.map(call, range(4)))
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(isinstance(error, CalendlyException) for error in errors))
+
+        client = CalendlyAPI(mock_token, single_flight=False)
+        client.request.session = MagicMock()
+        client.request.session.get.side_effect = self.slow_response
+        self.fetch_concurrently(client, ['mock_uuid'] * 3)
+        self.assertEqual(client.request.session.get.call_count, 3)
+
+
+class TestAvailability(unittest.TestCase):
+    host = 'https://api.calendly.com/users/HOST'
+
+    def event(self, name, start, end, status='active'):
+        return {'uri': f'https://api.calendly.com/scheduled_events/{name}', 'status': status,
+                'start_time': f'2026-03-02T{start}:00.000000Z', 'end_time': f'2026-03-02T{end}:00.000000Z',
+                'event_memberships': [{'user': self.host}]}
+
+    def at(self, clock):
+        return datetime.fromisoformat(f'2026-03-02T{clock}:00+00:00')
+
+    def setUp(self):
+        self.events = [self.event('A', '09:00', '10:00'), self.event('B', '09:30', '10:30'),
+                       self.event('C', '11:00', '11:30'), self.event('D', '13:00', '14:00', status='canceled')]
+
+    def test_free_busy_and_slots(self):
+        index = BusyIndex(self.events)
+
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.busy(self.at('08:00'), self.at('12:00')),
+                         [(self.at('09:00'), self.at('10:30')), (self.at('11:00'), self.at('11:30'))])
+        self.assertEqual(index.free('2026-03-02T10:00:00Z', '2026-03-02T12:00:00Z'),
+                         [(self.at('10:30'), self.at('11:00')), (self.at('11:30'), self.at('12:00'))])
+        self.assertTrue(index.is_free(self.at('10:30'), self.at('11:00')))
+        self.assertFalse(index.is_free(self.at('10:29'), self.at('11:00')))
+
+        self.assertEqual(index.next_slot(self.at('09:15'), timedelta(minutes=30)), (self.at('10:30'), self.at('11:00')))
+        self.assertEqual(index.next_slot(self.at('09:15'), timedelta(minutes=45)), (self.at('11:30'), self.at('12:15')))
+        self.assertIsNone(index.next_slot(self.at('09:15'), timedelta(minutes=45), until=self.at('12:00')))
+        self.assertEqual([slot.start for slot in index.slots(self.at('10:00'), self.at('12:30'), timedelta(minutes=30), step=timedelta(minutes=15))],
+                         [self.at('10:30'), self.at('11:30'), self.at('11:45'), self.at('12:00')])
+
+    def test_incremental_updates_remerge_overlapping_events(self):
+        index = BusyIndex(self.events)
+
+        self.assertTrue(index.remove('https://api.calendly.com/scheduled_events/A'))
+        self.assertEqual(list(zip(index.starts, index.ends)), [(self.at('09:30').timestamp(), self.at('10:30').timestamp()),
+                                                                (self.at('11:00').timestamp(), self.at('11:30').timestamp())])
+        index.add('https://api.calendly.com/scheduled_events/E', self.at('10:30'), self.at('11:00'))
+        self.assertEqual(index.busy(self.at('09:00'), self.at('12:00')), [(self.at('09:30'), self.at('11:30'))])
+
+        self.assertTrue(index.update(self.event('B', '12:00', '12:30')))
+        self.assertFalse(index.update(self.event('B', '12:00', '12:30')))
+        self.assertEqual(index.busy(self.at('09:00'), self.at('13:00')),
+                         [(self.at('10:30'), self.at('11:30')), (self.at('12:00'), self.at('12:30'))])
+        self.assertFalse(index.remove('https://api.calendly.com/scheduled_events/UNKNOWN'))
+
+    def test_duplicate_events_are_indexed_once(self):
+        index = BusyIndex(self.events + [self.event('A', '09:00', '10:00'), self.event('C', '12:00', '12:30')])
+
+        self.assertEqual(len(index), 3)
+        self.assertEqual(len(index._event_keys), 3)
+        self.assertEqual(index.busy(self.at('09:00'), self.at('13:00')),
+                         [(self.at('09:00'), self.at('10:30')), (self.at('12:00'), self.at('12:30'))])
+
+        uri = 'https://api.calendly.com/scheduled_events/A'
+        self.assertTrue(index.remove(uri))
+        index.add(uri, self.at('09:00'), self.at('10:00'))
+        self.assertTrue(index.remove(uri))
+        self.assertEqual(index.busy(self.at('09:00'), self.at('13:00')),
+                         [(self.at('09:30'), self.at('10:30')), (self.at('12:00'), self.at('12:30'))])
+
+    def test_engine_loads_users_and_applies_webhooks(self):
+        api = MagicMock()
+        api.get_all_scheduled_events.return_value = self.events
+        engine = AvailabilityEngine(api, horizon=timedelta(days=1), clock=lambda: self.at('08:00'))
+
+        self.assertEqual(engine.next_available(self.host, timedelta(hours=1)), (self.at('08:00'), self.at('09:00')))
+        self.assertEqual(engine.next_available(self.host, timedelta(hours=1), after=self.at('09:00')),
+                         (self.at('11:30'), self.at('12:30')))
+        api.get_all_scheduled_events.assert_called_once_with(self.host, min_start_time='2026-03-01T08:00:00.000000Z',
+                                                             max_start_time='2026-03-03T08:00:00.000000Z', prefetch=1)
+
+        canceled = WebhookEvent('invitee.canceled', None, None, {'scheduled_event': self.event('C', '11:00', '11:30', status='canceled')})
+        self.assertEqual(engine.apply(canceled), [self.host])
+        created = WebhookEvent('invitee.created', None, None, {'scheduled_event': self.event('F', '12:00', '12:30')})
+        self.assertEqual(engine.apply(created), [self.host])
+        self.assertEqual(engine.apply(WebhookEvent('invitee.created', None, None, {'scheduled_event': 'https://api.calendly.com/scheduled_events/F'})), [])
+
+        self.assertEqual(engine.free_busy(self.host, self.at('10:00'), self.at('13:00'))['busy'],
+                         [(self.at('10:00'), self.at('10:30')), (self.at('12:00'), self.at('12:30'))])
+        self.assertEqual(engine.next_available(self.host, timedelta(hours=1), after=self.at('09:00')),
+                         (self.at('10:30'), self.at('11:30')))
+        self.assertEqual(api.get_all_scheduled_events.call_count, 1)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,14 +1,50 @@
-from typing import MutableMapping
+import time
+from typing import Any, MutableMapping, Optional, Tuple
 from calendly.exceptions import CalendlyException
 import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import BaseCache, CachedResponse, DEFAULT_CACHE_TTLS, make_cache_key
+from .codec import get_default_codec
+from .constants import BASE
+from .instrumentation import Instrumentation
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .singleflight import SingleFlight
 
 __author__ = "laxmena <ConnectWith@laxmena.com>"
 __license__ = "MIT"
 
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_MAX_RATE_LIMIT_RETRIES = 3
+
 
-class CalendlyReq(object):
+def create_session(pool_connections: int=DEFAULT_POOL_CONNECTIONS, pool_maxsize: int=DEFAULT_POOL_MAXSIZE) -> requests.Session:
     """
-    Private class wrapping the Calendly API v2. Decodes responses from Calendly and returns it
+    Build a keep-alive requests.Session with a pooled HTTPAdapter mounted for http and https.
+
+    The returned session is safe to share between threads and between several
+    CalendlyReq/CalendlyAPI instances, since authentication headers are sent per request.
+
+    Parameters
+    ----------
+    pool_connections : int
+        Number of per-host connection pools to cache
+    pool_maxsize : int
+        Maximum number of connections kept alive per host
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class BaseCalendlyReq(object):
+    """
+    Private base class holding the authentication headers and the error decoding
+    shared by the blocking and the asyncio request wrappers.
 
     References
     ----------
@@ -22,7 +58,12 @@ class CalendlyReq(object):
     API_ERROR_DESCRIPTION_KEY = "message"
     API_ERROR_DETAILS_KEY = "details"
 
-    def __init__(self, token: str=None, headers: dict=None):
+    RETRYABLE_EXCEPTIONS = ()
+
+    def __init__(self, token: str=None, headers: dict=None, rate_limiter: RateLimiter=None,
+                 max_rate_limit_retries: int=DEFAULT_MAX_RATE_LIMIT_RETRIES, retry_policy: RetryPolicy=None,
+                 json_codec=None, instrumentation: Instrumentation=None, base_url: str=None, token_manager=None,
+                 tenant: str=None, cache: BaseCache=None, cache_ttls: MutableMapping=None):
         """
         Constructor: Uses Bearer Token Authentication or custom headers.
 
@@ -31,15 +72,138 @@ class CalendlyReq(object):
         token : str 
         headers : str
             Personal Access Token
+        rate_limiter : RateLimiter, optional
+            Token bucket pacing every request. Share one instance between clients using the same quota.
+        max_rate_limit_retries : int, optional
+            How many times a request answered with 429 is re-sent after waiting. Defaults to 3.
+        retry_policy : RetryPolicy, optional
+            Backoff and retry settings for 5xx responses and transport errors.
+        json_codec : optional
+            Object with `loads(bytes)` and `dumps(obj) -> bytes` used for request and response bodies.
+            Defaults to orjson, then ujson, then the standard library, whichever is installed.
+        instrumentation : Instrumentation, optional
+            Request hooks, latency/bytes/retry metrics and tracing spans. Disabled by default.
+        base_url : str, optional
+            Send requests for https://api.calendly.com to another server, e.g. a CalendlySimulator.
+        token_manager : TokenManager, optional
+            Source of the OAuth2 access token of `tenant`, used instead of `token`. A request answered
+            with 401 is re-sent once after the token is refreshed.
+        tenant : str, optional
+            Key of the token in `token_manager`
+        cache : BaseCache, optional
+            Cache for GET responses, e.g. LRUCache or SQLiteCache. Caching is off when omitted.
+        cache_ttls : dict, optional
+            Seconds to keep GET responses, keyed by URL prefix. The longest matching prefix wins
+            and URLs without a match are not cached. Expired entries are revalidated with
+            If-None-Match/If-Modified-Since, so a TTL of 0 always revalidates. Defaults to users/me,
+            event types, webhooks and single scheduled events.
         """
 
         if token and headers:
             raise CalendlyException("You can't pass both token and headers at the same time.")
 
+        if token and token_manager:
+            raise CalendlyException("You can't pass both token and token_manager at the same time.")
+
         if token:
             headers = {'authorization': 'Bearer ' + token}
 
         self.headers = headers
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.json_codec = json_codec or get_default_codec()
+        self.instrumentation = instrumentation
+        self.base_url = base_url.rstrip('/') if base_url else None
+        self.token_manager = token_manager
+        self.tenant = tenant
+        self.cache = cache
+        self.cache_ttls = DEFAULT_CACHE_TTLS if cache_ttls is None else cache_ttls
+
+    def _get_cache_ttl(self, url: str) -> Optional[float]:
+        prefixes = [prefix for prefix in self.cache_ttls if url.startswith(prefix)]
+        if not prefixes:
+            return None
+        return self.cache_ttls[max(prefixes, key=len)]
+
+    def invalidate_cache(self, url_prefix: str=None):
+        """
+        Drop cached responses whose URL starts with `url_prefix`, or every cached response.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(url_prefix)
+
+    def _store_response(self, cache_key: str, url: str, response, cached: Optional[CachedResponse], cache_ttl: float) -> Optional[CachedResponse]:
+        """
+        Update the cache with the response to a cacheable GET. Returns the revalidated entry after a
+        304 Not Modified, which must be served instead of the empty response.
+        """
+        if cached is not None and response.status_code == requests.codes.not_modified:
+            self.cache.revalidate(cache_key, cached, cache_ttl)
+            return cached
+        if cache_ttl or (cache_ttl is not None and CachedResponse.from_response(url, response, 0).validators):
+            self.cache.set(cache_key, url, response, cache_ttl)
+        return None
+
+    def _resolve_url(self, url: str) -> str:
+        """
+        URL a request is actually sent to: `url` with the API base replaced by `base_url`, if set.
+        Caching and instrumentation keep using the original URL.
+        """
+        if self.base_url and url.startswith(BASE):
+            return self.base_url + url[len(BASE):]
+        return url
+
+    def decode(self, response) -> Any:
+        """
+        Decode a json response body with the configured codec, straight from the raw bytes.
+
+        Parameters
+        ----------
+        response : requests.Response or httpx.Response
+        """
+        return self.json_codec.loads(response.content)
+
+    def _encode(self, data: Optional[MutableMapping]) -> Tuple[Optional[bytes], Optional[dict]]:
+        """
+        Return the encoded request body and the headers to send with it.
+        """
+        if data is None:
+            return None, self.headers
+        return self.json_codec.dumps(data), dict(self.headers or {}, **{'content-type': 'application/json'})
+
+    @staticmethod
+    def _authorize(headers: Optional[dict], access_token: str) -> dict:
+        return dict(headers or {}, authorization='Bearer ' + access_token)
+
+    def _is_unauthorized(self, response, attempt: int) -> bool:
+        """
+        Whether `response` is a 401 which should be re-sent with a refreshed token: only with a
+        token manager, and once per request.
+        """
+        return (self.token_manager is not None and attempt < 1
+                and response.status_code == requests.codes.unauthorized)
+
+    @property
+    def _retryable_exceptions(self):
+        return self.retry_policy.retry_exceptions or self.RETRYABLE_EXCEPTIONS
+
+    def _get_retry_delay(self, method: str, retry: Optional[bool], attempts: int, response=None) -> Optional[float]:
+        """
+        Seconds to wait before re-sending a failed request, or None when it must not be retried.
+        """
+        if response is not None and response.status_code not in self.retry_policy.retry_statuses:
+            return None
+        if not (self.retry_policy.is_retryable(method, retry) and self.retry_policy.can_retry(attempts)):
+            return None
+        return self.retry_policy.backoff(attempts)
+
+    def _is_rate_limited(self, response, attempt: int) -> bool:
+        self.rate_limiter.update(response.headers)
+        if response.status_code != requests.codes.too_many_requests or attempt >= self.max_rate_limit_retries:
+            return False
+        self.rate_limiter.block(response.headers)
+        return True
 
     def _get_oauth2_error_from_response(self,response):
         try:
@@ -74,7 +238,72 @@ class CalendlyReq(object):
 
         return  oauth2_errors
 
-    def process_request(self, method: str, url: str, data: MutableMapping=None) -> requests.Response:
+    def _raise_for_status(self, response):
+        if response.status_code > requests.codes.permanent_redirect:
+            error_type, error_description, error_details = self._get_error_type_and_description_from_response(response)
+            raise CalendlyException(f"{error_type}: {error_description}", error_details)
+
+
+class CalendlyReq(BaseCalendlyReq):
+    """
+    Private class wrapping the Calendly API v2. Decodes responses from Calendly and returns it
+
+    References
+    ----------
+    https://calendly.stoplight.io/docs/api-docs/
+    """
+
+    RETRYABLE_EXCEPTIONS = (requests.ConnectionError, requests.Timeout)
+
+    def __init__(self, token: str=None, headers: dict=None, session: requests.Session=None,
+                 pool_connections: int=DEFAULT_POOL_CONNECTIONS, pool_maxsize: int=DEFAULT_POOL_MAXSIZE,
+                 cache: BaseCache=None, cache_ttls: MutableMapping=None, single_flight=True, **kwargs):
+        """
+        Constructor: Uses Bearer Token Authentication or custom headers.
+
+        Parameters
+        ----------
+        token : str 
+        headers : str
+            Personal Access Token
+        session : requests.Session, optional
+            Shared session to send requests through. It is not closed by close().
+            When omitted, a pooled session is created and owned by this instance.
+        pool_connections : int, optional
+            Number of per-host connection pools for the owned session
+        pool_maxsize : int, optional
+            Maximum number of keep-alive connections per host for the owned session
+        cache : BaseCache, optional
+            Cache for GET responses, see BaseCalendlyReq
+        cache_ttls : dict, optional
+            Seconds to keep GET responses, keyed by URL prefix, see BaseCalendlyReq
+        single_flight : bool or SingleFlight, optional
+            Coalesce identical concurrent GETs: while one is in flight, other threads asking for the
+            same URL and parameters wait for its response. Pass a SingleFlight to coalesce between
+            clients of the same account, or False to send every request. Defaults to True.
+        **kwargs
+            Rate limiting and retry options, see BaseCalendlyReq
+        """
+
+        super(CalendlyReq, self).__init__(token, headers, cache=cache, cache_ttls=cache_ttls, **kwargs)
+        self._owns_session = session is None
+        self.session = session or create_session(pool_connections, pool_maxsize)
+        self.single_flight = SingleFlight() if single_flight is True else single_flight or None
+
+    def close(self):
+        """
+        Release pooled connections. Sessions passed in by the caller are left open.
+        """
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def process_request(self, method: str, url: str, data: MutableMapping=None, retry: bool=None) -> requests.Response:
         """
         Make requests to Calendly API by appending requried headers. 
 
@@ -86,21 +315,100 @@ class CalendlyReq(object):
             Calendly API URL
         data : dict, optional
             additional data to be passed to the API 
+        retry : bool, optional
+            Force retries on or off. By default only GET and DELETE are retried.
         """
-        request_method = getattr(requests, method)
-        kwargs = dict(json=data)
+        if method != 'get' or self.single_flight is None:
+            return self._send(method, url, data, retry)
 
-        if self.headers:
-            kwargs.update(dict(headers=self.headers))
+        key = make_cache_key(method, url, data, self.tenant)
+        response, shared = self.single_flight.do(key, lambda: self._send(method, url, data, retry))
+        if shared and self.instrumentation is not None:
+            self.instrumentation.coalesced(method, url)
+        return response
 
-        response = request_method(url, **kwargs)
-        if response.status_code > requests.codes.permanent_redirect:
-            error_type, error_description, error_details = self._get_error_type_and_description_from_response(response)
-            raise CalendlyException(f"{error_type}: {error_description}", error_details)
+    def _send(self, method: str, url: str, data: MutableMapping=None, retry: bool=None) -> requests.Response:
+        """
+        Send one logical request through the cache, rate limiter and retry loop.
+        """
+        cache_ttl = self._get_cache_ttl(url) if self.cache is not None and method == 'get' else None
+        cached = None
+        if cache_ttl is not None:
+            cache_key = make_cache_key(method, url, data, self.tenant)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                if self.instrumentation is not None:
+                    self.instrumentation.cache_hit(method, url)
+                return cached.to_response()
+            cached = self.cache.lookup(cache_key)
+
+        request_method = getattr(self.session, method)
+        request_url = self._resolve_url(url)
+        body, headers = self._encode(data)
+        kwargs = dict(data=body)
+
+        if headers:
+            kwargs.update(dict(headers=headers))
+
+        if cached is not None and cached.validators:
+            kwargs['headers'] = dict(headers or {}, **cached.validators)
+
+        record = self.instrumentation.start(method, url, body) if self.instrumentation is not None else None
+        response = None
+        attempts = 0
+        rate_limited = 0
+        unauthorized = 0
+        try:
+            while True:
+                self.rate_limiter.acquire()
+                attempts += 1
+                response = None
+                if self.token_manager is not None:
+                    access_token = self.token_manager.get_token(self.tenant)
+                    kwargs['headers'] = self._authorize(kwargs.get('headers'), access_token)
+                try:
+                    response = request_method(request_url, **kwargs)
+                except self._retryable_exceptions:
+                    self.rate_limiter.release()
+                    delay = self._get_retry_delay(method, retry, attempts)
+                    if delay is None:
+                        raise
+                    time.sleep(delay)
+                    continue
+
+                if self._is_rate_limited(response, rate_limited):
+                    rate_limited += 1
+                    attempts -= 1
+                    continue
+
+                if self._is_unauthorized(response, unauthorized):
+                    self.token_manager.invalidate(self.tenant, access_token)
+                    unauthorized += 1
+                    attempts -= 1
+                    continue
+
+                delay = self._get_retry_delay(method, retry, attempts, response)
+                if delay is None:
+                    break
+                time.sleep(delay)
+
+            self._raise_for_status(response)
+        except Exception as error:
+            if record is not None:
+                self.instrumentation.finish(record, response, attempts, rate_limited, error)
+            raise
+
+        if record is not None:
+            self.instrumentation.finish(record, response, attempts, rate_limited)
+
+        if cache_ttl is not None:
+            revalidated = self._store_response(cache_key, url, response, cached, cache_ttl)
+            if revalidated is not None:
+                return revalidated.to_response()
 
         return response
 
-    def get(self, url: str, data: MutableMapping=None) -> requests.Response:
+    def get(self, url: str, data: MutableMapping=None, retry: bool=None) -> requests.Response:
         """
         Send GET request to the Calendly URL.
 
@@ -110,10 +418,12 @@ class CalendlyReq(object):
             Calendly API URL
         data : dict, optional
             additional data to be passed to the API 
+        retry : bool, optional
+            Opt in to (or out of) retries for this request
         """
-        return self.process_request('get', url, data)
+        return self.process_request('get', url, data, retry)
 
-    def post(self, url: str, data: MutableMapping=None) -> requests.Response:
+    def post(self, url: str, data: MutableMapping=None, retry: bool=None) -> requests.Response:
         """
         Send POST request to the Calendly URL.
 
@@ -123,10 +433,12 @@ class CalendlyReq(object):
             Calendly API URL
         data : dict, optional
             additional data to be passed to the API 
+        retry : bool, optional
+            Opt in to (or out of) retries for this request
         """
-        return self.process_request('post', url, data)
+        return self.process_request('post', url, data, retry)
 
-    def delete(self, url: str, data: MutableMapping=None) -> requests.Response:
+    def delete(self, url: str, data: MutableMapping=None, retry: bool=None) -> requests.Response:
         """
         Send DELETE request to the Calendly URL.
 
@@ -136,10 +448,12 @@ class CalendlyReq(object):
             Calendly API URL
         data : dict, optional
             additional data to be passed to the API 
+        retry : bool, optional
+            Opt in to (or out of) retries for this request
         """
-        return self.process_request('delete', url, data)
+        return self.process_request('delete', url, data, retry)
 
-    def put(self, url: str, data: MutableMapping=None) -> requests.Response:
+    def put(self, url: str, data: MutableMapping=None, retry: bool=None) -> requests.Response:
         """
         Send PUT request to the Calendly URL.
 
@@ -149,5 +463,7 @@ class CalendlyReq(object):
             Calendly API URL
         data : dict, optional
             additional data to be passed to the API 
-        """        
-        return self.process_request('put', url, data)
\ No newline at end of file
+        retry : bool, optional
+            Opt in to (or out of) retries for this request
+        """
+        return self.process_request('put', url, data, retry)
\ No newline at end of file
@@ -0,0 +1,235 @@
+import asyncio
+from typing import Callable, MutableMapping
+
+from calendly.exceptions import CalendlyException
+from .api import BaseCalendlyReq, DEFAULT_POOL_MAXSIZE
+from .cache import CachedResponse, make_cache_key
+from .singleflight import AsyncSingleFlight
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+__license__ = "MIT"
+
+HTTPX_MISSING_EXCEPTION_TEXT = "AsyncCalendlyReq requires httpx. Install it with `pip install PyCalendly[async]`."
+
+
+def create_async_client(max_connections: int=DEFAULT_POOL_MAXSIZE, max_keepalive_connections: int=None) -> "httpx.AsyncClient":
+    """
+    Build a pooled httpx.AsyncClient which can be shared by several AsyncCalendlyReq instances.
+
+    Parameters
+    ----------
+    max_connections : int
+        Maximum number of concurrent connections
+    max_keepalive_connections : int, optional
+        Maximum number of idle connections kept alive. Defaults to max_connections.
+    """
+    if httpx is None:
+        raise CalendlyException(HTTPX_MISSING_EXCEPTION_TEXT)
+
+    limits = httpx.Limits(max_connections=max_connections,
+                          max_keepalive_connections=max_keepalive_connections or max_connections)
+    return httpx.AsyncClient(limits=limits)
+
+
+def to_httpx_response(cached: CachedResponse) -> "httpx.Response":
+    """
+    Rebuild a cached response into a fresh httpx.Response.
+    """
+    return httpx.Response(cached.status_code, headers=cached.headers, content=cached.content,
+                          request=httpx.Request('GET', cached.url))
+
+
+class AsyncCalendlyReq(BaseCalendlyReq):
+    """
+    Private class wrapping the Calendly API v2 for asyncio, on top of a pooled httpx.AsyncClient.
+    Raises the same CalendlyException errors as CalendlyReq.
+    """
+
+    RETRYABLE_EXCEPTIONS = (httpx.TransportError,) if httpx else ()
+
+    def __init__(self, token: str=None, headers: dict=None, client: "httpx.AsyncClient"=None,
+                 max_connections: int=DEFAULT_POOL_MAXSIZE, max_keepalive_connections: int=None, single_flight=True,
+                 **kwargs):
+        """
+        Constructor: Uses Bearer Token Authentication or custom headers.
+
+        Parameters
+        ----------
+        token : str
+            Personal Access Token
+        headers : dict
+        client : httpx.AsyncClient, optional
+            Shared client to send requests through. It is not closed by close().
+        max_connections : int, optional
+            Maximum number of concurrent connections for the owned client
+        max_keepalive_connections : int, optional
+            Maximum number of idle connections kept alive by the owned client
+        single_flight : bool or AsyncSingleFlight, optional
+            Coalesce identical concurrent GETs of the tasks of one event loop. Pass an AsyncSingleFlight
+            to share it between clients of the same account, or False to send every request. Defaults to True.
+        **kwargs
+            Rate limiting, retry and response cache options, see BaseCalendlyReq. Caches doing
+            I/O, e.g. SQLiteCache, are called on the default executor.
+        """
+        super(AsyncCalendlyReq, self).__init__(token, headers, **kwargs)
+        self._owns_client = client is None
+        self.client = client or create_async_client(max_connections, max_keepalive_connections)
+        self.single_flight = AsyncSingleFlight() if single_flight is True else single_flight or None
+
+    async def close(self):
+        """
+        Release pooled connections. Clients passed in by the caller are left open.
+        """
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def process_request(self, method: str, url: str, data: MutableMapping=None, retry: bool=None) -> "httpx.Response":
+        """
+        Make requests to Calendly API by appending requried headers.
+
+        Parameters
+        ----------
+        method : str
+            supported methods - get, post, delete, put
+        url : str
+            Calendly API URL
+        data : dict, optional
+            additional data to be passed to the API
+        retry : bool, optional
+            Force retries on or off. By default only GET and DELETE are retried.
+        """
+        if method != 'get' or self.single_flight is None:
+            return await self._send(method, url, data, retry)
+
+        key = make_cache_key(method, url, data, self.tenant)
+        response, shared = await self.single_flight.do(key, lambda: self._send(method, url, data, retry))
+        if shared and self.instrumentation is not None:
+            self.instrumentation.coalesced(method, url)
+        return response
+
+    async def invalidate_cache(self, url_prefix: str=None):
+        """
+        Drop cached responses whose URL starts with `url_prefix`, or every cached response.
+        """
+        if self.cache is not None:
+            await self._call_cache(self.cache.invalidate, url_prefix)
+
+    async def _call_cache(self, function: Callable, *args):
+        if not self.cache.blocking:
+            return function(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    async def _send(self, method: str, url: str, data: MutableMapping=None, retry: bool=None) -> "httpx.Response":
+        """
+        Send one logical request through the cache, rate limiter and retry loop.
+        """
+        cache_ttl = self._get_cache_ttl(url) if self.cache is not None and method == 'get' else None
+        cached = None
+        if cache_ttl is not None:
+            cache_key = make_cache_key(method, url, data, self.tenant)
+            cached = await self._call_cache(self.cache.get, cache_key)
+            if cached is not None:
+                if self.instrumentation is not None:
+                    self.instrumentation.cache_hit(method, url)
+                return to_httpx_response(cached)
+            cached = await self._call_cache(self.cache.lookup, cache_key)
+
+        body, headers = self._encode(data)
+        kwargs = dict(content=body)
+
+        if headers:
+            kwargs.update(dict(headers=headers))
+
+        if cached is not None and cached.validators:
+            kwargs['headers'] = dict(headers or {}, **cached.validators)
+
+        record = self.instrumentation.start(method, url, body) if self.instrumentation is not None else None
+        response = None
+        attempts = 0
+        rate_limited = 0
+        unauthorized = 0
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                await self.rate_limiter.acquire_async()
+                attempts += 1
+                response = None
+                if self.token_manager is not None:
+                    access_token = (self.token_manager.cached_token(self.tenant)
+                                    or await loop.run_in_executor(None, self.token_manager.get_token, self.tenant))
+                    kwargs['headers'] = self._authorize(kwargs.get('headers'), access_token)
+                try:
+                    response = await self.client.request(method.upper(), self._resolve_url(url), **kwargs)
+                except self._retryable_exceptions:
+                    self.rate_limiter.release()
+                    delay = self._get_retry_delay(method, retry, attempts)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                    continue
+
+                if self._is_rate_limited(response, rate_limited):
+                    rate_limited += 1
+                    attempts -= 1
+                    continue
+
+                if self._is_unauthorized(response, unauthorized):
+                    await loop.run_in_executor(None, self.token_manager.invalidate, self.tenant, access_token)
+                    unauthorized += 1
+                    attempts -= 1
+                    continue
+
+                delay = self._get_retry_delay(method, retry, attempts, response)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+
+            self._raise_for_status(response)
+        except Exception as error:
+            if record is not None:
+                self.instrumentation.finish(record, response, attempts, rate_limited, error)
+            raise
+
+        if record is not None:
+            self.instrumentation.finish(record, response, attempts, rate_limited)
+
+        if cache_ttl is not None:
+            revalidated = await self._call_cache(self._store_response, cache_key, url, response, cached, cache_ttl)
+            if revalidated is not None:
+                return to_httpx_response(revalidated)
+
+        return response
+
+    async def get(self, url: str, data: MutableMapping=None, retry: bool=None) -> "httpx.Response":
+        """
+        Send GET request to the Calendly URL.
+        """
+        return await self.process_request('get', url, data, retry)
+
+    async def post(self, url: str, data: MutableMapping=None, retry: bool=None) -> "httpx.Response":
+        """
+        Send POST request to the Calendly URL.
+        """
+        return await self.process_request('post', url, data, retry)
+
+    async def delete(self, url: str, data: MutableMapping=None, retry: bool=None) -> "httpx.Response":
+        """
+        Send DELETE request to the Calendly URL.
+        """
+        return await self.process_request('delete', url, data, retry)
+
+    async def put(self, url: str, data: MutableMapping=None, retry: bool=None) -> "httpx.Response":
+        """
+        Send PUT request to the Calendly URL.
+        """
+        return await self.process_request('put', url, data, retry)
@@ -0,0 +1,109 @@
+import asyncio
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+
+__license__ = "MIT"
+
+DEFAULT_BATCH_WORKERS = 8
+
+_EXHAUSTED = object()
+
+BatchResult = namedtuple('BatchResult', ['item', 'result', 'error'])
+BatchResult.__doc__ = """
+Outcome of one item of a batch: `result` is set on success, `error` holds the raised exception on failure.
+"""
+
+
+def run_batch(function: Callable, items: Iterable, max_workers: int=DEFAULT_BATCH_WORKERS, ordered: bool=True) -> Iterator[BatchResult]:
+    """
+    Call `function` on every item on a thread pool and yield a BatchResult per item.
+
+    At most `max_workers` calls run at once and at most twice as many items are pulled from
+    `items` ahead of the consumer, so arbitrarily long iterables are processed in bounded memory.
+    A failing item is reported through BatchResult.error and does not stop the batch.
+
+    Args:
+        function (callable): Called with one item.
+        items (iterable): Items to process.
+        max_workers (int, optional): Maximum number of concurrent calls. Defaults to 8.
+        ordered (bool, optional): Yield results in input order rather than completion order. Defaults to True.
+
+    Yields:
+        BatchResult: item, result and error of each call
+    """
+    def call(item):
+        try:
+            return BatchResult(item, function(item), None)
+        except Exception as error:
+            return BatchResult(item, None, error)
+
+    items = iter(items)
+    window = max_workers * 2
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(call, item))
+            if len(pending) >= window:
+                break
+
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                done = [future for future in pending if future in finished]
+                for future in done:
+                    pending.remove(future)
+
+            for future in done:
+                yield future.result()
+                item = next(items, _EXHAUSTED)
+                if item is not _EXHAUSTED:
+                    pending.append(executor.submit(call, item))
+
+
+async def arun_batch(function: Callable[..., Awaitable], items: Iterable, max_workers: int=DEFAULT_BATCH_WORKERS,
+                     ordered: bool=True) -> AsyncIterator[BatchResult]:
+    """
+    asyncio counterpart of run_batch: awaits `function` on every item as tasks of the running loop,
+    at most `max_workers` at once, and yields a BatchResult per item.
+    """
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def call(item):
+        async with semaphore:
+            try:
+                return BatchResult(item, await function(item), None)
+            except Exception as error:
+                return BatchResult(item, None, error)
+
+    items = iter(items)
+    window = max_workers * 2
+
+    pending = deque()
+    for item in items:
+        pending.append(asyncio.ensure_future(call(item)))
+        if len(pending) >= window:
+            break
+
+    try:
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+                await done[0]
+            else:
+                finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                done = [task for task in pending if task in finished]
+                for task in done:
+                    pending.remove(task)
+
+            for task in done:
+                yield task.result()
+                item = next(items, _EXHAUSTED)
+                if item is not _EXHAUSTED:
+                    pending.append(asyncio.ensure_future(call(item)))
+    finally:
+        for task in pending:
+            task.cancel()
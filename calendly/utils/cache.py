@@ -0,0 +1,230 @@
+import abc
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Mapping, MutableMapping, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .constants import ME, EVENTS, EVENT_TYPE, WEBHOOK
+
+__license__ = "MIT"
+
+DEFAULT_CACHE_MAXSIZE = 1024
+DEFAULT_CACHE_TTLS = {
+    ME: 300,
+    EVENT_TYPE: 300,
+    WEBHOOK: 60,
+    f'{EVENTS}/': 0,
+}
+
+
+def make_cache_key(method: str, url: str, data: MutableMapping=None, tenant: str=None) -> str:
+    """
+    Build a cache key from the request method, URL and parameters. Keys of a `tenant` are prefixed
+    with it, so clients of several accounts can share one cache.
+    """
+    params = json.dumps(data, sort_keys=True) if data else ''
+    key = f"{method.upper()} {url} {params}"
+    return f"{tenant} {key}" if tenant is not None else key
+
+
+class CachedResponse(object):
+    """
+    Status, headers and body of a cached response, rebuilt into a fresh requests.Response on every hit.
+    """
+
+    __slots__ = ('url', 'status_code', 'headers', 'content', 'expires_at')
+
+    def __init__(self, url: str, status_code: int, headers: Mapping, content: bytes, expires_at: float):
+        self.url = url
+        self.status_code = status_code
+        self.headers = dict(headers)
+        self.content = content
+        self.expires_at = expires_at
+
+    @classmethod
+    def from_response(cls, url: str, response, expires_at: float) -> "CachedResponse":
+        return cls(url, response.status_code, response.headers, response.content, expires_at)
+
+    @property
+    def validators(self) -> MutableMapping:
+        """
+        Conditional request headers revalidating this entry, built from its ETag and Last-Modified.
+        """
+        headers = CaseInsensitiveDict(self.headers)
+        validators = {}
+        if headers.get('ETag'):
+            validators['If-None-Match'] = headers['ETag']
+        if headers.get('Last-Modified'):
+            validators['If-Modified-Since'] = headers['Last-Modified']
+        return validators
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response.url = self.url
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        return response
+
+
+class BaseCache(abc.ABC):
+    """
+    Interface of the response caches used by CalendlyReq. Keeps hit/miss/revalidation counters.
+
+    Expired entries are kept until evicted, so that they can be revalidated with a conditional GET.
+    Backends doing I/O set `blocking`, so that AsyncCalendlyReq calls them off the event loop.
+    """
+
+    clock = staticmethod(time.time)
+    blocking = False
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Return the fresh entry stored under `key`, or None.
+        """
+        entry = self.lookup(key)
+        if entry is not None and not self.is_fresh(entry):
+            entry = None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        """
+        Return the entry stored under `key` even if it has expired, without touching the counters.
+        """
+        return self._get(key)
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return entry.expires_at > self.clock()
+
+    def revalidate(self, key: str, entry: CachedResponse, ttl: float):
+        """
+        Mark an expired entry as fresh again for `ttl` seconds after a 304 Not Modified.
+        """
+        entry.expires_at = self.clock() + ttl
+        self._set(key, entry)
+        self.revalidations += 1
+
+    def set(self, key: str, url: str, response, ttl: float):
+        """
+        Store the response to `url` under `key` for `ttl` seconds.
+        """
+        self._set(key, CachedResponse.from_response(url, response, self.clock() + ttl))
+
+    @abc.abstractmethod
+    def invalidate(self, url_prefix: str=None):
+        """
+        Drop every entry whose URL starts with `url_prefix`, or everything when it is omitted.
+        """
+
+    def stats(self) -> MutableMapping:
+        return {'hits': self.hits, 'misses': self.misses, 'revalidations': self.revalidations}
+
+    @abc.abstractmethod
+    def _get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Return the entry stored under `key`, fresh or not, or None.
+        """
+
+    @abc.abstractmethod
+    def _set(self, key: str, entry: CachedResponse):
+        """
+        Store `entry` under `key`, replacing any previous one.
+        """
+
+
+class LRUCache(BaseCache):
+    """
+    Thread-safe in-memory cache evicting the least recently used entry beyond `maxsize`.
+    """
+
+    clock = staticmethod(time.monotonic)
+
+    def __init__(self, maxsize: int=DEFAULT_CACHE_MAXSIZE):
+        super(LRUCache, self).__init__()
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, url_prefix: str=None):
+        with self._lock:
+            if url_prefix is None:
+                self._entries.clear()
+                return
+            for key in [key for key, entry in self._entries.items() if entry.url.startswith(url_prefix)]:
+                del self._entries[key]
+
+
+class SQLiteCache(BaseCache):
+    """
+    On-disk cache backed by a sqlite database, which survives restarts and can be shared by processes.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str):
+        super(SQLiteCache, self).__init__()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, url TEXT, status_code INTEGER, headers TEXT, content BLOB, expires_at REAL)"
+            )
+
+    def _get(self, key):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT url, status_code, headers, content, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        url, status_code, headers, content, expires_at = row
+        return CachedResponse(url, status_code, json.loads(headers), content, expires_at)
+
+    def _set(self, key, entry):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, entry.url, entry.status_code, json.dumps(entry.headers), entry.content, entry.expires_at)
+            )
+
+    def invalidate(self, url_prefix: str=None):
+        with self._lock, self._connection:
+            if url_prefix is None:
+                self._connection.execute("DELETE FROM responses")
+            else:
+                self._connection.execute("DELETE FROM responses WHERE substr(url, 1, ?) = ?", (len(url_prefix), url_prefix))
+
+    def close(self):
+        self._connection.close()
@@ -0,0 +1,67 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+__license__ = "MIT"
+
+
+class StdlibJSONCodec(object):
+    """
+    JSON codec built on the standard library. Decodes bytes directly, without a text copy.
+    """
+
+    name = 'json'
+
+    def loads(self, content: bytes) -> Any:
+        return json.loads(content)
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+class OrjsonCodec(object):
+    """
+    JSON codec built on orjson.
+    """
+
+    name = 'orjson'
+
+    def loads(self, content: bytes) -> Any:
+        return orjson.loads(content)
+
+    def dumps(self, data: Any) -> bytes:
+        return orjson.dumps(data)
+
+
+class UjsonCodec(object):
+    """
+    JSON codec built on ujson.
+    """
+
+    name = 'ujson'
+
+    def loads(self, content: bytes) -> Any:
+        return ujson.loads(content)
+
+    def dumps(self, data: Any) -> bytes:
+        return ujson.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def get_default_codec():
+    """
+    Return the fastest available codec: orjson, then ujson, then the standard library.
+    """
+    if orjson is not None:
+        return OrjsonCodec()
+    if ujson is not None:
+        return UjsonCodec()
+    return StdlibJSONCodec()
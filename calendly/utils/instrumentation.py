@@ -0,0 +1,274 @@
+import bisect
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Iterable, List, MutableMapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+__license__ = "MIT"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+DEFAULT_PERCENTILES = (50, 95, 99)
+UUID_PLACEHOLDER = '{uuid}'
+TRANSPORT_ERROR_STATUS = 'error'
+
+_RESOURCE_SEGMENT = re.compile(r'^[a-z_]+$')
+
+
+def endpoint_template(url: str) -> str:
+    """
+    Path of `url` with every identifier segment replaced by "{uuid}" and the query string dropped,
+    e.g. "/scheduled_events/{uuid}/invitees". Resource names are lowercase, identifiers are not.
+    """
+    segments = urlsplit(url).path.split('/')
+    return '/'.join(segment if not segment or _RESOURCE_SEGMENT.match(segment) else UUID_PLACEHOLDER
+                    for segment in segments) or '/'
+
+
+class Histogram(object):
+    """
+    Cumulative latency histogram with fixed bucket bounds, in the shape Prometheus expects.
+    Percentiles are interpolated within buckets, so memory stays constant however many samples are observed.
+    """
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, bounds: Tuple[float, ...]=DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        Estimated value below which `percent` % of the samples fall, or None without samples.
+        """
+        if not self.count:
+            return None
+        rank = self.count * percent / 100.0
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+    def cumulative_counts(self) -> List[Tuple[str, int]]:
+        buckets, total = [], 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            total += count
+            buckets.append(('+Inf' if bound == float('inf') else repr(bound), total))
+        return buckets
+
+
+class RequestMetrics(object):
+    """
+    Thread-safe in-process registry of request metrics, labelled by method and endpoint template:
+    request counts per status, latency histograms, bytes sent and received, retries,
+    rate-limited attempts, calls coalesced into another in-flight request and GETs answered
+    from the response cache without being sent. Exported with `to_prometheus()`.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...]=DEFAULT_BUCKETS, namespace: str='calendly'):
+        """
+        Parameters
+        ----------
+        buckets : tuple, optional
+            Upper bounds of the latency buckets, in seconds
+        namespace : str, optional
+            Prefix of the exported metric names. Defaults to "calendly".
+        """
+        self.buckets = buckets
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.latencies = defaultdict(lambda: Histogram(self.buckets))
+        self.bytes_sent = defaultdict(int)
+        self.bytes_received = defaultdict(int)
+        self.retries = defaultdict(int)
+        self.rate_limited = defaultdict(int)
+        self.coalesced = defaultdict(int)
+        self.cache_hits = defaultdict(int)
+
+    def observe(self, record: "RequestRecord"):
+        key = (record.method, record.endpoint)
+        with self._lock:
+            self.requests[key + (str(record.status),)] += 1
+            self.latencies[key].observe(record.duration)
+            self.bytes_sent[key] += record.bytes_sent
+            self.bytes_received[key] += record.bytes_received
+            self.retries[key] += record.retries
+            self.rate_limited[key] += record.rate_limited
+
+    def observe_coalesced(self, method: str, endpoint: str):
+        with self._lock:
+            self.coalesced[(method.upper(), endpoint)] += 1
+
+    def observe_cache_hit(self, method: str, endpoint: str):
+        with self._lock:
+            self.cache_hits[(method.upper(), endpoint)] += 1
+
+    def percentiles(self, percentiles: Iterable[float]=DEFAULT_PERCENTILES) -> MutableMapping:
+        """
+        Latency percentiles in seconds per (method, endpoint), e.g. {("GET", "/users/me"): {"p50": 0.08, ...}}.
+        """
+        with self._lock:
+            return {key: {f'p{percent:g}': histogram.percentile(percent) for percent in percentiles}
+                    for key, histogram in self.latencies.items()}
+
+    def reset(self):
+        with self._lock:
+            for metric in (self.requests, self.latencies, self.bytes_sent, self.bytes_received, self.retries,
+                           self.rate_limited, self.coalesced, self.cache_hits):
+                metric.clear()
+
+    @staticmethod
+    def _labels(method: str, endpoint: str, **extra) -> str:
+        labels = dict(method=method, endpoint=endpoint, **extra)
+        return ','.join('{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                        for name, value in labels.items())
+
+    def to_prometheus(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+        """
+        prefix = self.namespace
+        lines = []
+        with self._lock:
+            lines += [f'# HELP {prefix}_requests_total Requests sent to the Calendly API, by response status.',
+                      f'# TYPE {prefix}_requests_total counter']
+            for (method, endpoint, status), value in sorted(self.requests.items()):
+                lines.append(f'{prefix}_requests_total{{{self._labels(method, endpoint, status=status)}}} {value}')
+
+            lines += [f'# HELP {prefix}_request_duration_seconds Request latency including retries.',
+                      f'# TYPE {prefix}_request_duration_seconds histogram']
+            for (method, endpoint), histogram in sorted(self.latencies.items()):
+                for bound, count in histogram.cumulative_counts():
+                    lines.append(f'{prefix}_request_duration_seconds_bucket{{{self._labels(method, endpoint, le=bound)}}} {count}')
+                lines.append(f'{prefix}_request_duration_seconds_sum{{{self._labels(method, endpoint)}}} {histogram.sum!r}')
+                lines.append(f'{prefix}_request_duration_seconds_count{{{self._labels(method, endpoint)}}} {histogram.count}')
+
+            for name, help_text, metric in (
+                ('request_bytes_total', 'Request body bytes sent.', self.bytes_sent),
+                ('response_bytes_total', 'Response body bytes received.', self.bytes_received),
+                ('retries_total', 'Attempts re-sent after a transport error or a retryable status.', self.retries),
+                ('rate_limited_total', 'Attempts answered with 429 Too Many Requests.', self.rate_limited),
+                ('coalesced_total', 'GETs served by an identical request already in flight.', self.coalesced),
+                ('cache_hits_total', 'GETs served from a fresh response cache entry without a request.', self.cache_hits),
+            ):
+                lines += [f'# HELP {prefix}_{name} {help_text}', f'# TYPE {prefix}_{name} counter']
+                for (method, endpoint), value in sorted(metric.items()):
+                    lines.append(f'{prefix}_{name}{{{self._labels(method, endpoint)}}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+class RequestRecord(object):
+    """
+    One logical request, from the first attempt to the final response or error, as seen by hooks.
+    """
+
+    __slots__ = ('method', 'url', 'endpoint', 'started_at', 'duration', 'status', 'bytes_sent', 'bytes_received',
+                 'retries', 'rate_limited', 'error', 'span')
+
+    def __init__(self, method: str, url: str, bytes_sent: int):
+        self.method = method.upper()
+        self.url = url
+        self.endpoint = endpoint_template(url)
+        self.started_at = time.perf_counter()
+        self.duration = None
+        self.status = None
+        self.bytes_sent = bytes_sent
+        self.bytes_received = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.error = None
+        self.span = None
+
+    @property
+    def name(self) -> str:
+        return f'{self.method} {self.endpoint}'
+
+
+class Instrumentation(object):
+    """
+    Observability surface of CalendlyReq and AsyncCalendlyReq.
+
+    `before_request` hooks are called with the RequestRecord before the first attempt and
+    `after_request` hooks with the completed record and the response (None after a transport error).
+    With a `tracer`, e.g. OpenTelemetry's `trace.get_tracer(__name__)`, each request is wrapped
+    in a span named after its endpoint template ("GET /scheduled_events/{uuid}"), never the raw URL.
+    Exceptions raised by hooks propagate to the caller.
+    """
+
+    def __init__(self, metrics: RequestMetrics=None, tracer=None, before_request: Iterable[Callable]=(),
+                 after_request: Iterable[Callable]=()):
+        """
+        Parameters
+        ----------
+        metrics : RequestMetrics, optional
+            Registry receiving every completed request. Defaults to a new one.
+        tracer : optional
+            Object with a `start_span(name, attributes=...)` method returning a span with
+            `set_attribute`, `record_exception` and `end`.
+        before_request : iterable of callables, optional
+        after_request : iterable of callables, optional
+        """
+        self.metrics = metrics if metrics is not None else RequestMetrics()
+        self.tracer = tracer
+        self.before_request = list(before_request)
+        self.after_request = list(after_request)
+
+    def start(self, method: str, url: str, body: Optional[bytes]) -> RequestRecord:
+        record = RequestRecord(method, url, len(body) if body else 0)
+        if self.tracer is not None:
+            record.span = self.tracer.start_span(record.name, attributes={
+                'http.method': record.method, 'http.url': url, 'calendly.endpoint': record.endpoint})
+        for hook in self.before_request:
+            hook(record)
+        return record
+
+    def coalesced(self, method: str, url: str):
+        """
+        Count a call which shared the response of an identical request in flight instead of sending its own.
+        """
+        self.metrics.observe_coalesced(method, endpoint_template(url))
+
+    def cache_hit(self, method: str, url: str):
+        """
+        Count a call answered from a fresh response cache entry. No request is sent, so hooks and tracer are not called.
+        """
+        self.metrics.observe_cache_hit(method, endpoint_template(url))
+
+    def finish(self, record: RequestRecord, response, attempts: int, rate_limited: int, error: Exception=None):
+        record.duration = time.perf_counter() - record.started_at
+        record.retries = max(attempts - 1, 0)
+        record.rate_limited = rate_limited
+        record.error = error
+        if response is not None:
+            record.status = response.status_code
+            record.bytes_received = len(response.content or b'')
+        else:
+            record.status = TRANSPORT_ERROR_STATUS
+
+        self.metrics.observe(record)
+
+        if record.span is not None:
+            record.span.set_attribute('http.status_code', record.status if response is not None else 0)
+            record.span.set_attribute('calendly.retries', record.retries)
+            record.span.set_attribute('calendly.rate_limited', record.rate_limited)
+            if error is not None:
+                record.span.record_exception(error)
+            record.span.end()
+
+        for hook in self.after_request:
+            hook(record, response)
@@ -66,7 +66,7 @@ class CalendlyOauth2(object):
         )
 
         response = self.send_post(OAUTH_TOKEN_URL, data)
-        return response.json()
+        return self.request.decode(response)
 
     def revoke_access_token(self, token: str):
         data = dict(
@@ -76,7 +76,7 @@ class CalendlyOauth2(object):
         )
 
         response = self.send_post(OAUTH_REVOKE_URL, data)
-        return response.json()
+        return self.request.decode(response)
 
     def refresh_access_token(self, refresh_token: str, grant_type: str=None):
         data = dict(
@@ -87,7 +87,7 @@ class CalendlyOauth2(object):
         )
 
         response = self.send_post(OAUTH_TOKEN_URL, data)
-        return response.json()
+        return self.request.decode(response)
 
     def introspect_access_token(self, token: str):
         data = dict(
@@ -97,6 +97,6 @@ class CalendlyOauth2(object):
         )
 
         response = self.send_post(OAUTH_INTROSPECT_URL, data)
-        return response.json()
+        return self.request.decode(response)
 
 
@@ -0,0 +1,121 @@
+import asyncio
+import queue
+import threading
+from typing import AsyncIterator, Awaitable, Callable, Iterator, MutableMapping
+
+__license__ = "MIT"
+
+_DONE = object()
+_ACQUIRE_TIMEOUT = 0.1
+
+
+def get_next_page(page: MutableMapping) -> str:
+    return page['pagination']['next_page']
+
+
+def iter_pages(fetch_page: Callable[[str], MutableMapping], first_page: MutableMapping, prefetch: int=0) -> Iterator[MutableMapping]:
+    """
+    Yield `first_page` and every page after it, following `pagination.next_page`.
+
+    Without prefetch a page is only requested once the previous one has been consumed.
+    With `prefetch` > 0, a background thread keeps up to that many pages fetched ahead of
+    the page being consumed, starting while `first_page` is processed, overlapping network
+    round-trips with processing. At most `prefetch + 1` pages are held at any time.
+
+    Args:
+        fetch_page (callable): Returns the json decoded page for a next_page URL.
+        first_page (dict): json decoded first page.
+        prefetch (int, optional): Number of pages fetched ahead. Defaults to 0.
+
+    Yields:
+        dict: json decoded result page
+    """
+    if not prefetch:
+        yield first_page
+        next_page = get_next_page(first_page)
+        while next_page:
+            page = fetch_page(next_page)
+            yield page
+            next_page = get_next_page(page)
+        return
+
+    # A slot is taken before each fetch and given back when the consumer takes the page, so
+    # at most `prefetch` pages are fetched or queued beyond the one being consumed.
+    pages = queue.Queue()
+    slots = threading.Semaphore(prefetch)
+    stopped = threading.Event()
+
+    def acquire():
+        while not stopped.is_set():
+            if slots.acquire(timeout=_ACQUIRE_TIMEOUT):
+                return True
+        return False
+
+    def produce():
+        try:
+            next_page = get_next_page(first_page)
+            while next_page and acquire():
+                page = fetch_page(next_page)
+                pages.put(page)
+                next_page = get_next_page(page)
+            pages.put(_DONE)
+        except Exception as error:
+            pages.put(error)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        yield first_page
+        while True:
+            page = pages.get()
+            if page is _DONE:
+                return
+            if isinstance(page, Exception):
+                raise page
+            slots.release()
+            yield page
+    finally:
+        stopped.set()
+
+
+async def aiter_pages(fetch_page: Callable[[str], Awaitable[MutableMapping]], first_page: MutableMapping, prefetch: int=0) -> AsyncIterator[MutableMapping]:
+    """
+    asyncio counterpart of iter_pages: prefetching runs in a background task.
+    """
+    if not prefetch:
+        yield first_page
+        next_page = get_next_page(first_page)
+        while next_page:
+            page = await fetch_page(next_page)
+            yield page
+            next_page = get_next_page(page)
+        return
+
+    pages = asyncio.Queue()
+    slots = asyncio.Semaphore(prefetch)
+
+    async def produce():
+        try:
+            next_page = get_next_page(first_page)
+            while next_page:
+                await slots.acquire()
+                page = await fetch_page(next_page)
+                pages.put_nowait(page)
+                next_page = get_next_page(page)
+            pages.put_nowait(_DONE)
+        except Exception as error:
+            pages.put_nowait(error)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        yield first_page
+        while True:
+            page = await pages.get()
+            if page is _DONE:
+                return
+            if isinstance(page, Exception):
+                raise page
+            slots.release()
+            yield page
+    finally:
+        producer.cancel()
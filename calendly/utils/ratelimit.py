@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import time
+from typing import Mapping, Optional
+
+__license__ = "MIT"
+
+RATE_LIMIT_LIMIT_HEADER = 'X-RateLimit-Limit'
+RATE_LIMIT_REMAINING_HEADER = 'X-RateLimit-Remaining'
+RATE_LIMIT_RESET_HEADER = 'X-RateLimit-Reset'
+RETRY_AFTER_HEADER = 'Retry-After'
+
+DEFAULT_WINDOW = 60
+DEFAULT_SAFETY_MARGIN = 1
+DEFAULT_PROBE_INTERVAL = 0.01
+DEFAULT_PROBE_TIMEOUT = 5
+
+
+def get_numeric_header(headers: Mapping, name: str) -> Optional[float]:
+    """
+    Read a numeric header case-insensitively. Returns None when it is missing or not a number.
+    """
+    if not headers:
+        return None
+    value = headers.get(name)
+    if value is None:
+        lowered = name.lower()
+        value = next((v for k, v in headers.items() if k.lower() == lowered), None)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter(object):
+    """
+    Token bucket pacing requests just under Calendly's quota.
+
+    Without a `limit`, the bucket is sized from the `X-RateLimit-*` headers of the first response.
+    Until that response arrives, a single probe request is let through and the other callers
+    wait for it, so a concurrent burst at startup cannot exceed an unknown quota. If the response
+    carries no such headers, requests are not paced. `Retry-After` blocks every caller until it
+    has elapsed. A single instance can be shared by several CalendlyReq/AsyncCalendlyReq objects,
+    threads and asyncio tasks.
+    """
+
+    def __init__(self, limit: int=None, window: float=DEFAULT_WINDOW, safety_margin: int=DEFAULT_SAFETY_MARGIN, clock=time.monotonic,
+                 probe_interval: float=DEFAULT_PROBE_INTERVAL, probe_timeout: float=DEFAULT_PROBE_TIMEOUT):
+        """
+        Parameters
+        ----------
+        limit : int, optional
+            Requests allowed per window. Learned from X-RateLimit-Limit when omitted.
+        window : float, optional
+            Length of the quota window in seconds. Defaults to 60.
+        safety_margin : int, optional
+            Number of requests kept in reserve below the quota. Defaults to 1.
+        clock : callable, optional
+            Monotonic clock returning seconds
+        probe_interval : float, optional
+            Seconds between two checks of callers waiting for the first response
+        probe_timeout : float, optional
+            Seconds after which another probe is let through if the first one got no response
+        """
+        self.window = window
+        self.safety_margin = safety_margin
+        self.clock = clock
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self._probing = limit is None
+        self._probe_started_at = None
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+        self._updated_at = clock()
+        self.capacity = None
+        self.rate = None
+        self.tokens = None
+        if limit:
+            self._set_limit(limit)
+
+    def _set_limit(self, limit: float):
+        self.capacity = max(limit - self.safety_margin, 1)
+        self.rate = self.capacity / self.window
+        if self.tokens is None:
+            self.tokens = self.capacity
+
+    def _refill(self, now: float):
+        if self.rate is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def reserve(self) -> Optional[float]:
+        """
+        Take one token and return how many seconds the caller has to wait before sending its request,
+        or None while the first response is awaited, in which case the caller has to ask again.
+        """
+        with self._lock:
+            now = self.clock()
+            if self._probing:
+                if self._probe_started_at is not None and now - self._probe_started_at < self.probe_timeout:
+                    return None
+                self._probe_started_at = now
+            self._refill(now)
+            delay = max(self._blocked_until - now, 0.0)
+            if self.rate is not None:
+                self.tokens -= 1
+                if self.tokens < 0:
+                    delay = max(delay, -self.tokens / self.rate)
+            return delay
+
+    def acquire(self):
+        """
+        Block the current thread until a request may be sent.
+        """
+        delay = self.reserve()
+        while delay is None:
+            time.sleep(self.probe_interval)
+            delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """
+        Suspend the current task until a request may be sent.
+        """
+        delay = self.reserve()
+        while delay is None:
+            await asyncio.sleep(self.probe_interval)
+            delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def update(self, headers: Mapping):
+        """
+        Resize the bucket from the X-RateLimit-Limit/Remaining/Reset headers of a response.
+        """
+        limit = get_numeric_header(headers, RATE_LIMIT_LIMIT_HEADER)
+        remaining = get_numeric_header(headers, RATE_LIMIT_REMAINING_HEADER)
+        reset = get_numeric_header(headers, RATE_LIMIT_RESET_HEADER)
+
+        with self._lock:
+            now = self.clock()
+            self._probing = False
+            self._refill(now)
+            if limit:
+                self._set_limit(limit)
+            if remaining is not None and self.tokens is not None:
+                self.tokens = min(self.tokens, remaining - self.safety_margin)
+                if remaining <= self.safety_margin and reset:
+                    self._blocked_until = max(self._blocked_until, now + reset)
+
+    def release(self):
+        """
+        Let the next caller probe right away after a request failed without a response.
+        """
+        with self._lock:
+            self._probe_started_at = None
+
+    def block(self, headers: Mapping) -> float:
+        """
+        Pause every caller after a 429, for Retry-After (or X-RateLimit-Reset) seconds.
+
+        Returns:
+            float: seconds until requests may resume
+        """
+        delay = get_numeric_header(headers, RETRY_AFTER_HEADER)
+        if delay is None:
+            delay = get_numeric_header(headers, RATE_LIMIT_RESET_HEADER)
+        if delay is None:
+            delay = 1.0
+
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self._blocked_until = max(self._blocked_until, now + delay)
+            if self.tokens is not None:
+                self.tokens = min(self.tokens, 0)
+        return delay
@@ -0,0 +1,66 @@
+import random
+from typing import Iterable, Tuple, Type
+
+__license__ = "MIT"
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_CAP = 30.0
+DEFAULT_RETRY_STATUSES = (500, 502, 503, 504)
+DEFAULT_RETRY_METHODS = ('get', 'delete')
+
+
+class RetryPolicy(object):
+    """
+    Decides which failed requests are re-sent and how long to wait in between,
+    using exponential backoff with full jitter.
+
+    Only idempotent methods (GET and DELETE by default) are retried automatically.
+    Other methods are retried only when the caller opts in for that request.
+    """
+
+    def __init__(self, max_attempts: int=DEFAULT_MAX_ATTEMPTS, backoff_base: float=DEFAULT_BACKOFF_BASE,
+                 backoff_cap: float=DEFAULT_BACKOFF_CAP, retry_statuses: Iterable[int]=DEFAULT_RETRY_STATUSES,
+                 retry_exceptions: Tuple[Type[BaseException], ...]=None, retry_methods: Iterable[str]=DEFAULT_RETRY_METHODS):
+        """
+        Parameters
+        ----------
+        max_attempts : int, optional
+            Total number of attempts, including the first one. 1 disables retries.
+        backoff_base : float, optional
+            Upper bound in seconds of the delay before the first retry. Doubles on every retry.
+        backoff_cap : float, optional
+            Maximum delay in seconds between two attempts
+        retry_statuses : iterable of int, optional
+            HTTP status codes which are retried
+        retry_exceptions : tuple of exception types, optional
+            Transport errors which are retried. Defaults to connection errors and timeouts of the HTTP client in use.
+        retry_methods : iterable of str, optional
+            Methods retried without opting in
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_exceptions = retry_exceptions
+        self.retry_methods = frozenset(method.lower() for method in retry_methods)
+
+    def is_retryable(self, method: str, retry: bool=None) -> bool:
+        """
+        Whether a request may be retried at all. `retry` overrides the per-method default.
+        """
+        if retry is not None:
+            return retry
+        return method.lower() in self.retry_methods
+
+    def can_retry(self, attempt: int) -> bool:
+        """
+        Whether another attempt is allowed after `attempt` attempts have been made.
+        """
+        return attempt < self.max_attempts
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Seconds to wait after the `attempt`-th failed attempt (full jitter).
+        """
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1)))
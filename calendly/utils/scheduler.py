@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict, defaultdict, deque
+from typing import Any, Hashable, Optional, Tuple
+
+__license__ = "MIT"
+
+INTERACTIVE = 0
+BACKFILL = 1
+PRIORITIES = (INTERACTIVE, BACKFILL)
+
+DEFAULT_MAX_TENANT_CONCURRENCY = 2
+
+
+class FairScheduler(object):
+    """
+    Thread-safe task queue shared by worker threads, fair between tenants.
+
+    Tasks are queued per tenant. `get()` hands out interactive tasks before any backfill task,
+    and within a priority serves tenants round-robin, one task per turn, so a tenant with
+    thousands of queued tasks waits its turn like everybody else. A tenant never runs more than
+    `max_tenant_concurrency` tasks at once: workers stuck behind one tenant's rate limiter would
+    otherwise be unavailable to all the others.
+    """
+
+    def __init__(self, max_tenant_concurrency: int=DEFAULT_MAX_TENANT_CONCURRENCY):
+        """
+        Parameters
+        ----------
+        max_tenant_concurrency : int, optional
+            Maximum number of tasks of one tenant running at the same time. Defaults to 2.
+        """
+        self.max_tenant_concurrency = max_tenant_concurrency
+        self._queues = {priority: OrderedDict() for priority in PRIORITIES}
+        self._running = defaultdict(int)
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def put(self, tenant: Hashable, task: Any, priority: int=INTERACTIVE):
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cannot schedule tasks after close().")
+            self._queues[priority].setdefault(tenant, deque()).append(task)
+            self._size += 1
+            self._condition.notify()
+
+    def _pop(self) -> Optional[Tuple[Hashable, Any]]:
+        for priority in PRIORITIES:
+            queues = self._queues[priority]
+            for tenant in queues:
+                if self._running[tenant] < self.max_tenant_concurrency:
+                    tasks = queues.pop(tenant)
+                    task = tasks.popleft()
+                    if tasks:
+                        queues[tenant] = tasks
+                    return tenant, task
+        return None
+
+    def get(self) -> Optional[Tuple[Hashable, Any]]:
+        """
+        Wait for the next (tenant, task) to run, or return None once the scheduler is closed and drained.
+        Every task handed out must be reported with `done(tenant)`.
+        """
+        with self._condition:
+            while True:
+                item = self._pop()
+                if item is not None:
+                    self._running[item[0]] += 1
+                    self._size -= 1
+                    return item
+                if self._closed and not self._size:
+                    return None
+                self._condition.wait()
+
+    def done(self, tenant: Hashable):
+        with self._condition:
+            self._running[tenant] -= 1
+            if not self._running[tenant]:
+                del self._running[tenant]
+            self._condition.notify_all()
+
+    def close(self):
+        """
+        Stop accepting tasks. Workers drain the queued ones and then receive None.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
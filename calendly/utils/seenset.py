@@ -0,0 +1,101 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+__license__ = "MIT"
+
+DEFAULT_SEEN_SET_MAXSIZE = 100000
+DEFAULT_PURGE_INTERVAL = 1000
+
+
+class MemorySeenSet(object):
+    """
+    Thread-safe in-memory set of keys which expire after a ttl, bounded to `maxsize` keys.
+
+    Keys are kept in insertion order, so expired keys are dropped from the front on every add
+    and the least recently added key is evicted beyond `maxsize`.
+    """
+
+    clock = staticmethod(time.monotonic)
+
+    def __init__(self, maxsize: int=DEFAULT_SEEN_SET_MAXSIZE):
+        self.maxsize = maxsize
+        self._expires_at = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._expires_at)
+
+    def add(self, key: str, ttl: float) -> bool:
+        """
+        Atomically record `key` for `ttl` seconds. Returns False if it was already recorded and has not expired.
+        """
+        with self._lock:
+            now = self.clock()
+            expires_at = self._expires_at.get(key)
+            if expires_at is not None and expires_at > now:
+                return False
+            self._expires_at.pop(key, None)
+            self._expires_at[key] = now + ttl
+            while self._expires_at:
+                oldest, oldest_expires_at = next(iter(self._expires_at.items()))
+                if oldest_expires_at > now and len(self._expires_at) <= self.maxsize:
+                    break
+                del self._expires_at[oldest]
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._expires_at.pop(key, None)
+
+
+class SQLiteSeenSet(object):
+    """
+    Set of keys which expire after a ttl, kept in its own `seen` table of a sqlite database which
+    several processes can share. Expired rows are purged every `purge_interval` adds.
+    """
+
+    clock = staticmethod(time.time)
+
+    def __init__(self, path: str, purge_interval: int=DEFAULT_PURGE_INTERVAL):
+        self.purge_interval = purge_interval
+        self._adds = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY, expires_at REAL)")
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def add(self, key: str, ttl: float) -> bool:
+        """
+        Atomically record `key` for `ttl` seconds. Returns False if it was already recorded and has not expired.
+        """
+        now = self.clock()
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO seen VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET expires_at = excluded.expires_at WHERE seen.expires_at <= ?",
+                (key, now + ttl, now)
+            )
+            self._adds += 1
+            if self._adds % self.purge_interval == 0:
+                self._connection.execute("DELETE FROM seen WHERE expires_at <= ?", (now,))
+        return cursor.rowcount == 1
+
+    def purge(self):
+        """
+        Delete every expired key.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM seen WHERE expires_at <= ?", (self.clock(),))
+
+    def delete(self, key: str):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM seen WHERE key = ?", (key,))
+
+    def close(self):
+        self._connection.close()
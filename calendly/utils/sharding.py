@@ -0,0 +1,71 @@
+import math
+from datetime import datetime, timedelta, timezone
+from typing import List, MutableMapping, Optional, Tuple
+
+__license__ = "MIT"
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+
+def parse_time(value: str) -> datetime:
+    """
+    Parse a Calendly UTC timestamp such as "2020-01-02T03:04:05.678Z".
+    """
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def format_time(value: datetime) -> str:
+    """
+    Format a datetime the way Calendly expects it in `min_start_time`/`max_start_time`.
+    """
+    return value.astimezone(timezone.utc).strftime(TIME_FORMAT)
+
+
+def split_window(min_start_time: str, max_start_time: str, shards: int) -> List[Tuple[str, str]]:
+    """
+    Split the half-open window [min_start_time, max_start_time) into `shards` contiguous sub-windows.
+
+    Returns:
+        list: (min_start_time, max_start_time) pairs, in chronological order
+    """
+    start = parse_time(min_start_time)
+    end = parse_time(max_start_time)
+    step = (end - start) / shards
+
+    bounds = [start + step * i for i in range(shards)] + [end]
+    windows = []
+    for lower, upper in zip(bounds, bounds[1:]):
+        if upper > lower:
+            windows.append((format_time(lower), format_time(upper)))
+    return windows
+
+
+def split_dense_window(first_page: MutableMapping, min_start_time: str, max_start_time: str, max_shards: int,
+                       min_shard_duration: timedelta) -> Optional[List[Tuple[str, str]]]:
+    """
+    Sub-windows covering the rest of a window after its first page, sorted by start_time, when the
+    window holds more than that page and is wider than `min_shard_duration`.
+
+    The first page is kept by the caller, so only [last start_time on the page, max_start_time) is
+    split, into as many sub-windows as pages are estimated to remain from the page's event density,
+    between 2 and `max_shards`. Events starting exactly at the boundary are fetched twice and must be
+    de-duplicated on `uri`.
+
+    Returns:
+        list: (min_start_time, max_start_time) pairs, or None if the window should be paginated instead
+    """
+    lower, upper = parse_time(min_start_time), parse_time(max_start_time)
+    if first_page['pagination']['next_page'] is None or upper - lower <= min_shard_duration or not first_page['collection']:
+        return None
+    rest = first_page['collection'][-1]['start_time']
+    covered = parse_time(rest) - lower
+    if not covered:
+        return None
+    remaining = upper - parse_time(rest)
+    shards = max(2, min(math.ceil(remaining / covered), max_shards, remaining // min_shard_duration))
+    return split_window(rest, max_start_time, shards)
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable, MutableMapping, Tuple
+
+__license__ = "MIT"
+
+
+class SingleFlight(object):
+    """
+    Collapses identical concurrent calls made from several threads into one.
+
+    While a call for a key is in flight, callers of `do()` with the same key wait for it and
+    receive its result, or its exception, instead of calling the function themselves. The key
+    is forgotten as soon as the call completes, so nothing is cached beyond its duration.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Call `function` unless a call for `key` is already in flight.
+
+        Parameters
+        ----------
+        key : hashable
+            Identity of the call, e.g. a cache key built from the method, URL and parameters
+        function : callable
+            Called without arguments by the first caller
+
+        Returns
+        -------
+        tuple
+            the result, and whether it was shared from another caller's call
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = function()
+        except BaseException as error:
+            self._forget(key)
+            future.set_exception(error)
+            raise
+        self._forget(key)
+        future.set_result(result)
+        return result, False
+
+    def _forget(self, key: Hashable):
+        with self._lock:
+            del self._calls[key]
+
+    def stats(self) -> MutableMapping:
+        return {'leaders': self.leaders, 'coalesced': self.coalesced, 'in_flight': len(self._calls)}
+
+
+class AsyncSingleFlight(object):
+    """
+    asyncio counterpart of SingleFlight, collapsing identical concurrent calls of the tasks of one event loop.
+
+    A waiting task which is cancelled leaves the shared call running. If the task making the
+    call is cancelled, the waiting tasks start a new call instead of failing.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable]) -> Tuple[Any, bool]:
+        """
+        Await `function()` unless a call for `key` is already in flight. See SingleFlight.do.
+        """
+        while key in self._calls:
+            future = self._calls[key]
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                self.coalesced -= 1
+
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        self.leaders += 1
+        try:
+            result = await function()
+        except asyncio.CancelledError:
+            del self._calls[key]
+            future.cancel()
+            raise
+        except BaseException as error:
+            del self._calls[key]
+            future.set_exception(error)
+            future.exception()
+            raise
+        del self._calls[key]
+        future.set_result(result)
+        return result, False
+
+    def stats(self) -> MutableMapping:
+        return {'leaders': self.leaders, 'coalesced': self.coalesced, 'in_flight': len(self._calls)}
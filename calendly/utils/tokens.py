@@ -0,0 +1,330 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Iterator, MutableMapping, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from calendly.exceptions import CalendlyException, CalendlyOauth2Exception
+from .oauth2 import CalendlyOauth2
+
+__license__ = "MIT"
+
+DEFAULT_REFRESH_MARGIN = 300
+DEFAULT_LEASE_TIMEOUT = 60
+DEFAULT_LEASE_POLL_INTERVAL = 0.05
+UNKNOWN_TENANT_EXCEPTION_TEXT = "No OAuth2 token is stored for tenant {!r}."
+
+
+class MemoryTokenStore(object):
+    """
+    Keeps tokens in memory, shared by the TokenManagers of one process.
+
+    Every store has a `lock(tenant)` context manager which TokenManager holds while it re-reads,
+    refreshes and saves a token, so that one refresh happens per tenant among all its users.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = {}
+        self._tenant_locks = defaultdict(threading.Lock)
+
+    @contextmanager
+    def lock(self, tenant: str) -> Iterator[None]:
+        with self._lock:
+            tenant_lock = self._tenant_locks[tenant]
+        with tenant_lock:
+            yield
+
+    def load(self, tenant: str) -> Optional[MutableMapping]:
+        with self._lock:
+            token = self._tokens.get(tenant)
+        return dict(token) if token else None
+
+    def save(self, tenant: str, token: MutableMapping):
+        with self._lock:
+            self._tokens[tenant] = dict(token)
+
+    def delete(self, tenant: str):
+        with self._lock:
+            self._tokens.pop(tenant, None)
+
+
+class JSONFileTokenStore(object):
+    """
+    Keeps tokens in a JSON file readable by its owner only, rewritten atomically on every save.
+    Refreshes are serialized between processes with an exclusive `flock` on "<path>.lock"; where
+    `fcntl` is unavailable (Windows) only the threads of one process are coordinated.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> MutableMapping:
+        try:
+            with open(self.path, 'r') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def _write(self, tokens: MutableMapping):
+        temporary_path = f'{self.path}.tmp'
+        with open(os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as file:
+            json.dump(tokens, file)
+        os.replace(temporary_path, self.path)
+
+    @contextmanager
+    def lock(self, tenant: str) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        with open(os.open(f'{self.path}.lock', os.O_WRONLY | os.O_CREAT, 0o600), 'w') as file:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+    def load(self, tenant: str) -> Optional[MutableMapping]:
+        with self._lock:
+            return self._read().get(tenant)
+
+    def save(self, tenant: str, token: MutableMapping):
+        with self._lock:
+            tokens = self._read()
+            tokens[tenant] = token
+            self._write(tokens)
+
+    def delete(self, tenant: str):
+        with self._lock:
+            tokens = self._read()
+            if tokens.pop(tenant, None) is not None:
+                self._write(tokens)
+
+
+class SQLiteTokenStore(object):
+    """
+    Keeps tokens in a sqlite database, which several worker processes can share.
+
+    Refreshes are serialized between processes with a per-tenant lease row, taken atomically and
+    expiring after `lease_timeout` seconds in case its holder dies mid-refresh. The database itself
+    is not locked while the token endpoint is called.
+    """
+
+    def __init__(self, path: str, lease_timeout: float=DEFAULT_LEASE_TIMEOUT,
+                 poll_interval: float=DEFAULT_LEASE_POLL_INTERVAL):
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS tokens (tenant TEXT PRIMARY KEY, token TEXT)")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS token_leases (tenant TEXT PRIMARY KEY, owner TEXT, expires_at REAL)")
+
+    def _acquire_lease(self, tenant: str, owner: str) -> bool:
+        now = time.time()
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO token_leases VALUES (?, ?, ?) ON CONFLICT(tenant) DO UPDATE SET "
+                "owner = excluded.owner, expires_at = excluded.expires_at WHERE token_leases.expires_at <= ?",
+                (tenant, owner, now + self.lease_timeout, now)
+            )
+        return cursor.rowcount == 1
+
+    @contextmanager
+    def lock(self, tenant: str) -> Iterator[None]:
+        owner = uuid.uuid4().hex
+        while not self._acquire_lease(tenant, owner):
+            time.sleep(self.poll_interval)
+        try:
+            yield
+        finally:
+            with self._lock, self._connection:
+                self._connection.execute("DELETE FROM token_leases WHERE tenant = ? AND owner = ?", (tenant, owner))
+
+    def load(self, tenant: str) -> Optional[MutableMapping]:
+        with self._lock:
+            row = self._connection.execute("SELECT token FROM tokens WHERE tenant = ?", (tenant,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, tenant: str, token: MutableMapping):
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO tokens VALUES (?, ?)", (tenant, json.dumps(token)))
+
+    def delete(self, tenant: str):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM tokens WHERE tenant = ?", (tenant,))
+
+    def close(self):
+        self._connection.close()
+
+
+class TokenManager(object):
+    """
+    Per-tenant cache of OAuth2 access tokens, refreshed before they expire.
+
+    Tokens are kept in memory in front of a shared `store`, with their expiry computed from
+    `expires_in` (or the `exp` returned by token introspection). Within `refresh_margin` seconds
+    of expiry, the first caller refreshes the token while concurrent callers keep using the
+    still-valid one; once a token has expired, callers wait for that single refresh instead of
+    each posting their own. The re-read, refresh and save happen under the store's `lock(tenant)`,
+    which spans processes for the file and sqlite stores: a token already refreshed by another
+    worker is adopted rather than refreshed again with its rotated-out refresh token.
+
+    Pass the manager and a tenant to CalendlyAPI or AsyncCalendlyAPI to authenticate every request
+    with the current token and re-send a request answered with 401 once, after a refresh.
+    """
+
+    def __init__(self, oauth2: CalendlyOauth2, store=None, refresh_margin: float=DEFAULT_REFRESH_MARGIN,
+                 clock: Callable[[], float]=time.time):
+        """
+        Parameters
+        ----------
+        oauth2 : CalendlyOauth2
+            Client used to refresh and introspect tokens
+        store : optional
+            MemoryTokenStore, JSONFileTokenStore or SQLiteTokenStore. Defaults to a new MemoryTokenStore.
+        refresh_margin : float, optional
+            Seconds before expiry from which tokens are refreshed. Defaults to 300.
+        clock : callable, optional
+            Returns the current unix time
+        """
+        self.oauth2 = oauth2
+        self.store = store if store is not None else MemoryTokenStore()
+        self.refresh_margin = refresh_margin
+        self.clock = clock
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self._tokens = {}
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock(self, tenant: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(tenant, threading.Lock())
+
+    def _to_record(self, payload: MutableMapping, previous: MutableMapping=None) -> MutableMapping:
+        """
+        Token record to store for a token endpoint response, with an absolute `expires_at`.
+        """
+        record = dict(payload)
+        if not record.get('refresh_token') and previous:
+            record['refresh_token'] = previous.get('refresh_token')
+
+        now = self.clock()
+        if payload.get('expires_in') is not None:
+            record['expires_at'] = now + float(payload['expires_in'])
+        else:
+            details = self.oauth2.introspect_access_token(payload['access_token'])
+            record['expires_at'] = float(details['exp']) if details.get('active') and details.get('exp') else now
+        return record
+
+    def _load(self, tenant: str) -> MutableMapping:
+        record = self._tokens.get(tenant)
+        if record is None:
+            record = self.store.load(tenant)
+            if record is None:
+                raise CalendlyOauth2Exception(UNKNOWN_TENANT_EXCEPTION_TEXT.format(tenant))
+            self._tokens[tenant] = record
+        return record
+
+    def set_token(self, tenant: str, payload: MutableMapping) -> MutableMapping:
+        """
+        Store the token endpoint response `payload` (access_token, refresh_token, expires_in) for `tenant`.
+
+        Returns the stored token record.
+        """
+        record = self._to_record(payload)
+        with self._lock(tenant):
+            self.store.save(tenant, record)
+            self._tokens[tenant] = record
+        return record
+
+    def authorize(self, tenant: str, code: str) -> MutableMapping:
+        """
+        Exchange an authorization code for the first token of `tenant` and store it.
+        """
+        return self.set_token(tenant, self.oauth2.get_access_token(code))
+
+    def cached_token(self, tenant: str) -> Optional[str]:
+        """
+        Access token of `tenant` if it is held in memory and not due for a refresh, without any I/O.
+        """
+        record = self._tokens.get(tenant)
+        if record is None or record['expires_at'] - self.clock() <= self.refresh_margin:
+            return None
+        return record['access_token']
+
+    def get_token(self, tenant: str) -> str:
+        """
+        Current access token of `tenant`, refreshed first if it is about to expire. Raises
+        CalendlyOauth2Exception when no token is stored for the tenant or an expired token cannot be refreshed.
+        """
+        record = self._load(tenant)
+        now = self.clock()
+        if record['expires_at'] - now > self.refresh_margin:
+            return record['access_token']
+
+        lock = self._lock(tenant)
+        still_valid = record['expires_at'] > now
+        if not lock.acquire(blocking=not still_valid):
+            return record['access_token']
+        try:
+            return self._refresh(tenant, record['access_token'], self.refresh_margin)['access_token']
+        except CalendlyException:
+            self.refresh_failures += 1
+            if still_valid:
+                return record['access_token']
+            raise
+        finally:
+            lock.release()
+
+    def invalidate(self, tenant: str, access_token: str) -> str:
+        """
+        Report `access_token` as rejected (401) and return its replacement. Concurrent reports of the
+        same token are refreshed once.
+        """
+        with self._lock(tenant):
+            record = self._load(tenant)
+            if record['access_token'] != access_token and record['expires_at'] > self.clock():
+                return record['access_token']
+            return self._refresh(tenant, access_token, 0)['access_token']
+
+    def _refresh(self, tenant: str, stale_token: str, margin: float) -> MutableMapping:
+        """
+        Refresh the token of `tenant`. Must be called with the tenant lock held.
+        """
+        with self.store.lock(tenant):
+            record = self.store.load(tenant) or self._load(tenant)
+            if record['access_token'] != stale_token and record['expires_at'] - self.clock() > margin:
+                self._tokens[tenant] = record
+                return record
+
+            if not record.get('refresh_token'):
+                raise CalendlyOauth2Exception(f"The token of tenant {tenant!r} has expired and has no refresh token.")
+            record = self._to_record(self.oauth2.refresh_access_token(record['refresh_token']), record)
+            self.store.save(tenant, record)
+        self._tokens[tenant] = record
+        self.refreshes += 1
+        return record
+
+    def revoke(self, tenant: str):
+        """
+        Revoke the access token of `tenant` and forget it.
+        """
+        with self._lock(tenant):
+            record = self.store.load(tenant) or self._tokens.get(tenant)
+            if record is not None:
+                self.oauth2.revoke_access_token(record['access_token'])
+            self.store.delete(tenant)
+            self._tokens.pop(tenant, None)
@@ -0,0 +1,62 @@
+from collections import namedtuple
+from typing import Iterable, List, Mapping, MutableMapping, Tuple
+
+__license__ = "MIT"
+
+WebhookSpec = namedtuple('WebhookSpec', ['url', 'events', 'organization', 'scope', 'user', 'signing_key'])
+WebhookSpec.__new__.__defaults__ = ('organization', None, None)
+WebhookSpec.__doc__ = """
+Desired webhook subscription. `events` accepts short ("created") or full ("invitee.created") event names.
+The signing key is only used when the subscription has to be created.
+"""
+
+WebhookSyncReport = namedtuple('WebhookSyncReport', ['created', 'deleted', 'unchanged', 'errors'])
+WebhookSyncReport.__doc__ = """
+Outcome of sync_webhooks: the WebhookSpecs created, the subscription URIs deleted, the number of
+subscriptions left untouched and the BatchResults of failed operations.
+"""
+
+
+def normalize_events(events: Iterable[str], event_types_def: Mapping[str, str]) -> frozenset:
+    return frozenset(event_types_def.get(event, event) for event in events)
+
+
+def group_key(spec: WebhookSpec) -> Tuple:
+    """
+    (organization, scope, user) listing a subscription belongs to.
+    """
+    return spec.organization, spec.scope, spec.user if spec.scope == 'user' else None
+
+
+def subscription_key(url: str, events: Iterable[str], organization: str, scope: str, user: str,
+                     event_types_def: Mapping[str, str]) -> Tuple:
+    return url, normalize_events(events, event_types_def), organization, scope, user if scope == 'user' else None
+
+
+def diff_webhooks(desired: Iterable[WebhookSpec], existing: Iterable[MutableMapping],
+                  event_types_def: Mapping[str, str]) -> Tuple[List[WebhookSpec], List[str], int]:
+    """
+    Compute the minimal changes turning the `existing` json subscriptions into the `desired` ones.
+    Subscriptions are matched on url, events, organization, scope and user. Disabled and duplicate
+    subscriptions are deleted, so that exactly one active subscription remains per desired spec.
+
+    Returns:
+        tuple: specs to create, URIs of subscriptions to delete, number of subscriptions kept
+    """
+    wanted = {}
+    for spec in desired:
+        wanted.setdefault(subscription_key(spec.url, spec.events, spec.organization, spec.scope, spec.user,
+                                           event_types_def), spec)
+
+    kept = set()
+    to_delete = []
+    for subscription in existing:
+        key = subscription_key(subscription['callback_url'], subscription['events'], subscription['organization'],
+                               subscription['scope'], subscription.get('user'), event_types_def)
+        if key in wanted and key not in kept and subscription.get('state', 'active') == 'active':
+            kept.add(key)
+        else:
+            to_delete.append(subscription['uri'])
+
+    to_create = [spec for key, spec in wanted.items() if key not in kept]
+    return to_create, to_delete, len(kept)
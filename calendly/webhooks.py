@@ -0,0 +1,456 @@
+import asyncio
+import hashlib
+import hmac
+import queue
+import threading
+import time
+import zlib
+from collections import OrderedDict, defaultdict, namedtuple
+from socketserver import ThreadingMixIn
+from typing import Callable, List, MutableMapping, Optional, Tuple
+from wsgiref.simple_server import WSGIServer, make_server
+
+from calendly.calendly import CalendlyAPI
+from calendly.exceptions import CalendlyWebhookException
+from calendly.utils.seenset import MemorySeenSet
+from calendly.utils.codec import get_default_codec
+
+__license__ = "MIT"
+
+SIGNATURE_HEADER = 'Calendly-Webhook-Signature'
+DEFAULT_TOLERANCE = 180
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_WORKERS = 4
+ALL_EVENTS = '*'
+CREATED = CalendlyAPI.event_types_def['created']
+CANCELED = CalendlyAPI.event_types_def['canceled']
+DEFAULT_DEDUP_TTL = 24 * 60 * 60
+DEFAULT_DEDUP_MAXSIZE = 100000
+DEFAULT_REORDER_WINDOW = 2.0
+DEFAULT_REORDER_MAXSIZE = 100000
+
+_STOP = object()
+_REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 405: 'Method Not Allowed', 503: 'Service Unavailable'}
+
+WebhookEvent = namedtuple('WebhookEvent', ['event', 'created_at', 'created_by', 'payload'])
+WebhookEvent.__doc__ = """
+A parsed webhook delivery: `event` is e.g. "invitee.created" and `payload` the json invitee,
+including its `scheduled_event`.
+"""
+
+
+def compute_signature(body: bytes, timestamp: str, signing_key: str) -> str:
+    """
+    Return the hex HMAC-SHA256 Calendly sends as `v1`, computed over "<timestamp>.<body>".
+    """
+    message = timestamp.encode('utf-8') + b'.' + body
+    return hmac.new(signing_key.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body: bytes, header: str, signing_key: str, tolerance: Optional[float]=DEFAULT_TOLERANCE,
+                     now: float=None) -> None:
+    """
+    Check the `Calendly-Webhook-Signature` header ("t=<timestamp>,v1=<signature>") of a delivery.
+
+    Args:
+        body (bytes): Raw request body.
+        header (str): Value of the signature header.
+        signing_key (str): Key passed to create_webhook.
+        tolerance (float, optional): Maximum age of the timestamp in seconds, None to disable. Defaults to 180.
+        now (float, optional): Current unix time. Defaults to time.time().
+
+    Raises:
+        CalendlyWebhookException: if the header is missing or malformed, the signature does not match
+            or the timestamp is outside the tolerance
+    """
+    if not header:
+        raise CalendlyWebhookException(f"Missing {SIGNATURE_HEADER} header.")
+
+    parts = dict(part.strip().split('=', 1) for part in header.split(',') if '=' in part)
+    timestamp, signature = parts.get('t'), parts.get('v1')
+    if not timestamp or not signature:
+        raise CalendlyWebhookException(f"Malformed {SIGNATURE_HEADER} header.")
+
+    if not hmac.compare_digest(compute_signature(body, timestamp, signing_key), signature):
+        raise CalendlyWebhookException("Invalid webhook signature.")
+
+    if tolerance is not None:
+        try:
+            age = (time.time() if now is None else now) - int(timestamp)
+        except ValueError:
+            raise CalendlyWebhookException(f"Malformed {SIGNATURE_HEADER} header.")
+        if abs(age) > tolerance:
+            raise CalendlyWebhookException("Webhook timestamp is outside the tolerance.")
+
+
+def parse_event(body: bytes, codec=None) -> WebhookEvent:
+    """
+    Decode an `invitee.created` or `invitee.canceled` delivery.
+
+    Raises:
+        CalendlyWebhookException: if the body is not json or not a supported event
+    """
+    try:
+        data = (codec or get_default_codec()).loads(body)
+        event = data['event']
+        payload = data['payload']
+    except (ValueError, TypeError, KeyError):
+        raise CalendlyWebhookException("Malformed webhook payload.")
+
+    if event not in CalendlyAPI.event_types_def.values():
+        raise CalendlyWebhookException(f"Unsupported webhook event: {event}.")
+
+    return WebhookEvent(event, data.get('created_at'), data.get('created_by'), payload)
+
+
+def delivery_key(event: WebhookEvent) -> str:
+    """
+    Idempotency key of a delivery: invitee URI, event name and creation time, which stay the same
+    when Calendly redelivers it.
+    """
+    created_at = event.created_at or event.payload.get('created_at')
+    return f"webhook {event.payload.get('uri')} {event.event} {created_at}"
+
+
+class WebhookDeduplicator(object):
+    """
+    Seen-set of delivery keys remembered for `ttl` seconds: a bounded MemorySeenSet by default,
+    or a SQLiteSeenSet shared by several receiver processes.
+    """
+
+    def __init__(self, store=None, ttl: float=DEFAULT_DEDUP_TTL):
+        """
+        Args:
+            store (optional): MemorySeenSet or SQLiteSeenSet. Defaults to a MemorySeenSet of 100000 keys.
+            ttl (float, optional): Seconds a delivery is remembered. Defaults to 24 hours, Calendly's retry period.
+        """
+        self.store = store if store is not None else MemorySeenSet(DEFAULT_DEDUP_MAXSIZE)
+        self.ttl = ttl
+
+    def add(self, event: WebhookEvent) -> bool:
+        """
+        Record a delivery. Returns False if it was already seen within the ttl.
+        """
+        return self.store.add(delivery_key(event), self.ttl)
+
+    def discard(self, event: WebhookEvent):
+        """
+        Forget a delivery, e.g. when it could not be queued and Calendly will redeliver it.
+        """
+        self.store.delete(delivery_key(event))
+
+
+class ReorderBuffer(object):
+    """
+    Releases the deliveries of each invitee in causal order: `invitee.created` before `invitee.canceled`.
+
+    Created events and cancellations of invitees whose creation was already seen pass straight
+    through. A cancellation arriving first is held for up to `window` seconds, and released together
+    with the creation if it shows up in time, or on its own once the window has passed.
+    Not thread-safe: each receiver worker owns one buffer.
+    """
+
+    def __init__(self, window: float=DEFAULT_REORDER_WINDOW, maxsize: int=DEFAULT_REORDER_MAXSIZE,
+                 clock: Callable[[], float]=time.monotonic):
+        """
+        Args:
+            window (float, optional): Seconds a cancellation waits for its creation. Defaults to 2.
+            maxsize (int, optional): Number of created invitees remembered. Defaults to 100000.
+            clock (callable, optional): Monotonic time in seconds.
+        """
+        self.window = window
+        self.maxsize = maxsize
+        self.clock = clock
+        self._created = OrderedDict()
+        self._held = OrderedDict()
+
+    def __len__(self):
+        return sum(len(events) for _, events in self._held.values())
+
+    def push(self, event: WebhookEvent) -> List[WebhookEvent]:
+        """
+        Add a delivery and return the deliveries which can be handled now, in order.
+        """
+        uri = event.payload.get('uri')
+        if event.event == CREATED:
+            self._created[uri] = True
+            self._created.move_to_end(uri)
+            while len(self._created) > self.maxsize:
+                self._created.popitem(last=False)
+            _, held = self._held.pop(uri, (None, []))
+            return [event] + held
+        if event.event == CANCELED and uri not in self._created:
+            _, held = self._held.setdefault(uri, (self.clock() + self.window, []))
+            held.append(event)
+            return []
+        return [event]
+
+    def timeout(self) -> Optional[float]:
+        """
+        Seconds until the oldest held delivery is due, or None when nothing is held.
+        """
+        if not self._held:
+            return None
+        deadline, _ = next(iter(self._held.values()))
+        return max(deadline - self.clock(), 0)
+
+    def expired(self) -> List[WebhookEvent]:
+        """
+        Remove and return the held deliveries whose window has passed.
+        """
+        now = self.clock()
+        released = []
+        while self._held:
+            uri, (deadline, held) = next(iter(self._held.items()))
+            if deadline > now:
+                break
+            del self._held[uri]
+            released.extend(held)
+        return released
+
+    def flush(self) -> List[WebhookEvent]:
+        """
+        Remove and return every held delivery.
+        """
+        released = [event for _, held in self._held.values() for event in held]
+        self._held.clear()
+        return released
+
+
+def _event_name(event: str) -> str:
+    if event == ALL_EVENTS or event in CalendlyAPI.event_types_def.values():
+        return event
+    try:
+        return CalendlyAPI.event_types_def[event]
+    except KeyError:
+        raise CalendlyWebhookException(f"Unsupported webhook event: {event}.")
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class WebhookReceiver(object):
+    """
+    Receiving side of webhook subscriptions, usable as a WSGI app, an ASGI app (`receiver.asgi`)
+    or a standalone server (`serve`).
+
+    Each delivery is verified and parsed on the request thread, then put on a bounded queue and
+    acknowledged right away. Worker threads drain the queue and call the registered handlers, so
+    slow handlers never hold up Calendly's request. When the queue is full the delivery is answered
+    with 503, which makes Calendly redeliver it later instead of losing it.
+
+    Deliveries are partitioned between workers by invitee URI, so the events of one invitee are
+    handled one at a time, in arrival order. With a `deduplicator`, redeliveries are acknowledged
+    without being handled again; with a `reorder_window`, each worker releases an invitee's
+    cancellation only after its creation (see ReorderBuffer).
+    """
+
+    def __init__(self, signing_key: str, tolerance: Optional[float]=DEFAULT_TOLERANCE, queue_size: int=DEFAULT_QUEUE_SIZE,
+                 workers: int=DEFAULT_WORKERS, codec=None, clock: Callable[[], float]=time.time,
+                 deduplicator: WebhookDeduplicator=None, reorder_window: float=None):
+        """
+        Args:
+            signing_key (str): Key passed to create_webhook.
+            tolerance (float, optional): Maximum age of a delivery in seconds, None to disable. Defaults to 180.
+            queue_size (int, optional): Deliveries accepted but not yet handled, per worker, before answering 503. Defaults to 1000.
+            workers (int, optional): Number of handler threads. Defaults to 4.
+            codec (optional): JSON codec, see calendly.utils.codec.
+            clock (callable, optional): Returns the current unix time.
+            deduplicator (WebhookDeduplicator, optional): Seen-set dropping redelivered events.
+            reorder_window (float, optional): Seconds a cancellation waits for its invitee's creation. Disabled by default.
+
+        Raises:
+            ValueError: If workers is lower than 1, since accepted deliveries would never be handled.
+        """
+        if workers < 1:
+            raise ValueError(f"WebhookReceiver needs at least one worker, got {workers}.")
+        self.signing_key = signing_key
+        self.tolerance = tolerance
+        self.workers = workers
+        self.codec = codec or get_default_codec()
+        self.clock = clock
+        self.deduplicator = deduplicator
+        self.reorder_window = reorder_window
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+        self.handlers = defaultdict(list)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stats = dict(received=0, rejected=0, duplicates=0, queued=0, overflowed=0, handled=0, failed=0)
+
+    def on(self, event: str) -> Callable:
+        """
+        Decorator registering a handler called with the WebhookEvent of every `event` delivery.
+        `event` is "created", "canceled", their full names ("invitee.created") or "*" for all events.
+        """
+        name = _event_name(event)
+
+        def register(handler: Callable[[WebhookEvent], None]) -> Callable:
+            self.handlers[name].append(handler)
+            return handler
+        return register
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats(self) -> MutableMapping:
+        with self._lock:
+            return dict(self._stats, pending=sum(partition.qsize() for partition in self.queues))
+
+    def start(self):
+        """
+        Start the handler threads. Called automatically on the first accepted delivery.
+        """
+        with self._lock:
+            if self._threads:
+                return
+            self._threads = [threading.Thread(target=self._work, args=(partition,), daemon=True)
+                             for partition in self.queues[:self.workers]]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout: float=None):
+        """
+        Wait for the queued deliveries to be handled, then stop the handler threads.
+        """
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for partition in self.queues[:len(threads)]:
+            partition.put(_STOP)
+        for thread in threads:
+            thread.join(timeout)
+
+    def _work(self, partition: queue.Queue):
+        reorder = ReorderBuffer(self.reorder_window) if self.reorder_window else None
+        while True:
+            try:
+                event = partition.get(timeout=reorder.timeout() if reorder is not None else None)
+            except queue.Empty:
+                event = None
+            try:
+                if event is _STOP:
+                    for held in reorder.flush() if reorder is not None else []:
+                        self.dispatch(held)
+                    return
+                if reorder is None:
+                    released = [event]
+                else:
+                    released = reorder.expired() + (reorder.push(event) if event is not None else [])
+                for released_event in released:
+                    self.dispatch(released_event)
+            finally:
+                if event is not None:
+                    partition.task_done()
+
+    def dispatch(self, event: WebhookEvent):
+        """
+        Call the handlers registered for `event` in the current thread. A failing handler is counted
+        and does not prevent the others from running.
+        """
+        for handler in self.handlers[event.event] + self.handlers[ALL_EVENTS]:
+            try:
+                handler(event)
+                self._count('handled')
+            except Exception:
+                self._count('failed')
+
+    def enqueue(self, event: WebhookEvent) -> bool:
+        """
+        Queue a parsed delivery for the handler threads. Returns False when the queue is full.
+        """
+        self.start()
+        partition = self.queues[zlib.crc32(str(event.payload.get('uri')).encode('utf-8')) % len(self.queues)]
+        try:
+            partition.put_nowait(event)
+        except queue.Full:
+            self._count('overflowed')
+            return False
+        self._count('queued')
+        return True
+
+    def handle(self, body: bytes, signature: str) -> Tuple[int, str]:
+        """
+        Verify, parse and queue one delivery.
+
+        Returns:
+            tuple: HTTP status code and message for the response
+        """
+        self._count('received')
+        try:
+            verify_signature(body, signature, self.signing_key, self.tolerance, self.clock())
+            event = parse_event(body, self.codec)
+        except CalendlyWebhookException as e:
+            self._count('rejected')
+            return 400, e.message
+
+        if self.deduplicator is not None and not self.deduplicator.add(event):
+            self._count('duplicates')
+            return 200, "Duplicate delivery ignored."
+
+        if not self.enqueue(event):
+            if self.deduplicator is not None:
+                self.deduplicator.discard(event)
+            return 503, "Receiver is busy, retry later."
+        return 202, "Accepted"
+
+    def __call__(self, environ: MutableMapping, start_response: Callable) -> List[bytes]:
+        if environ['REQUEST_METHOD'] != 'POST':
+            status, message = 405, "Method Not Allowed"
+        else:
+            try:
+                length = int(environ.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                length = 0
+            body = environ['wsgi.input'].read(length)
+            status, message = self.handle(body, environ.get('HTTP_CALENDLY_WEBHOOK_SIGNATURE'))
+
+        body = self.codec.dumps({'status': status, 'message': message})
+        start_response(f'{status} {_REASONS[status]}', [('Content-Type', 'application/json'),
+                                                         ('Content-Length', str(len(body)))])
+        return [body]
+
+    async def asgi(self, scope: MutableMapping, receive: Callable, send: Callable):
+        """
+        ASGI application. Deliveries are verified and queued on the default executor, since the
+        deduplicator's store may block, and handlers still run on the receiver's worker threads.
+        """
+        if scope['type'] != 'http':
+            return
+        if scope['method'] != 'POST':
+            status, message = 405, "Method Not Allowed"
+        else:
+            chunks = []
+            while True:
+                request = await receive()
+                chunks.append(request.get('body', b''))
+                if not request.get('more_body'):
+                    break
+            headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+            status, message = await asyncio.get_running_loop().run_in_executor(
+                None, self.handle, b''.join(chunks), headers.get(SIGNATURE_HEADER.lower()))
+
+        body = self.codec.dumps({'status': status, 'message': message})
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]})
+        await send({'type': 'http.response.body', 'body': body})
+
+    def make_server(self, host: str='0.0.0.0', port: int=8000) -> WSGIServer:
+        """
+        Return a threaded wsgiref server bound to host:port. Use serve_forever() and shutdown() to run it.
+        """
+        return make_server(host, port, self, server_class=_ThreadingWSGIServer)
+
+    def serve(self, host: str='0.0.0.0', port: int=8000):
+        """
+        Serve deliveries until interrupted, then drain the queue.
+        """
+        server = self.make_server(host, port)
+        self.start()
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stop()
@@ -5,6 +5,7 @@ except ImportError:
 
 long_desc = open("README.md").read()
 required = ['requests']
+extras = {'async': ['httpx'], 'fast': ['orjson'], 'arrow': ['pyarrow']}
 
 setup(
     name='PyCalendly',
@@ -24,6 +25,7 @@ setup(
     include_package_data=True,
     zip_safe=False,
     install_requires=required,
+    extras_require=extras,
     platforms="any",
     keywords="Calendly python api v2",
     classifiers=[